@@ -1,8 +1,11 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi.responses import StreamingResponse
 import requests
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
 from ..database import get_db 
+from ..dependencies.read_routing import get_read_db, get_read_sessionmaker
 from . import schema, model
 from .._Group import model as GroupModel
 from .._Course import model as CourseModel
@@ -10,7 +13,9 @@ from .._Learning_Content import model as ContentModel
 from .._Submission import model as SubmissionModel
 from .._Student import model as StudentModel
 from .._Customer import model as CustomerModel
+from ..storage import ensure_upload_dir, register_upload_dir
 from datetime import datetime
+import json
 import os
 import shutil
 import uuid
@@ -21,9 +26,12 @@ router = APIRouter(
 )
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_DIR = os.path.join(CURRENT_DIR, "..", "..", "uploads", "assignment")
+UPLOAD_DIR = register_upload_dir(os.path.join(CURRENT_DIR, "..", "..", "uploads", "assignment"))
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+SUBMISSION_PAGE_SIZE = 100
+SUBMISSION_MAX_PAGE_SIZE = 500
+# rows fetched per round trip while streaming
+SUBMISSION_STREAM_CHUNK = 200
 
 def _serialize_assignment(db: Session, assignment: model.Assignment):
     """Serialize an Assignment to the shape expected by AssignmentModel in FE."""
@@ -66,10 +74,10 @@ def _serialize_assignment(db: Session, assignment: model.Assignment):
     }
 
 @router.post("/files")
-async def upload_assignment_file(file: UploadFile = File(...)):
+def upload_assignment_file(file: UploadFile = File(...)):
     file_extension = os.path.splitext(file.filename or "")[1]
     unique_filename = f"assignment_{uuid.uuid4()}{file_extension}"
-    file_path_on_disk = os.path.join(UPLOAD_DIR, unique_filename)
+    file_path_on_disk = os.path.join(ensure_upload_dir(UPLOAD_DIR), unique_filename)
 
     try:
         with open(file_path_on_disk, "wb") as buffer:
@@ -191,13 +199,75 @@ def read_all(db: Session = Depends(get_db)):
     
     return assignments
 
+def _submissions_query(
+    assignment: model.Assignment,
+    student_id: Optional[int],
+    ungraded_only: bool,
+    late_only: bool,
+    after_id: Optional[int] = None,
+):
+    """
+    Submissions of an assignment with the student's name joined in (a student's
+    customerID is its studentID), in submission order from after `after_id`.
+    """
+    Submission = SubmissionModel.Submission
+
+    query = (
+        select(Submission, CustomerModel.Customer.fullname)
+        .outerjoin(CustomerModel.Customer, CustomerModel.Customer.customerID == Submission.studentID)
+        .where(Submission.assignmentID == assignment.assignmentID)
+    )
+
+    if student_id is not None:
+        query = query.where(Submission.studentID == student_id)
+    if ungraded_only:
+        query = query.where(Submission.score.is_(None))
+    if late_only:
+        query = query.where(Submission.submitted_at > assignment.deadline)
+
+    if after_id is not None:
+        # keyset on (submitted_at, submissionID)
+        cursor_at = select(Submission.submitted_at).where(Submission.submissionID == after_id).scalar_subquery()
+        query = query.where(
+            or_(
+                Submission.submitted_at > cursor_at,
+                and_(Submission.submitted_at == cursor_at, Submission.submissionID > after_id),
+            )
+        )
+
+    return query.order_by(Submission.submitted_at.asc(), Submission.submissionID.asc())
+
+
+def _submission_row(sub: SubmissionModel.Submission, student_name: Optional[str]) -> dict:
+    return {
+        "submission_id": sub.submissionID,
+        "assignment_id": sub.assignmentID,
+        "student_id": sub.studentID,
+        "student_name": student_name,
+        "submission_text": sub.submission_text,
+        "file_url": sub.file_url,
+        "submitted_at": (sub.submitted_at or datetime.utcnow()).isoformat(),
+        "score": sub.score,
+        "feedback": sub.feedback,
+        "graded_at": sub.graded_at.isoformat() if sub.graded_at else None,
+    }
+
+
 # read submissions of an assignment
 @router.get("/{assignment_id}/submissions")
 def get_assignment_submissions(
     assignment_id: int,
     student_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    ungraded_only: bool = False,
+    late_only: bool = False,
+    after_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(SUBMISSION_PAGE_SIZE, ge=1, le=SUBMISSION_MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
 ):
+    """
+    One page of submissions in submission order. `next_after_id` is the cursor
+    for the next page, null on the last one.
+    """
     assignment = db.query(model.Assignment).filter(
         model.Assignment.assignmentID == assignment_id
     ).first()
@@ -205,49 +275,49 @@ def get_assignment_submissions(
     if not assignment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
 
-    query = db.query(SubmissionModel.Submission).filter(
-        SubmissionModel.Submission.assignmentID == assignment_id
-    )
+    query = _submissions_query(assignment, student_id, ungraded_only, late_only, after_id)
 
-    if student_id is not None:
-        query = query.filter(SubmissionModel.Submission.studentID == student_id)
+    # one extra row tells whether there is a next page
+    rows = db.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    submissions = query.order_by(SubmissionModel.Submission.submitted_at.asc()).all()
+    return {
+        "submissions": [_submission_row(sub, student_name) for sub, student_name in rows],
+        "next_after_id": rows[-1][0].submissionID if has_more else None,
+    }
 
-    result = []
-    for sub in submissions:
-        student = (
-            db.query(StudentModel.Student)
-            .filter(StudentModel.Student.studentID == sub.studentID)
-            .first()
-        )
 
-        customer = None
-        if student is not None:
-            customer = (
-                db.query(CustomerModel.Customer)
-                .filter(CustomerModel.Customer.customerID == student.studentID)
-                .first()
-            )
+# stream every matching submission as NDJSON, one object per line
+@router.get("/{assignment_id}/submissions/stream")
+def stream_assignment_submissions(
+    assignment_id: int,
+    student_id: Optional[int] = None,
+    ungraded_only: bool = False,
+    late_only: bool = False,
+    session_factory=Depends(get_read_sessionmaker),
+):
+    # the response outlives the request's dependencies, so the generator owns its session
+    db = session_factory()
+    assignment = db.query(model.Assignment).filter(
+        model.Assignment.assignmentID == assignment_id
+    ).first()
 
-        student_name = customer.fullname if customer else None
-
-        result.append(
-            {
-                "submission_id": sub.submissionID,
-                "assignment_id": sub.assignmentID,
-                "student_id": sub.studentID,
-                "student_name": student_name,
-                "submission_text": sub.submission_text,
-                "file_url": sub.file_url,
-                "submitted_at": (sub.submitted_at or datetime.utcnow()).isoformat(),
-                "score": sub.score,
-                "feedback": sub.feedback,
-                "graded_at": sub.graded_at.isoformat() if sub.graded_at else None,
-            }
-        )
+    if not assignment:
+        db.close()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
+
+    query = _submissions_query(assignment, student_id, ungraded_only, late_only)
+
+    def lines():
+        try:
+            result = db.execute(query.execution_options(yield_per=SUBMISSION_STREAM_CHUNK))
+            for sub, student_name in result:
+                yield json.dumps(_submission_row(sub, student_name)) + "\n"
+        finally:
+            db.close()
 
-    return {"submissions": result}
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 # update assignment
 @router.patch("/{assignment_id}", response_model=schema.AssignmentRead)
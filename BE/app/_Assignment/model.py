@@ -1,4 +1,4 @@
-from sqlalchemy import DECIMAL, Column, Numeric, String, DateTime, Float, Integer, ForeignKey, Text, Enum
+from sqlalchemy import DECIMAL, Column, Index, Numeric, String, DateTime, Float, Integer, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -6,6 +6,9 @@ from ..database import Base
 
 class Assignment(Base):
     __tablename__ = 'Assignments'
+    __table_args__ = (
+        Index('ix_Assignments_groupID_deadline', 'groupID', 'deadline'),
+    )
 
     assignmentID = Column(
         Integer, 
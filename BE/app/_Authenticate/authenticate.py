@@ -1,17 +1,19 @@
 from datetime import timedelta
 import re
-from typing import Any, Dict, Tuple
-import bcrypt
+from typing import Any, Dict, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from ..database import get_db 
-from . import schema, model
+from . import schema, model, hashing, refresh_tokens
 from .._Customer import model as CustomerModel
 from .._Customer import schema as CustomerSchema
 from .._Student import schema as StudentSchema
 from .._Student.student import create_student
 from .._Customer.customer import create_customer
-from ..dependencies.auth import CustomJWTError, create_access_token, decode_access_token, get_token_from_header
+from ..dependencies.auth import CustomJWTError, create_access_token, customer_token_claims, decode_access_token, get_token_from_header
+from ..dependencies.principal_cache import Principal, principal_cache
+from ..dependencies.token_revocation import is_token_revoked, revoke_customer_tokens, revoke_token
 from ..config import ACCESS_TOKEN_EXPIRE_MINUTES
 
 MIN_LENGTH = 8
@@ -20,6 +22,12 @@ router = APIRouter(
     prefix="/auth",
     tags=["Authenticate"],
 )
+
+async def _reject_if_revoked(payload: dict, principal: Principal) -> None:
+    # legacy tokens carry no customerID: check the deny-list under the resolved one
+    if await is_token_revoked({**payload, "customerID": principal.customerID}):
+        raise CustomJWTError(status_code=401, detail="Token revoked")
+
 async def validate_token(token : str = Depends(get_token_from_header), db: Session = Depends(get_db)): # <== THÊM DB
     try:
         payload = decode_access_token(token)
@@ -29,14 +37,22 @@ async def validate_token(token : str = Depends(get_token_from_header), db: Sessi
         if not username:
             raise CustomJWTError(status_code=401, detail="Invalid token structure")
 
+        cached = principal_cache.get(token)
+        if cached is not None:
+            await _reject_if_revoked(payload, cached)
+            return cached
+
         # session_exists = db.query(session_model.Session).filter(
         #     session_model.Session.session_id == session_id_in_jwt,
         #     session_model.Session.user_id == account_id
         # ).first()
         
-        customer = db.query(CustomerModel.Customer).filter(
-            CustomerModel.Customer.fullname == username
-        ).first()
+        # legacy tokens only: the lookup is sync, keep it off the event loop
+        customer = await run_in_threadpool(
+            lambda: db.query(CustomerModel.Customer).filter(
+                CustomerModel.Customer.fullname == username
+            ).first()
+        )
         
         if not customer:
             raise CustomJWTError(status_code=401, detail="Token invalid")
@@ -44,8 +60,16 @@ async def validate_token(token : str = Depends(get_token_from_header), db: Sessi
         # if not session_exists:
         #     raise CustomJWTError(status_code=401, detail="Token revoked (Session terminated)")
 
+        principal = Principal(
+            customerID=customer.customerID,
+            fullname=customer.fullname,
+            role=customer.role,
+        )
+        await _reject_if_revoked(payload, principal)
+        principal_cache.put(token, principal, expires_at=payload.get("exp"))
+
         # return model.TokenData(username=username)
-        return customer
+        return principal
         
     except CustomJWTError as e:
         raise HTTPException(
@@ -54,9 +78,15 @@ async def validate_token(token : str = Depends(get_token_from_header), db: Sessi
             headers={"X-Auth-Failed": "Token rejected"} 
         )
 
-def hash_password(password: str) -> str:
-    hashed_bytes = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    return hashed_bytes.decode('utf-8')
+async def hash_password(password: str) -> str:
+    return await hashing.hash_password(password)
+
+# The routes that hash are async: hashing is awaited on the event loop and holds
+# no threadpool thread while it queues for a worker. Their DB work is sync, so it
+# runs in the threadpool explicitly.
+def _commit(db: Session, instance) -> None:
+    db.commit()
+    db.refresh(instance)
 
 def check_password_complexity(password: str) -> Tuple[bool, Dict[str, Any]]:
     """
@@ -103,22 +133,24 @@ def check_password_complexity(password: str) -> Tuple[bool, Dict[str, Any]]:
 
 # update account password
 @router.patch("/{customer_id}/change-password")
-def reset_password(
+async def reset_password(
     customer_id: int, 
     account_data: schema.AccountPasswordReset, 
     db: Session = Depends(get_db)
 ):
-    if not db.get(CustomerModel.Customer, customer_id):
+    if not await run_in_threadpool(db.get, CustomerModel.Customer, customer_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
 
-    db_customer = db.query(CustomerModel.Customer).filter(
-        CustomerModel.Customer.customerID == customer_id
-    ).first()
+    db_customer = await run_in_threadpool(
+        lambda: db.query(CustomerModel.Customer).filter(
+            CustomerModel.Customer.customerID == customer_id
+        ).first()
+    )
     
     if not db_customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found for this customer.")
 
-    if not db_customer.verify_password(account_data.current_password):
+    if not await hashing.verify_password(account_data.current_password, db_customer.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Current password is incorrect"
@@ -131,21 +163,23 @@ def reset_password(
     #         detail={"error": "Password does not meet complexity requirements", "details": detail}
     #     )
 
-    hashed_password = hash_password(account_data.new_password)
+    hashed_password = await hash_password(account_data.new_password)
 
     db_customer.password = hashed_password
     
-    db.commit()
-    db.refresh(db_customer)
+    await run_in_threadpool(_commit, db, db_customer)
+    await revoke_customer_tokens(customer_id)
 
     return {"message": "Password changed successfully"}    
 
 # register account
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=CustomerSchema.TokenWithCustomer)
-def register(customer: schema.AccountCreate, db: Session = Depends(get_db)):
-    username_exist = db.query(CustomerModel.Customer).filter(
-        CustomerModel.Customer.fullname == customer.email
-    ).first()
+async def register(customer: schema.AccountCreate, db: Session = Depends(get_db)):
+    username_exist = await run_in_threadpool(
+        lambda: db.query(CustomerModel.Customer).filter(
+            CustomerModel.Customer.fullname == customer.email
+        ).first()
+    )
     if username_exist:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -159,7 +193,7 @@ def register(customer: schema.AccountCreate, db: Session = Depends(get_db)):
     #         detail={"error": "Password does not meet complexity requirements", "details": detail}
     #     )
         
-    hashed_password = hash_password(customer.password)
+    hashed_password = await hash_password(customer.password)
 
     customer_data = schema.CustomerCreate(
         fullname=customer.fullname,
@@ -168,37 +202,42 @@ def register(customer: schema.AccountCreate, db: Session = Depends(get_db)):
         phone_number=customer.phone_number,
         password=hashed_password
     )
-    customer = create_customer(customer_data, db)
+    customer = await run_in_threadpool(create_customer, customer_data, db)
     
     if not customer:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Can't create customer")
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = customer_token_claims(customer)
     access_token = create_access_token(
-        data={"sub": customer.fullname}, expires_delta=access_token_expires
+        data=claims, expires_delta=access_token_expires
     )
+    refresh_token = await refresh_tokens.issue_refresh_token(claims)
 
     return {
         "token": access_token, 
         "token_type": "bearer",
+        "refresh_token": refresh_token,
         "customer" : customer}
 
 # register student account
 @router.post("/register-student", status_code=status.HTTP_201_CREATED)
-def register_student_for_instructor(
+async def register_student_for_instructor(
     account: schema.AccountCreate,
     db: Session = Depends(get_db),
 ):
-    existing = db.query(CustomerModel.Customer).filter(
-        CustomerModel.Customer.email == account.email
-    ).first()
+    existing = await run_in_threadpool(
+        lambda: db.query(CustomerModel.Customer).filter(
+            CustomerModel.Customer.email == account.email
+        ).first()
+    )
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Customer with email '{account.email}' already exists.",
         )
 
-    hashed_password = hash_password(account.password)
+    hashed_password = await hash_password(account.password)
 
     customer_data = CustomerSchema.CustomerCreate(
         fullname=account.fullname,
@@ -206,6 +245,9 @@ def register_student_for_instructor(
         phone_number=account.phone_number,
         password=hashed_password,
     )
+    return await run_in_threadpool(_create_student_account, customer_data, db)
+
+def _create_student_account(customer_data: CustomerSchema.CustomerCreate, db: Session) -> dict:
     customer = create_customer(customer_data, db)
 
     if not customer:
@@ -230,14 +272,16 @@ def register_student_for_instructor(
 
 # login account
 @router.post("/login", response_model=CustomerSchema.TokenWithCustomer)
-def login(form_data : schema.AccountLogin,
+async def login(form_data : schema.AccountLogin,
         db: Session = Depends(get_db)):
 
-    user = db.query(CustomerModel.Customer).filter(
-        CustomerModel.Customer.fullname == form_data.username
-    ).first()
+    user = await run_in_threadpool(
+        lambda: db.query(CustomerModel.Customer).filter(
+            CustomerModel.Customer.fullname == form_data.username
+        ).first()
+    )
     
-    if not user or not user.verify_password(form_data.password):
+    if not user or not await hashing.verify_password(form_data.password, user.password):
         # print(form_data.email, form_data.password)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -245,15 +289,49 @@ def login(form_data : schema.AccountLogin,
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # upgrade hashes made under an older policy while we still have the plain password
+    if hashing.needs_rehash(user.password):
+        try:
+            user.password = await hashing.hash_password(form_data.password)
+            await run_in_threadpool(_commit, db, user)
+        except HTTPException:
+            # hashing pool is saturated; the upgrade can wait for the next login
+            pass
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = customer_token_claims(user)
     access_token = create_access_token(
-        data={"sub": user.fullname}, expires_delta=access_token_expires
+        data=claims, expires_delta=access_token_expires
     )
+    refresh_token = await refresh_tokens.issue_refresh_token(claims)
     
     return {
         "token": access_token,
         "token_type": "bearer",
+        "refresh_token": refresh_token,
         "customer" : user}
+
+# exchange a refresh token for a new access token (no password check, no DB)
+@router.post("/refresh", response_model=schema.RefreshedToken)
+async def refresh(payload: schema.RefreshTokenRequest):
+    rotated = await refresh_tokens.rotate_refresh_token(payload.refresh_token)
+    
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    claims, new_refresh_token = rotated
+    access_token = create_access_token(
+        data=claims, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    
+    return {
+        "token": access_token,
+        "token_type": "bearer",
+        "refresh_token": new_refresh_token}
     
 @router.get("/me", response_model=CustomerSchema.CustomerRead)
 def get_current_user(token : str = Depends(get_token_from_header), db : Session = Depends(get_db)):
@@ -264,13 +342,37 @@ def get_current_user(token : str = Depends(get_token_from_header), db : Session
     """
     
     payload = decode_access_token(token)
-    fullname = payload.get("sub")
+    customer_id = payload.get("customerID")
     
-    customer = db.query(CustomerModel.Customer).filter(
-        CustomerModel.Customer.fullname == fullname
-    ).first()
+    if customer_id is not None:
+        customer = db.get(CustomerModel.Customer, customer_id)
+    else:
+        customer = db.query(CustomerModel.Customer).filter(
+            CustomerModel.Customer.fullname == payload.get("sub")
+        ).first()
     
     if not customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="error get current user data")
     
-    return customer
\ No newline at end of file
+    return customer
+
+# logout
+@router.post("/logout")
+async def logout(
+    body: Optional[schema.RefreshTokenRequest] = None,
+    token : str = Depends(get_token_from_header),
+):
+    try:
+        payload = decode_access_token(token)
+    except CustomJWTError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    await revoke_token(payload)
+    if body is not None:
+        await refresh_tokens.revoke_refresh_token(body.refresh_token)
+
+    cached = principal_cache.get(token)
+    if cached is not None:
+        principal_cache.invalidate_customer(cached.customerID)
+
+    return {"message": "Logged out successfully"}
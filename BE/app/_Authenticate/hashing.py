@@ -0,0 +1,203 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from fastapi import HTTPException, status
+
+from .._Metrics.histogram import Histogram
+from ..config import (
+    ARGON2_MEMORY_COST_KIB,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_RETRY_AFTER_SECONDS,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_WORKERS,
+)
+
+# bcrypt takes a couple hundred ms of pure CPU per call
+HASH_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SCHEMES = ("bcrypt", "argon2")
+
+
+@dataclass(frozen=True)
+class HashPolicy:
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 4
+
+    def __post_init__(self):
+        if self.scheme not in SCHEMES:
+            raise ValueError(f"Unknown password hash scheme '{self.scheme}', expected one of {SCHEMES}")
+
+    def argon2_hasher(self) -> PasswordHasher:
+        return PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_cost,
+            parallelism=self.argon2_parallelism,
+        )
+
+
+current_policy = HashPolicy(
+    scheme=PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=BCRYPT_ROUNDS,
+    argon2_time_cost=ARGON2_TIME_COST,
+    argon2_memory_cost=ARGON2_MEMORY_COST_KIB,
+    argon2_parallelism=ARGON2_PARALLELISM,
+)
+
+
+def _is_argon2(hashed_password: str) -> bool:
+    return hashed_password.startswith("$argon2")
+
+
+# Worker-side functions: module level so they can be pickled into the pool.
+def _hash(password: str, policy: HashPolicy) -> str:
+    if policy.scheme == "argon2":
+        return policy.argon2_hasher().hash(password)
+    salt = bcrypt.gensalt(rounds=policy.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    if _is_argon2(hashed_password):
+        try:
+            # parameters are read from the hash itself
+            return PasswordHasher().verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
+    except (ValueError, TypeError):
+        return False
+
+
+def needs_rehash(hashed_password: str, policy: HashPolicy = current_policy) -> bool:
+    """True if the stored hash was made with another scheme or cost than `policy`. Cheap, no hashing."""
+    if policy.scheme == "argon2":
+        if not _is_argon2(hashed_password):
+            return True
+        try:
+            return policy.argon2_hasher().check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
+
+    # bcrypt: $2b$<rounds>$<salt+hash>
+    parts = hashed_password.split("$")
+    if len(parts) != 4 or not parts[1].startswith("2"):
+        return True
+    try:
+        return int(parts[2]) != policy.bcrypt_rounds
+    except ValueError:
+        return True
+
+
+class PasswordHashPool:
+    """
+    Runs password hashing in a dedicated, size-limited process pool.
+
+    Callers await the worker's result on the event loop, so a call waiting
+    for a worker holds no threadpool thread; the hashing routes are async for
+    that reason. At most `workers + max_pending` calls are admitted at once;
+    anything past that is rejected immediately with 503 + Retry-After instead
+    of queueing behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.latency = Histogram(HASH_LATENCY_BUCKETS)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a process that already runs threads is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.in_flight += 1
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+            self.latency.observe(time.perf_counter() - started)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            in_flight = self.in_flight
+            completed = self.completed
+            rejected = self.rejected
+
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "completed": completed,
+            "rejected": rejected,
+            "latency_seconds": self.latency.snapshot(),
+        }
+
+
+hash_pool = PasswordHashPool(
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await hash_pool.run(_hash, password, current_policy)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(_verify, plain_password, hashed_password)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import secrets
+from typing import Optional, Tuple
+
+from .._Websocket.Realtime import redis_utils
+from ..config import REFRESH_TOKEN_EXPIRE_DAYS
+
+# Only a digest of the refresh token is stored server-side.
+REFRESH_TOKEN_KEY = "auth:refresh:{digest}"
+# Digests that were already rotated; presenting one again means the token leaked.
+USED_REFRESH_TOKEN_KEY = "auth:refresh:used:{digest}"
+CUSTOMER_REFRESH_TOKENS_KEY = "auth:refresh:customer:{customer_id}"
+
+REFRESH_TOKEN_TTL_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+async def issue_refresh_token(claims: dict) -> Optional[str]:
+    """Stores a new refresh token for these access-token claims and returns it."""
+    if redis_utils.redis_client is None:
+        return None
+
+    token = secrets.token_urlsafe(32)
+    digest = _digest(token)
+    customer_key = CUSTOMER_REFRESH_TOKENS_KEY.format(customer_id=claims["customerID"])
+
+    pipe = redis_utils.redis_client.pipeline()
+    pipe.set(REFRESH_TOKEN_KEY.format(digest=digest), json.dumps(claims), ex=REFRESH_TOKEN_TTL_SECONDS)
+    pipe.sadd(customer_key, digest)
+    pipe.expire(customer_key, REFRESH_TOKEN_TTL_SECONDS)
+    await pipe.execute()
+
+    return token
+
+
+async def rotate_refresh_token(token: str) -> Optional[Tuple[dict, str]]:
+    """
+    Consumes a refresh token and issues its successor.
+
+    Returns (claims, new_refresh_token), or None if the token is unknown,
+    expired or was already used. Reusing a rotated token revokes every
+    refresh token of that customer.
+    """
+    if redis_utils.redis_client is None:
+        return None
+
+    digest = _digest(token)
+
+    # GETDEL is atomic: concurrent refreshes with the same token get one winner
+    raw = await redis_utils.redis_client.getdel(REFRESH_TOKEN_KEY.format(digest=digest))
+    if raw is None:
+        reused_by = await redis_utils.redis_client.get(USED_REFRESH_TOKEN_KEY.format(digest=digest))
+        if reused_by is not None:
+            await revoke_customer_refresh_tokens(int(reused_by))
+        return None
+
+    claims = json.loads(raw)
+    customer_id = claims["customerID"]
+
+    pipe = redis_utils.redis_client.pipeline()
+    pipe.set(USED_REFRESH_TOKEN_KEY.format(digest=digest), customer_id, ex=REFRESH_TOKEN_TTL_SECONDS)
+    pipe.srem(CUSTOMER_REFRESH_TOKENS_KEY.format(customer_id=customer_id), digest)
+    await pipe.execute()
+
+    new_token = await issue_refresh_token(claims)
+    return claims, new_token
+
+
+async def revoke_refresh_token(token: str) -> None:
+    if redis_utils.redis_client is None:
+        return
+
+    digest = _digest(token)
+    raw = await redis_utils.redis_client.getdel(REFRESH_TOKEN_KEY.format(digest=digest))
+    if raw is not None:
+        customer_id = json.loads(raw)["customerID"]
+        await redis_utils.redis_client.srem(
+            CUSTOMER_REFRESH_TOKENS_KEY.format(customer_id=customer_id), digest
+        )
+
+
+async def revoke_customer_refresh_tokens(customer_id: int) -> None:
+    if redis_utils.redis_client is None:
+        return
+
+    customer_key = CUSTOMER_REFRESH_TOKENS_KEY.format(customer_id=customer_id)
+    digests = await redis_utils.redis_client.smembers(customer_key)
+
+    keys = [REFRESH_TOKEN_KEY.format(digest=d.decode('utf-8')) for d in digests]
+    await redis_utils.redis_client.delete(customer_key, *keys)
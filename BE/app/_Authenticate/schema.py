@@ -20,4 +20,12 @@ class AccountLogin(BaseModel):
     
 class AccountPasswordReset(BaseModel):
     current_password : str
-    new_password: str
\ No newline at end of file
+    new_password: str
+    
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+    
+class RefreshedToken(BaseModel):
+    token: str
+    token_type: str
+    refresh_token: str
@@ -3,11 +3,15 @@ from datetime import datetime
 from typing import Dict, List
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 import requests
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 import os
 import shutil
 import uuid
-from ..database import get_db 
+from ..database import get_db
+from ..dependencies.read_routing import get_async_read_db
+from ..dependencies.topic_views import pending_views
 from . import schema, model
 from .._Semester import model as SemesterModel
 from .._Instructor import model as InstructorModel
@@ -23,6 +27,7 @@ from .._Topic import model as TopicModel
 from .._Announcement import model as AnnouncementModel
 from .._Customer import model as CustomerModel
 from ..dependencies.auth import get_current_active_user
+from ..storage import ensure_upload_dir, register_upload_dir
 # from .._Instructor import 
 from .._Student_Group.model import StudentGroupAssociation
 from .._Group.schema import GroupOutput
@@ -36,9 +41,7 @@ router = APIRouter(
 )
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-MATERIAL_UPLOAD_DIR = os.path.join(CURRENT_DIR, "..", "..", "uploads", "materials")
-
-os.makedirs(MATERIAL_UPLOAD_DIR, exist_ok=True)
+MATERIAL_UPLOAD_DIR = register_upload_dir(os.path.join(CURRENT_DIR, "..", "..", "uploads", "materials"))
 
 # create course
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -127,40 +130,36 @@ def read_all(db : Session = Depends(get_db)):
 
 # read topics for this course
 @router.get("/{course_id}/topics")
-def get_course_topics(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(model.Course).filter(model.Course.courseID == course_id).first()
-    if not course:
+async def get_course_topics(course_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    row = (
+        await db.execute(
+            select(model.Course, CustomerModel.Customer)
+            .outerjoin(CustomerModel.Customer, CustomerModel.Customer.customerID == model.Course.instructorID)
+            .where(model.Course.courseID == course_id)
+        )
+    ).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    course, customer = row
 
+    # reply_count is kept on the topic row, no per-topic count
     topics = (
-        db.query(TopicModel.Topic)
-        .filter(TopicModel.Topic.courseID == course_id)
-        .all()
-    )
-
-    result = []
-
-    for topic in topics:
-        reply_count = (
-            db.query(TopicModel.TopicChat)
-            .filter(TopicModel.TopicChat.topicID == topic.topicID)
-            .count()
+        await db.scalars(
+            select(TopicModel.Topic).where(TopicModel.Topic.courseID == course_id)
         )
+    ).all()
 
-        instructor_id = course.instructorID
-        instructor_name = None
-        instructor_role = "instructor"
+    # every topic of the course is shown as created by the course instructor
+    instructor_id = course.instructorID
+    instructor_name = customer.fullname if customer else None
+    instructor_role = customer.role if customer else "instructor"
 
-        if instructor_id is not None:
-            customer = (
-                db.query(CustomerModel.Customer)
-                .filter(CustomerModel.Customer.customerID == instructor_id)
-                .first()
-            )
-            if customer:
-                instructor_name = customer.fullname
-                instructor_role = customer.role
+    pending = await pending_views(topics)
+
+    result = []
 
+    for topic in topics:
+        reply_count = topic.reply_count or 0
         created_at = topic.created_at if getattr(topic, "created_at", None) else datetime.utcnow()
 
         result.append(
@@ -173,10 +172,10 @@ def get_course_topics(course_id: int, db: Session = Depends(get_db)):
                 "creator_role": instructor_role,
                 "title": topic.title,
                 "content": topic.description or "",
-                "view_count": reply_count,
+                "view_count": (topic.view_count or 0) + pending.get(topic.topicID, 0),
                 "reply_count": reply_count,
                 "created_at": created_at.isoformat(),
-                "updated_at": None,
+                "updated_at": topic.last_activity_at.isoformat() if topic.last_activity_at else None,
             }
         )
 
@@ -383,17 +382,17 @@ def delete(course_id : int, db : Session = Depends(get_db)):
 
 # get course content
 @router.get("/{course_id}/content")
-def get_course_content(
+async def get_course_content(
     course_id: int,
     content_id: int = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    course = db.query(model.Course).filter(model.Course.courseID == course_id).first()
+    course = await db.get(model.Course, course_id)
     if not course:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
 
     base_query = (
-        db.query(
+        select(
             ContentModel.LearningContent.contentID.label("content_id"),
             model.Course.courseID.label("course_id"),
             model.Course.course_name.label("course_name"),
@@ -420,20 +419,18 @@ def get_course_content(
             FileImageModel.FileImage,
             ContentModel.LearningContent.contentID == FileImageModel.FileImage.contentID,
         )
-        .filter(model.Course.courseID == course_id)
+        .where(model.Course.courseID == course_id)
     )
 
     if content_id is not None:
-        result = base_query.filter(
-            ContentModel.LearningContent.contentID == content_id
+        result = (
+            await db.execute(
+                base_query.where(ContentModel.LearningContent.contentID == content_id)
+            )
         ).first()
 
         if not result:
-            content_exists = (
-                db.query(ContentModel.LearningContent)
-                .filter(ContentModel.LearningContent.contentID == content_id)
-                .first()
-            )
+            content_exists = await db.get(ContentModel.LearningContent, content_id)
 
             if not content_exists:
                 detail_msg = f"Learning Content with ID {content_id} not found."
@@ -449,7 +446,7 @@ def get_course_content(
 
         items = [result]
     else:
-        items = base_query.all()
+        items = (await db.execute(base_query)).all()
 
     content_list = []
     session_number = 1
@@ -477,12 +474,9 @@ from fastapi import status
 from uuid import uuid4
 import os
 import shutil
-from pathlib import Path
-
-MATERIAL_UPLOAD_DIR = Path(__file__).parent / "uploads/materials"
 
 @router.post("/{course_id}/materials/files")
-async def upload_course_material_file(
+def upload_course_material_file(
     course_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -505,7 +499,7 @@ async def upload_course_material_file(
 
     file_extension = os.path.splitext(file.filename or "")[1]
     unique_filename = f"material_{course_id}_{db_content.contentID}_{uuid4()}{file_extension}"
-    file_path_on_disk = os.path.join(MATERIAL_UPLOAD_DIR, unique_filename)
+    file_path_on_disk = os.path.join(ensure_upload_dir(MATERIAL_UPLOAD_DIR), unique_filename)
 
     try:
         with open(file_path_on_disk, "wb") as buffer:
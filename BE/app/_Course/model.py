@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey, Text, Enum
+from sqlalchemy import Column, Index, String, DateTime, Float, Integer, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -6,6 +6,10 @@ from ..database import Base
 
 class Course(Base):
     __tablename__ = "Courses"
+    __table_args__ = (
+        # instructor dashboards, optionally narrowed to a semester
+        Index("ix_Courses_instructorID_semesterID", "instructorID", "semesterID"),
+    )
     
     courseID = Column(Integer, primary_key=True, index=True)
     
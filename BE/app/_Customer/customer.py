@@ -12,19 +12,13 @@ from .._Semester import schema as SemesterSchema
 from .._Course.model import Course
 from .._Group.model import Group
 from .._Student_Group.model import StudentGroupAssociation
+from ..dependencies.principal_cache import principal_cache
+from ..dependencies.token_revocation import revoke_customer_tokens_from_thread
+from ..storage import ensure_upload_dir, register_upload_dir
 
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__)) 
-UPLOAD_DIR = os.path.join(CURRENT_DIR, '..', '..', 'uploads')
-
-if not os.path.exists(UPLOAD_DIR):
-    try:
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        print(f"Created UPLOAD_DIR: {UPLOAD_DIR}")
-    except Exception as e:
-        # Xử lý lỗi nếu không có quyền tạo thư mục
-        print(f"ERROR: Could not create UPLOAD_DIR: {e}")
-        # Bạn có thể cân nhắc raise lỗi tại đây nếu đây là lỗi nghiêm trọng
+UPLOAD_DIR = register_upload_dir(os.path.join(CURRENT_DIR, '..', '..', 'uploads'))
 
 router = APIRouter(
     prefix="/customers",
@@ -34,7 +28,7 @@ router = APIRouter(
 def save_avatar_file(file_upload: UploadFile, customer_id: str):
     file_extension = os.path.splitext(file_upload.filename)[1]
     unique_filename = f"customer_{customer_id}_{uuid.uuid4()}{file_extension}"
-    file_path_on_disk = os.path.join(UPLOAD_DIR, unique_filename)
+    file_path_on_disk = os.path.join(ensure_upload_dir(UPLOAD_DIR), unique_filename)
 
     try:
         with open(file_path_on_disk, "wb") as buffer:
@@ -163,12 +157,20 @@ def update(
                 detail=f"Error saving new avatar file: {e}"
             )
     
+    role_changed = "role" in update_data and update_data["role"] != db_customer.role
+
     for key, value in update_data.items():
         setattr(db_customer, key, value)
 
     db.commit()
     db.refresh(db_customer)
     
+    # tokens carry the role as a claim, so a role change must retire them
+    if role_changed:
+        revoke_customer_tokens_from_thread(customer_id)
+    else:
+        principal_cache.invalidate_customer(customer_id)
+    
     return db_customer
     
 # delete customer
@@ -181,6 +183,7 @@ def delete(customer_id : int, db : Session = Depends(get_db)):
     
     db.delete(db_customer)
     db.commit()
+    revoke_customer_tokens_from_thread(customer_id)
     
     return
 
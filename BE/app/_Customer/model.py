@@ -20,15 +20,3 @@ class Customer(Base):
     # account = relationship("Account", back_populates="customer")
     instructor = relationship("Instructor", back_populates="customer")
     student = relationship("Student", back_populates="customer")
-    
-    def verify_password(self, plain_password: str) -> bool:
-        """Compares a plain text password with the stored hash."""
-        import bcrypt
-        try:
-            return bcrypt.checkpw(
-                plain_password.encode('utf-8'),
-                self.password.encode('utf-8')
-            )
-        except (ValueError, TypeError):
-            return False
-
@@ -35,6 +35,7 @@ class TokenWithCustomer(BaseModel):
     token: str
     token_type: str
     customer: CustomerRead
+    refresh_token: Optional[str] = None
 
 class CustomerUpdate(BaseModel):
     fullname: Optional[str] = None
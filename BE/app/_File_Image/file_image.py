@@ -6,15 +6,14 @@ from . import schema, model
 from .._Learning_Content import model as Learning_ContentModel
 from fastapi import File, UploadFile, Form
 from ..dependencies.auth import get_current_active_user
+from ..storage import ensure_upload_dir, register_upload_dir
 import os
 import uuid
 import shutil
 from datetime import datetime, timezone
 from fastapi.responses import FileResponse
 
-UPLOAD_DIR = "static/uploads"
-
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+UPLOAD_DIR = register_upload_dir("static/uploads")
 
 router = APIRouter(
     prefix="/resources",
@@ -23,7 +22,7 @@ router = APIRouter(
 
 # create resource
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def create(
+def create(
     file : UploadFile = File(..., description="File content to upload."),
     content_id : int = Form(..., description="ID of this content."),
     db: Session = Depends(get_db),
@@ -41,7 +40,7 @@ async def create(
     # save to disk
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{content_id}_{uuid.uuid4()}{file_extension}"
-    file_path_on_disk = os.path.join(UPLOAD_DIR, unique_filename)
+    file_path_on_disk = os.path.join(ensure_upload_dir(UPLOAD_DIR), unique_filename)
     
     try:
         with open(file_path_on_disk, "wb") as buffer:
@@ -50,7 +49,7 @@ async def create(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail=f"Failed to save file to disk: {e}")
     finally:
-        await file.close()
+        file.file.close()
     
     db_resource = model.FileImage(
         path = file_path_on_disk,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, Integer, ForeignKey, Text, Enum
+from sqlalchemy import Column, Index, String, DateTime, Float, Integer, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -6,6 +6,10 @@ from ..database import Base
 
 class Group(Base):
     __tablename__ = "Groups"
+    __table_args__ = (
+        # groups of a course: instructor summary, course pages
+        Index("ix_Groups_courseID", "courseID"),
+    )
     
     groupID = Column(Integer, primary_key=True, index=True)
     id = Column(Integer, nullable=False) # group 1, 2, 3 for each courses
@@ -4,6 +4,7 @@ from datetime import datetime
 
 from sqlalchemy import distinct, func, literal_column, select
 from .schema import InstructorCreate
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from . import model, schema
 from .._Customer import model as CustomerModel
@@ -18,6 +19,7 @@ from .._Student_Group.model import StudentGroupAssociation
 from .._Student_Score.model import StudentScore
 from .._Customer.model import Customer
 from ..database import get_db
+from ..dependencies.read_routing import get_async_read_db, get_read_db
 
 router = APIRouter(
     prefix="/instructors",
@@ -53,7 +55,7 @@ def create_instructor(db: Session, instructor_data: schema.InstructorCreate):
     status_code=status.HTTP_201_CREATED,
     summary="Register a new instructor"
 )
-async def register_instructor(instructor_data: schema.InstructorCreate, db: Session = Depends(get_db)):
+def register_instructor(instructor_data: schema.InstructorCreate, db: Session = Depends(get_db)):
     return create_instructor(db, instructor_data)
 
 
@@ -62,7 +64,7 @@ async def register_instructor(instructor_data: schema.InstructorCreate, db: Sess
     response_model=schema.Instructor,
     summary="Get instructor details by ID"
 )
-async def read_instructor(instructor_id: int, db: Session = Depends(get_db)):
+def read_instructor(instructor_id: int, db: Session = Depends(get_db)):
     db_instructor = db.query(model.Instructor).filter(model.Instructor.instructorID == instructor_id).first()
     if db_instructor is None:
         raise HTTPException(
@@ -77,7 +79,7 @@ async def read_instructor(instructor_id: int, db: Session = Depends(get_db)):
     response_model=List[schema.Instructor],
     summary="Get a list of all instructors"
 )
-async def read_instructors(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
+def read_instructors(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
     instructors = db.query(model.Instructor).offset(skip).limit(limit).all()
     return instructors
 
@@ -87,7 +89,7 @@ async def read_instructors(db: Session = Depends(get_db), skip: int = 0, limit:
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete an instructor entry"
 )
-async def delete_instructor(instructor_id: int, db: Session = Depends(get_db)):
+def delete_instructor(instructor_id: int, db: Session = Depends(get_db)):
     db_instructor = db.query(model.Instructor).filter(model.Instructor.instructorID == instructor_id).first()
     if db_instructor is None:
         raise HTTPException(
@@ -99,32 +101,14 @@ async def delete_instructor(instructor_id: int, db: Session = Depends(get_db)):
     db.commit()
     return None
 
-# summary
-@router.get("/{instructor_id}/summary")
-def get_instructor_summary(
-    instructor_id: int,
-    semester_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-):
-    if not db.get(model.Instructor, instructor_id):
-        raise HTTPException(
-            status_code=404,
-            detail=f"Instructor with ID {instructor_id} not found",
-        )
-
-    total_courses_query = db.query(
+def _summary_queries(instructor_id: int, semester_id: Optional[int]):
+    """(course count, group/assignment/student counts, quiz count) statements of the summary."""
+    total_courses_query = select(
         func.count(distinct(Course.courseID))
-    ).filter(Course.instructorID == instructor_id)
-
-    if semester_id is not None:
-        total_courses_query = total_courses_query.filter(
-            Course.semesterID == semester_id
-        )
-
-    total_courses = total_courses_query.scalar() or 0
+    ).where(Course.instructorID == instructor_id)
 
     group_metrics_query = (
-        db.query(
+        select(
             # 3. Total Groups
             func.count(distinct(Group.groupID)).label("total_groups"),
             # 4. Total Assignments
@@ -143,31 +127,43 @@ def get_instructor_summary(
             StudentGroupAssociation,
             Group.groupID == StudentGroupAssociation.groupID,
         )
-        .filter(Course.instructorID == instructor_id)
+        .where(Course.instructorID == instructor_id)
     )
 
-    if semester_id is not None:
-        group_metrics_query = group_metrics_query.filter(
-            Course.semesterID == semester_id
-        )
-
-    group_metrics = group_metrics_query.first()
-
     total_quizzes_query = (
-        db.query(func.count(distinct(Quiz.quizID)))
+        select(func.count(distinct(Quiz.quizID)))
         .select_from(Course)
         .join(Group, Course.courseID == Group.courseID)
         .join(StudentScore, Group.groupID == StudentScore.groupID)
         .join(Quiz, StudentScore.quizID == Quiz.quizID)
-        .filter(Course.instructorID == instructor_id)
+        .where(Course.instructorID == instructor_id)
     )
 
     if semester_id is not None:
-        total_quizzes_query = total_quizzes_query.filter(
-            Course.semesterID == semester_id
+        total_courses_query = total_courses_query.where(Course.semesterID == semester_id)
+        group_metrics_query = group_metrics_query.where(Course.semesterID == semester_id)
+        total_quizzes_query = total_quizzes_query.where(Course.semesterID == semester_id)
+
+    return total_courses_query, group_metrics_query, total_quizzes_query
+
+# summary
+@router.get("/{instructor_id}/summary")
+async def get_instructor_summary(
+    instructor_id: int,
+    semester_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    if not await db.get(model.Instructor, instructor_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Instructor with ID {instructor_id} not found",
         )
 
-    total_quizzes = total_quizzes_query.scalar() or 0
+    total_courses_query, group_metrics_query, total_quizzes_query = _summary_queries(instructor_id, semester_id)
+
+    total_courses = await db.scalar(total_courses_query) or 0
+    group_metrics = (await db.execute(group_metrics_query)).first()
+    total_quizzes = await db.scalar(total_quizzes_query) or 0
 
     return {
         "id": instructor_id,
@@ -182,7 +178,7 @@ def get_instructor_summary(
 def get_instructor_courses(
     instructor_id: int, 
     semester_id: Optional[int] = None, 
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if not db.get(model.Instructor, instructor_id):
         raise HTTPException(
@@ -211,7 +207,7 @@ def get_instructor_courses(
 def get_instructor_students(
     instructor_id: int,
     semester_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     if not db.get(model.Instructor, instructor_id):
         raise HTTPException(
@@ -1,11 +1,15 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import or_, and_, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, func, or_, and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
-from ..database import get_db
+from ..database import get_async_db, get_db
+from ..dependencies.read_routing import get_async_read_db
+from ..dependencies.unread_counters import adjust_unread_messages_from_thread, get_unread_messages
 from . import model as MessageModel, schema as MessageSchema
 from .._Customer import model as CustomerModel
 
@@ -20,36 +24,21 @@ user_router = APIRouter(
     tags=["Messages"],
 )
 
+CONVERSATION_PAGE_SIZE = 50
+CONVERSATION_MAX_PAGE_SIZE = 200
 
-def _serialize_message(db: Session, msg: MessageModel.Message, viewer_id: int | None = None) -> MessageSchema.MessageRead:
-    sender = (
-        db.query(CustomerModel.Customer)
-        .filter(CustomerModel.Customer.customerID == msg.senderID)
-        .first()
-    )
-    receiver = (
-        db.query(CustomerModel.Customer)
-        .filter(CustomerModel.Customer.customerID == msg.receiverID)
-        .first()
-    )
 
+def _message_read(
+    msg: MessageModel.Message,
+    sender: CustomerModel.Customer | None,
+    receiver: CustomerModel.Customer | None,
+    is_read: bool,
+) -> MessageSchema.MessageRead:
     sender_name = sender.fullname if sender else None
     sender_role = sender.role if sender else "student"
     receiver_name = receiver.fullname if receiver else None
     receiver_role = receiver.role if receiver else "instructor"
 
-    is_read = False
-    if viewer_id is not None and msg.receiverID == viewer_id:
-        existing = (
-            db.query(MessageModel.MessageRead)
-            .filter(
-                MessageModel.MessageRead.messageID == msg.messageID,
-                MessageModel.MessageRead.userID == viewer_id,
-            )
-            .first()
-        )
-        is_read = existing is not None
-
     sent_at = msg.created_at if getattr(msg, "created_at", None) else datetime.utcnow()
 
     return MessageSchema.MessageRead(
@@ -66,6 +55,242 @@ def _serialize_message(db: Session, msg: MessageModel.Message, viewer_id: int |
     )
 
 
+def _serialize_message(db: Session, msg: MessageModel.Message, viewer_id: int | None = None) -> MessageSchema.MessageRead:
+    sender = (
+        db.query(CustomerModel.Customer)
+        .filter(CustomerModel.Customer.customerID == msg.senderID)
+        .first()
+    )
+    receiver = (
+        db.query(CustomerModel.Customer)
+        .filter(CustomerModel.Customer.customerID == msg.receiverID)
+        .first()
+    )
+
+    is_read = False
+    if viewer_id is not None and msg.receiverID == viewer_id:
+        watermark = (
+            db.query(MessageModel.ConversationRead.last_read_messageID)
+            .filter(
+                MessageModel.ConversationRead.userID == viewer_id,
+                MessageModel.ConversationRead.counterpartID == msg.senderID,
+            )
+            .scalar()
+        )
+        is_read = watermark is not None and msg.messageID <= watermark
+
+    return _message_read(msg, sender, receiver, is_read)
+
+
+async def _serialize_messages(
+    db: AsyncSession, msgs: List[MessageModel.Message], viewer_id: int
+) -> List[MessageSchema.MessageRead]:
+    """Async, batched `_serialize_message`: one query for the participants, one for the read watermarks."""
+    customers = {}
+    customer_ids = {m.senderID for m in msgs} | {m.receiverID for m in msgs}
+    if customer_ids:
+        result = await db.scalars(
+            select(CustomerModel.Customer).where(CustomerModel.Customer.customerID.in_(customer_ids))
+        )
+        customers = {c.customerID: c for c in result}
+
+    watermarks = {}
+    sender_ids = {m.senderID for m in msgs if m.receiverID == viewer_id}
+    if sender_ids:
+        result = await db.execute(
+            select(
+                MessageModel.ConversationRead.counterpartID,
+                MessageModel.ConversationRead.last_read_messageID,
+            ).where(
+                MessageModel.ConversationRead.userID == viewer_id,
+                MessageModel.ConversationRead.counterpartID.in_(sender_ids),
+            )
+        )
+        watermarks = dict(result.all())
+
+    return [
+        _message_read(
+            m,
+            customers.get(m.senderID),
+            customers.get(m.receiverID),
+            m.receiverID == viewer_id and m.messageID <= watermarks.get(m.senderID, 0),
+        )
+        for m in msgs
+    ]
+
+
+def _advance_watermark(db: Session, user_id: int, counterpart_id: int, message_id: int) -> int:
+    """
+    Moves the read watermark of `user_id` in the conversation with `counterpart_id`
+    up to `message_id`. Never moves it back.
+
+    Returns how many messages became read.
+    """
+    ConversationRead = MessageModel.ConversationRead
+    Message = MessageModel.Message
+
+    while True:
+        previous = (
+            db.query(ConversationRead.last_read_messageID)
+            .filter(ConversationRead.userID == user_id, ConversationRead.counterpartID == counterpart_id)
+            .scalar()
+        )
+        if previous is not None and previous >= message_id:
+            db.rollback()
+            return 0
+
+        if previous is None:
+            db.add(ConversationRead(userID=user_id, counterpartID=counterpart_id, last_read_messageID=message_id))
+            try:
+                db.commit()
+                break
+            except IntegrityError:
+                # inserted concurrently: go again as an update
+                db.rollback()
+                continue
+
+        # compare-and-set, so a concurrent mark can't move the watermark back
+        moved = (
+            db.query(ConversationRead)
+            .filter(
+                ConversationRead.userID == user_id,
+                ConversationRead.counterpartID == counterpart_id,
+                ConversationRead.last_read_messageID == previous,
+            )
+            .update(
+                {ConversationRead.last_read_messageID: message_id, ConversationRead.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if moved:
+            break
+
+    return (
+        db.query(func.count(Message.messageID))
+        .filter(
+            Message.receiverID == user_id,
+            Message.senderID == counterpart_id,
+            Message.messageID > (previous or 0),
+            Message.messageID <= message_id,
+        )
+        .scalar()
+    )
+
+
+def _conversation_query(user1_id: int, user2_id: int, before_id: int | None, limit: int):
+    """
+    (message, user1's read watermark) for one page of the conversation, newest
+    first: the `limit` messages sent before `before_id`, or the latest ones.
+    """
+    Message = MessageModel.Message
+    ConversationRead = MessageModel.ConversationRead
+
+    query = (
+        select(Message, ConversationRead.last_read_messageID)
+        .outerjoin(
+            ConversationRead,
+            and_(
+                ConversationRead.userID == user1_id,
+                ConversationRead.counterpartID == user2_id,
+            ),
+        )
+        .where(
+            or_(
+                and_(Message.senderID == user1_id, Message.receiverID == user2_id),
+                and_(Message.senderID == user2_id, Message.receiverID == user1_id),
+            )
+        )
+    )
+
+    if before_id is not None:
+        # keyset on (created_at, messageID), the order of the conversation index
+        cursor_at = select(Message.created_at).where(Message.messageID == before_id).scalar_subquery()
+        query = query.where(
+            or_(
+                Message.created_at < cursor_at,
+                and_(Message.created_at == cursor_at, Message.messageID < before_id),
+            )
+        )
+
+    return query.order_by(Message.created_at.desc(), Message.messageID.desc()).limit(limit)
+
+
+def _unread_counts(user_id: int):
+    """
+    (counterpart_id, unread_count) for every sender of `user_id`.
+
+    Each count is a range on ix_Messages_receiverID_senderID_messageID:
+    (receiverID, senderID) fixed, messageID above the read watermark.
+    """
+    Message = MessageModel.Message
+    ConversationRead = MessageModel.ConversationRead
+
+    senders = (
+        select(Message.senderID.label("counterpart_id"))
+        .where(Message.receiverID == user_id)
+        .distinct()
+        .subquery()
+    )
+    Unread = aliased(Message)
+    unread_count = (
+        select(func.count(Unread.messageID))
+        .where(
+            Unread.receiverID == user_id,
+            Unread.senderID == senders.c.counterpart_id,
+            Unread.messageID > func.coalesce(ConversationRead.last_read_messageID, 0),
+        )
+        .correlate(senders, ConversationRead)
+        .scalar_subquery()
+    )
+
+    return (
+        select(senders.c.counterpart_id, unread_count.label("unread_count"))
+        .outerjoin(
+            ConversationRead,
+            and_(
+                ConversationRead.userID == user_id,
+                ConversationRead.counterpartID == senders.c.counterpart_id,
+            ),
+        )
+        .subquery()
+    )
+
+
+def _unread_total_query(user_id: int):
+    """How many messages `user_id` has not read, over every conversation."""
+    unread = _unread_counts(user_id)
+    return select(func.coalesce(func.sum(unread.c.unread_count), 0))
+
+
+def _conversations_query(user_id: int):
+    """Inbox rows (latest message, counterpart, unread count) per counterpart of `user_id`, newest first."""
+    Message = MessageModel.Message
+    Customer = CustomerModel.Customer
+
+    counterpart = case(
+        (Message.senderID == user_id, Message.receiverID),
+        else_=Message.senderID,
+    ).label("counterpart_id")
+
+    # messageID grows with created_at, so max() is the latest message of each conversation
+    per_counterpart = (
+        select(counterpart, func.max(Message.messageID).label("last_message_id"))
+        .where(or_(Message.senderID == user_id, Message.receiverID == user_id))
+        .group_by(counterpart)
+        .subquery()
+    )
+    unread = _unread_counts(user_id)
+
+    return (
+        select(Message, Customer, unread.c.unread_count)
+        .join(per_counterpart, Message.messageID == per_counterpart.c.last_message_id)
+        .outerjoin(Customer, Customer.customerID == per_counterpart.c.counterpart_id)
+        .outerjoin(unread, unread.c.counterpart_id == per_counterpart.c.counterpart_id)
+        .order_by(Message.messageID.desc())
+    )
+
+
 @router.post("/", response_model=MessageSchema.MessageRead, status_code=status.HTTP_201_CREATED)
 def create_message(payload: MessageSchema.MessageCreate, db: Session = Depends(get_db)) -> MessageSchema.MessageRead:
     msg = MessageModel.Message(
@@ -77,6 +302,8 @@ def create_message(payload: MessageSchema.MessageCreate, db: Session = Depends(g
     db.add(msg)
     db.commit()
     db.refresh(msg)
+
+    adjust_unread_messages_from_thread(msg.receiverID, 1)
     return _serialize_message(db, msg, viewer_id=payload.receiver_id)
 
 
@@ -84,26 +311,35 @@ def create_message(payload: MessageSchema.MessageCreate, db: Session = Depends(g
     "/conversation/{user1_id}/{user2_id}",
     response_model=List[MessageSchema.MessageRead],
 )
-def get_conversation(user1_id: int, user2_id: int, db: Session = Depends(get_db)) -> List[MessageSchema.MessageRead]:
-    msgs = (
-        db.query(MessageModel.Message)
-        .filter(
-            or_(
-                and_(
-                    MessageModel.Message.senderID == user1_id,
-                    MessageModel.Message.receiverID == user2_id,
-                ),
-                and_(
-                    MessageModel.Message.senderID == user2_id,
-                    MessageModel.Message.receiverID == user1_id,
-                ),
-            )
-        )
-        .order_by(MessageModel.Message.created_at.asc())
-        .all()
+async def get_conversation(
+    user1_id: int,
+    user2_id: int,
+    before_id: int | None = Query(None, ge=1),
+    limit: int = Query(CONVERSATION_PAGE_SIZE, ge=1, le=CONVERSATION_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> List[MessageSchema.MessageRead]:
+    """
+    One page of the conversation, oldest first: the `limit` messages sent before
+    `before_id` (or the latest ones). Pass the first message_id of a page as
+    `before_id` to load the page before it.
+    """
+    rows = (await db.execute(_conversation_query(user1_id, user2_id, before_id, limit))).all()
+
+    participants = await db.scalars(
+        select(CustomerModel.Customer).where(CustomerModel.Customer.customerID.in_((user1_id, user2_id)))
     )
+    customers = {c.customerID: c for c in participants}
 
-    return [_serialize_message(db, m, viewer_id=user1_id) for m in msgs]
+    return [
+        _message_read(
+            msg,
+            customers.get(msg.senderID),
+            customers.get(msg.receiverID),
+            # only the viewer's received messages have a read state
+            msg.receiverID == user1_id and watermark is not None and msg.messageID <= watermark,
+        )
+        for msg, watermark in reversed(rows)
+    ]
 
 
 @router.delete("/{message_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -116,9 +352,23 @@ def delete_message(message_id: int, db: Session = Depends(get_db)) -> None:
     if not msg:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
 
+    watermark = (
+        db.query(MessageModel.ConversationRead.last_read_messageID)
+        .filter(
+            MessageModel.ConversationRead.userID == msg.receiverID,
+            MessageModel.ConversationRead.counterpartID == msg.senderID,
+        )
+        .scalar()
+    )
+    was_unread = msg.messageID > (watermark or 0)
+    receiver_id = msg.receiverID
+
     db.delete(msg)
     db.commit()
 
+    if was_unread:
+        adjust_unread_messages_from_thread(receiver_id, -1)
+
 
 @router.put("/{message_id}/read", status_code=status.HTTP_204_NO_CONTENT)
 def mark_message_read(message_id: int, db: Session = Depends(get_db)) -> None:
@@ -130,58 +380,82 @@ def mark_message_read(message_id: int, db: Session = Depends(get_db)) -> None:
     if not msg:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Message not found")
 
-    receiver_id = msg.receiverID
-    existing = (
-        db.query(MessageModel.MessageRead)
+    # reading a message reads everything before it in the conversation
+    newly_read = _advance_watermark(db, msg.receiverID, msg.senderID, message_id)
+    adjust_unread_messages_from_thread(msg.receiverID, -newly_read)
+
+
+@router.put("/conversation/{user_id}/{other_id}/read", status_code=status.HTTP_204_NO_CONTENT)
+def mark_conversation_read(
+    user_id: int,
+    other_id: int,
+    payload: MessageSchema.ConversationReadUpdate | None = None,
+    db: Session = Depends(get_db),
+) -> None:
+    """Marks every message `other_id` sent to `user_id` up to `up_to_id` (default: the latest) as read."""
+    latest = (
+        db.query(func.max(MessageModel.Message.messageID))
         .filter(
-            MessageModel.MessageRead.messageID == message_id,
-            MessageModel.MessageRead.userID == receiver_id,
+            MessageModel.Message.senderID == other_id,
+            MessageModel.Message.receiverID == user_id,
         )
-        .first()
+        .scalar()
     )
-    if not existing:
-        db.add(
-            MessageModel.MessageRead(
-                messageID=message_id,
-                userID=receiver_id,
-            )
-        )
-        db.commit()
+    if latest is None:
+        return
+
+    up_to_id = latest
+    if payload is not None and payload.up_to_id is not None:
+        up_to_id = min(payload.up_to_id, latest)
+
+    newly_read = _advance_watermark(db, user_id, other_id, up_to_id)
+    adjust_unread_messages_from_thread(user_id, -newly_read)
 
 
 @user_router.get("/{user_id}/messages")
-def get_user_messages(user_id: int, db: Session = Depends(get_db)):
+async def get_user_messages(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
     msgs = (
-        db.query(MessageModel.Message)
-        .filter(
-            or_(
-                MessageModel.Message.senderID == user_id,
-                MessageModel.Message.receiverID == user_id,
+        await db.scalars(
+            select(MessageModel.Message)
+            .where(
+                or_(
+                    MessageModel.Message.senderID == user_id,
+                    MessageModel.Message.receiverID == user_id,
+                )
             )
+            .order_by(MessageModel.Message.created_at.asc())
         )
-        .order_by(MessageModel.Message.created_at.asc())
-        .all()
-    )
+    ).all()
 
-    data = [_serialize_message(db, m, viewer_id=user_id) for m in msgs]
+    data = await _serialize_messages(db, msgs, viewer_id=user_id)
     return {"messages": data}
 
 
-@user_router.get("/{user_id}/messages/unread-count")
-def get_unread_message_count(user_id: int, db: Session = Depends(get_db)):
-    subq = (
-        db.query(MessageModel.MessageRead.messageID)
-        .filter(MessageModel.MessageRead.userID == user_id)
-        .subquery()
-    )
+@user_router.get("/{user_id}/conversations")
+async def get_user_conversations(user_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Inbox: one row per counterpart with the latest message and the unread count, newest first."""
+    rows = await db.execute(_conversations_query(user_id))
 
-    unread = (
-        db.query(MessageModel.Message)
-        .filter(
-            MessageModel.Message.receiverID == user_id,
-            ~MessageModel.Message.messageID.in_(select(subq.c.messageID)),
+    conversations = [
+        MessageSchema.ConversationSummary(
+            counterpart_id=msg.receiverID if msg.senderID == user_id else msg.senderID,
+            counterpart_name=other.fullname if other else None,
+            counterpart_role=other.role if other else None,
+            last_message_id=msg.messageID,
+            last_message=msg.content,
+            last_sender_id=msg.senderID,
+            last_message_at=msg.created_at,
+            unread_count=int(unread_count or 0),
         )
-        .count()
-    )
+        for msg, other, unread_count in rows
+    ]
+    return {"conversations": conversations}
+
+
+@user_router.get("/{user_id}/messages/unread-count")
+async def get_unread_message_count(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    # seeds the shared counter, so counted on the primary rather than a lagging replica
+    async def count_from_db() -> int:
+        return int(await db.scalar(_unread_total_query(user_id)))
 
-    return {"count": unread}
+    return {"count": await get_unread_messages(user_id, count_from_db)}
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -8,6 +8,12 @@ from ..database import Base
 
 class Message(Base):
     __tablename__ = "Messages"
+    __table_args__ = (
+        # conversation between two customers, in time order
+        Index("ix_Messages_senderID_receiverID_created_at", "senderID", "receiverID", "created_at"),
+        # unread counts: messages from one sender above the read watermark
+        Index("ix_Messages_receiverID_senderID_messageID", "receiverID", "senderID", "messageID"),
+    )
 
     messageID = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
@@ -19,8 +25,14 @@ class Message(Base):
     receiver = relationship("Customer", foreign_keys=[receiverID])
 
 
-class MessageRead(Base):
-    __tablename__ = "Message_Read"
+class ConversationRead(Base):
+    """
+    Read watermark: `userID` has read every message `counterpartID` sent them
+    up to and including `last_read_messageID`.
+    """
+    __tablename__ = "Conversation_Reads"
 
-    messageID = Column(Integer, ForeignKey("Messages.messageID", ondelete="CASCADE"), primary_key=True)
     userID = Column(Integer, ForeignKey("Customers.customerID", ondelete="CASCADE"), primary_key=True)
+    counterpartID = Column(Integer, ForeignKey("Customers.customerID", ondelete="CASCADE"), primary_key=True)
+    last_read_messageID = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -27,3 +27,18 @@ class MessageRead(BaseModel):
     content: str
     is_read: bool
     sent_at: datetime
+
+
+class ConversationSummary(BaseModel):
+    counterpart_id: int
+    counterpart_name: Optional[str] = None
+    counterpart_role: Optional[str] = None
+    last_message_id: int
+    last_message: str
+    last_sender_id: int
+    last_message_at: Optional[datetime] = None
+    unread_count: int
+
+
+class ConversationReadUpdate(BaseModel):
+    up_to_id: Optional[int] = None
@@ -0,0 +1,38 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter
+
+from .._Authenticate.hashing import current_policy, hash_pool
+from ..database import async_engine, async_read_engine, engine, pool_status, read_engine
+from ..dependencies.loop_monitor import loop_monitor
+from .slow_queries import slow_query_log
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@router.get("/password-hashing")
+def get_password_hashing_metrics():
+    return {**hash_pool.snapshot(), "policy": asdict(current_policy)}
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics():
+    status = {**pool_status(), "async": pool_status(async_engine)}
+    if read_engine is not engine:
+        status["replica"] = pool_status(read_engine)
+    if async_read_engine is not async_engine:
+        status["async_replica"] = pool_status(async_read_engine)
+    return status
+
+
+@router.get("/event-loop")
+def get_event_loop_metrics():
+    return loop_monitor.snapshot()
+
+
+@router.get("/slow-queries")
+def get_slow_queries():
+    return slow_query_log.snapshot()
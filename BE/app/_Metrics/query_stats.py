@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import QUERY_REPEAT_WARN_THRESHOLD
+from .slow_queries import slow_query_log
+
+
+class QueryStats:
+    """SQL statements run on behalf of one request (or one `track_queries` block)."""
+
+    def __init__(self, label: str = "", scope: Optional[dict] = None):
+        self.label = label
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route ("/topics/{topic_id}"), falling back to the label."""
+        # routing fills scope["route"] in place, after the middleware created the stats
+        route = self.scope.get("route") if self.scope is not None else None
+        return getattr(route, "path", None) or self.label
+
+    def record(self, statement: str, elapsed: float) -> None:
+        # sync endpoints and dependencies run in the threadpool, async ones on the loop
+        with self._lock:
+            self.count += 1
+            self.seconds += elapsed
+            if QUERY_REPEAT_WARN_THRESHOLD:
+                self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        """Statements run at least `threshold` times: one query per row, i.e. N+1."""
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(label: str = "", scope: Optional[dict] = None):
+    """
+    Counts the queries run inside the block, including in threadpool calls made from it.
+
+        with track_queries() as stats:
+            client.get("/users/1/messages")
+        assert stats.count <= 3
+    """
+    stats = QueryStats(label, scope)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+    if QUERY_REPEAT_WARN_THRESHOLD:
+        for statement, n in stats.repeated(QUERY_REPEAT_WARN_THRESHOLD):
+            print(f"WARNING: possible N+1 in {label or 'request'}: ran {n} times: {statement[:200]}")
+
+
+# Engine-wide: covers the primary, the replica and the sync side of the async engines.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if slow_query_log.enabled:
+        slow_query_log.observe(conn, statement, parameters, executemany, elapsed, stats)
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
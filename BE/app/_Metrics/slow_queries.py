@@ -0,0 +1,157 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from ..config import SLOW_QUERY_EXPLAIN, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_THRESHOLD_MS
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduces a statement to its shape: literals and placeholders become `?`,
+    IN lists of any length collapse to `IN (...)`.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Type names of the bound parameters, never their values."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _explain_engine(engine):
+    """Sync engine to EXPLAIN with: the async engines' cursor events report their sync facade."""
+    if not engine.dialect.is_async:
+        return engine
+
+    from ..database import async_engine, async_read_engine, engine as primary_engine, read_engine
+
+    if engine is async_read_engine.sync_engine and async_read_engine is not async_engine:
+        return read_engine
+    if engine is async_engine.sync_engine:
+        return primary_engine
+    return None
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of statements slower than `threshold_ms`.
+
+    Each entry keeps the normalized SQL, the parameter types, the duration and
+    the route it ran for. The first time a shape shows up, its EXPLAIN is run
+    on a single background thread (never on the request) and attached to every
+    entry of that shape.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool):
+        self.threshold = threshold_ms / 1000
+        self.size = size
+        self.explain = explain
+        self.total = 0
+        self._entries: deque = deque(maxlen=size)
+        self._plans: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def observe(self, conn, statement: str, parameters, executemany: bool, elapsed: float, stats=None) -> None:
+        if elapsed < self.threshold or statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        shape = normalize_sql(statement)
+        entry = {
+            "at": time.time(),
+            "ms": round(elapsed * 1000, 1),
+            "route": stats.route if stats is not None else None,
+            "sql": shape,
+            "params": parameter_shape(parameters, executemany),
+        }
+
+        with self._lock:
+            self.total += 1
+            self._entries.append(entry)
+            first_seen = shape not in self._plans
+            if first_seen:
+                self._plans[shape] = None
+                # shapes of entries that already left the ring are not needed anymore
+                while len(self._plans) > self.size:
+                    self._plans.popitem(last=False)
+
+        print(f"WARNING: slow query ({elapsed * 1000:.0f} ms) in {entry['route'] or 'background'}: {shape[:200]}")
+
+        if first_seen and self.explain and not executemany and shape.upper().startswith("SELECT"):
+            self._submit_explain(conn.engine, shape, statement, parameters)
+
+    def _submit_explain(self, engine, shape: str, statement: str, parameters) -> None:
+        target = _explain_engine(engine)
+        if target is None:
+            return
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            executor = self._executor
+        executor.submit(self._explain, target, shape, statement, parameters)
+
+    def _explain(self, engine, shape: str, statement: str, parameters) -> None:
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect() as conn:
+                result = conn.exec_driver_sql(prefix + statement, parameters)
+                plan = [dict(row._mapping) for row in result]
+        except Exception as e:
+            plan = {"error": str(e)}
+
+        with self._lock:
+            if shape in self._plans:
+                self._plans[shape] = plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self.total = 0
+            self._entries.clear()
+            self._plans.clear()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            entries = [{**entry, "plan": self._plans.get(entry["sql"])} for entry in self._entries]
+            total = self.total
+
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "explain": self.explain,
+            "total": total,
+            "recent": entries[::-1],
+        }
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -8,6 +8,10 @@ from ..database import Base
 
 class Notification(Base):
     __tablename__ = "Notifications"
+    __table_args__ = (
+        # a student's feed and unread count
+        Index("ix_Notifications_studentID_status_created_at", "studentID", "status", "created_at"),
+    )
 
     notificationID = Column(Integer, primary_key=True, index=True)
     type = Column(String(50), nullable=False)
@@ -2,9 +2,18 @@ from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_async_db, get_db
+from ..dependencies.read_routing import get_async_read_db
+from ..dependencies.unread_counters import (
+    adjust_unread_notifications_from_thread,
+    get_unread_notifications,
+    reset_unread_counters_from_thread,
+)
+from .._Student import model as StudentModel
 from . import model as NotificationModel, schema as NotificationSchema
 
 
@@ -40,30 +49,95 @@ def _serialize_notification(n: NotificationModel.Notification) -> NotificationSc
     )
 
 
-@student_router.get("/{student_id}/notifications")
-def get_student_notifications(student_id: int, db: Session = Depends(get_db)):
-    notifications = (
-        db.query(NotificationModel.Notification)
-        .filter(NotificationModel.Notification.studentID == student_id)
+def _notifications_query(student_id: int):
+    """The student's notifications, newest first."""
+    return (
+        select(NotificationModel.Notification)
+        .where(NotificationModel.Notification.studentID == student_id)
         .order_by(NotificationModel.Notification.created_at.desc())
-        .all()
     )
 
+
+def _unread_count_query(student_id: int):
+    return (
+        select(func.count(NotificationModel.Notification.notificationID))
+        .where(
+            NotificationModel.Notification.studentID == student_id,
+            NotificationModel.Notification.status == "unread",
+        )
+    )
+
+
+def create_notification(db: Session, student_id: int, type: str, content: str) -> NotificationModel.Notification:
+    """
+    Creates an unread notification and bumps the student's unread counter.
+    For sync code running in the threadpool (endpoints declared with `def`).
+    """
+    notif = NotificationModel.Notification(
+        type=type,
+        content=content,
+        status="unread",
+        studentID=student_id,
+        created_at=datetime.utcnow(),
+    )
+    db.add(notif)
+    db.commit()
+    db.refresh(notif)
+
+    adjust_unread_notifications_from_thread(student_id, 1)
+    return notif
+
+
+@student_router.post(
+    "/{student_id}/notifications",
+    status_code=status.HTTP_201_CREATED,
+    response_model=NotificationSchema.NotificationRead,
+)
+def post_student_notification(
+    student_id: int,
+    payload: NotificationSchema.NotificationCreate,
+    db: Session = Depends(get_db),
+) -> NotificationSchema.NotificationRead:
+    if not db.get(StudentModel.Student, student_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+
+    notif = create_notification(db, student_id, payload.type.value, payload.content)
+    return _serialize_notification(notif)
+
+
+@student_router.get("/{student_id}/notifications")
+async def get_student_notifications(student_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    notifications = (await db.scalars(_notifications_query(student_id))).all()
+
     return {"notifications": [_serialize_notification(n) for n in notifications]}
 
 
 @student_router.get("/{student_id}/notifications/unread-count")
-def get_student_unread_notification_count(student_id: int, db: Session = Depends(get_db)):
-    unread = (
+async def get_student_unread_notification_count(student_id: int, db: AsyncSession = Depends(get_async_db)):
+    # The count seeds the shared counter, so it is taken on the primary: a lagging
+    # replica would be cached for every reader until the counter expires.
+    async def count_from_db() -> int:
+        return await db.scalar(_unread_count_query(student_id))
+
+    return {"count": await get_unread_notifications(student_id, count_from_db)}
+
+
+@student_router.put("/{student_id}/notifications/read", status_code=status.HTTP_204_NO_CONTENT)
+def mark_all_notifications_read(student_id: int, db: Session = Depends(get_db)):
+    changed = (
         db.query(NotificationModel.Notification)
         .filter(
             NotificationModel.Notification.studentID == student_id,
             NotificationModel.Notification.status == "unread",
         )
-        .count()
+        .update({NotificationModel.Notification.status: "read"}, synchronize_session=False)
     )
+    db.commit()
 
-    return {"count": unread}
+    if changed:
+        # recounted on the next read rather than decremented, so a notification
+        # created while this ran is not lost from the count
+        reset_unread_counters_from_thread(student_id, "notifications")
 
 
 @notification_router.put("/{notification_id}/read", status_code=status.HTTP_204_NO_CONTENT)
@@ -76,9 +150,21 @@ def mark_notification_read(notification_id: int, db: Session = Depends(get_db)):
     if not notif:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
 
-    notif.status = "read"
+    student_id = notif.studentID
+    # conditional, so two concurrent marks only decrement the counter once
+    changed = (
+        db.query(NotificationModel.Notification)
+        .filter(
+            NotificationModel.Notification.notificationID == notification_id,
+            NotificationModel.Notification.status == "unread",
+        )
+        .update({NotificationModel.Notification.status: "read"}, synchronize_session=False)
+    )
     db.commit()
 
+    if changed:
+        adjust_unread_notifications_from_thread(student_id, -1)
+
 
 @notification_router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_notification(notification_id: int, db: Session = Depends(get_db)):
@@ -90,5 +176,11 @@ def delete_notification(notification_id: int, db: Session = Depends(get_db)):
     if not notif:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
 
+    was_unread = notif.status == "unread"
+    student_id = notif.studentID
+
     db.delete(notif)
     db.commit()
+
+    if was_unread:
+        adjust_unread_notifications_from_thread(student_id, -1)
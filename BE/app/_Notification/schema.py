@@ -1,8 +1,23 @@
+import enum
 from datetime import datetime
 
 from pydantic import BaseModel
 
 
+class NotificationType(str, enum.Enum):
+    announcement = "announcement"
+    deadline = "deadline"
+    feedback = "feedback"
+    submission = "submission"
+    message = "message"
+    other = "other"
+
+
+class NotificationCreate(BaseModel):
+    type: NotificationType
+    content: str
+
+
 class NotificationRead(BaseModel):
     notification_id: int
     student_id: int
@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 import requests
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..database import get_db 
+from ..dependencies.answer_keys import invalidate_answer_key_from_thread
 from . import schema, model
 from .._Quiz import model as QuizModel
+from .._Quiz_Attempt.grading import regrade_quiz_in_background
 
 router = APIRouter(
     prefix="/questions",
     tags=["Questions"],
 )
 
+
+def _answer_key_changed(background_tasks: BackgroundTasks, *quiz_ids) -> None:
+    """
+    Call after a commit that changes how submitted papers score (a correct
+    answer changed, a question deleted): drops the cached keys and rescores
+    the quizzes' attempts after the response.
+    """
+    invalidate_answer_key_from_thread(*quiz_ids)
+    for quiz_id in {quiz_id for quiz_id in quiz_ids if quiz_id is not None}:
+        background_tasks.add_task(regrade_quiz_in_background, quiz_id)
+
+
 # create question
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create(question: schema.QuestionCreate, db: Session = Depends(get_db)):
+def create(question: schema.QuestionCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
 
     if question.quizID:
         db_quiz = db.query(QuizModel.Quiz).filter(QuizModel.Quiz.quizID == question.quizID).first()
@@ -25,6 +39,8 @@ def create(question: schema.QuestionCreate, db: Session = Depends(get_db)):
     db.add(db_question)
     db.commit()
     db.refresh(db_question)
+    # no submitted paper has the new question on it: nothing to rescore
+    invalidate_answer_key_from_thread(db_question.quizID)
 
     options = [
         getattr(db_question, "answer_1", ""),
@@ -59,38 +75,48 @@ def read(question_id : int, db : Session = Depends(get_db)):
 
 # update question
 @router.patch("/{question_id}", response_model=schema.QuestionRead)
-def update(question_id : int, assignment_data: schema.QuestionUpdate, db : Session = Depends(get_db)):
+def update(question_id : int, assignment_data: schema.QuestionUpdate, background_tasks: BackgroundTasks, db : Session = Depends(get_db)):
     db_question = db.query(model.Question).filter(model.Question.questionID == question_id).first()
     
     if not db_question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     
     update_data = assignment_data.model_dump(exclude_unset=True)
+    previous = (db_question.quizID, db_question.correct_answer, db_question.level)
     
     for key, value in update_data.items():
         setattr(db_question, key, value)
     
     db.commit()
     db.refresh(db_question)
+    # text edits leave the key alone
+    if db_question.correct_answer != previous[1]:
+        _answer_key_changed(background_tasks, previous[0], db_question.quizID)
+    elif (db_question.quizID, db_question.level) != (previous[0], previous[2]):
+        # a move or a new level only changes the keys and draw pools; submitted
+        # papers are recorded and keep their scores
+        invalidate_answer_key_from_thread(previous[0], db_question.quizID)
     
     return db_question
 
 # update question (PUT alias)
 @router.put("/{question_id}")
-def put_update(question_id: int, question_data: schema.QuestionUpdate, db: Session = Depends(get_db)):
-    updated = update(question_id, question_data, db)
+def put_update(question_id: int, question_data: schema.QuestionUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    updated = update(question_id, question_data, background_tasks, db)
     return {"question": updated}
 
 # delete question
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete(question_id : int, db : Session = Depends(get_db)):
+def delete(question_id : int, background_tasks: BackgroundTasks, db : Session = Depends(get_db)):
     db_question = db.query(model.Question).filter(model.Question.questionID == question_id).first()
     
     if not db_question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
     
+    quiz_id = db_question.quizID
     db.delete(db_question)
     db.commit()
+    _answer_key_changed(background_tasks, quiz_id)
 
     return
 
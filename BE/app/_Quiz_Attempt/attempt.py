@@ -1,11 +1,19 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, undefer
 
 from ..database import get_db
+from ..dependencies.answer_keys import answer_key_cache
+from ..dependencies.auth import get_current_principal
+from ..dependencies.principal_cache import Principal
+from ..dependencies.read_routing import get_read_db
 from . import model as AttemptModel, schema as AttemptSchema
+from .grading import pack_answers, regrade_quiz, unpack_paper
+from .question_draw import draw_paper, new_seed
 from .._Quiz import model as QuizModel
 from .._Student import model as StudentModel
 from .._Customer import model as CustomerModel
@@ -22,23 +30,13 @@ quiz_router = APIRouter(
     tags=["Quiz Attempts"],
 )
 
+ATTEMPT_PAGE_SIZE = 100
+ATTEMPT_MAX_PAGE_SIZE = 500
+# a student double-clicking "Start" loses at most this many races in a row
+ATTEMPT_START_RETRIES = 5
 
-def _serialize_attempt(db: Session, attempt: AttemptModel.QuizAttempt) -> AttemptSchema.QuizAttemptRead:
-    student = (
-        db.query(StudentModel.Student)
-        .filter(StudentModel.Student.studentID == attempt.studentID)
-        .first()
-    )
-
-    customer = None
-    if student is not None:
-        customer = (
-            db.query(CustomerModel.Customer)
-            .filter(CustomerModel.Customer.customerID == student.studentID)
-            .first()
-        )
 
-    student_name = customer.fullname if customer else None
+def _attempt_read(attempt: AttemptModel.QuizAttempt, student_name: str | None) -> AttemptSchema.QuizAttemptRead:
     started_at = attempt.started_at if getattr(attempt, "started_at", None) else datetime.utcnow()
 
     return AttemptSchema.QuizAttemptRead(
@@ -53,6 +51,95 @@ def _serialize_attempt(db: Session, attempt: AttemptModel.QuizAttempt) -> Attemp
     )
 
 
+def _question_payload(question: QuestionModel.Question, include_answer: bool) -> dict:
+    level_map = {
+        "easy": "easy_question",
+        "medium": "medium_question",
+        "hard": "hard_question",
+        "easy_question": "easy_question",
+        "medium_question": "medium_question",
+        "hard_question": "hard_question",
+    }
+
+    payload = {
+        "question_id": question.questionID,
+        "quiz_id": question.quizID,
+        "question_text": getattr(question, "question_text", ""),
+        "question_type": "multiple_choice",
+        "level": level_map.get(getattr(question, "level", None), "medium_question"),
+        "points": 1,
+        "options": [
+            getattr(question, "answer_1", ""),
+            getattr(question, "answer_2", ""),
+            getattr(question, "answer_3", ""),
+            getattr(question, "answer_4", ""),
+        ],
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    if include_answer:
+        payload["correct_answer"] = getattr(question, "correct_answer", None)
+    return payload
+
+
+def _attempt_paper(db: Session, attempt: AttemptModel.QuizAttempt, quiz: QuizModel.Quiz) -> List[int]:
+    """
+    The question IDs the attempt was given, recorded in its answers when it
+    started. Attempts started before papers were recorded draw it again.
+    """
+    if attempt.answers is not None:
+        return unpack_paper(attempt.answers)
+    return draw_paper(answer_key_cache.get(db, attempt.quizID), quiz, attempt.seed)
+
+
+def _attempts_query(
+    quiz_id: int,
+    student_id: int | None,
+    view: AttemptSchema.AttemptView,
+    after_id: int | None,
+    limit: int,
+):
+    """(attempt, student name) for one page of the quiz's attempts in start order."""
+    QuizAttempt = AttemptModel.QuizAttempt
+
+    attempts = select(QuizAttempt).where(QuizAttempt.quizID == quiz_id)
+    if student_id is not None:
+        attempts = attempts.where(QuizAttempt.studentID == student_id)
+
+    if view != AttemptSchema.AttemptView.all:
+        if view == AttemptSchema.AttemptView.best:
+            attempts = attempts.where(QuizAttempt.completed_at.is_not(None))
+            rank_order = (QuizAttempt.score.is_(None), QuizAttempt.score.desc(), QuizAttempt.attemptID.asc())
+        else:
+            rank_order = (QuizAttempt.attempt_number.desc(), QuizAttempt.attemptID.desc())
+
+        ranked = attempts.add_columns(
+            func.row_number()
+            .over(partition_by=QuizAttempt.studentID, order_by=rank_order)
+            .label("rank")
+        ).subquery()
+        picked = aliased(QuizAttempt, ranked)
+        attempts = select(picked).where(ranked.c.rank == 1)
+        QuizAttempt = picked
+
+    query = (
+        attempts.add_columns(CustomerModel.Customer.fullname)
+        .outerjoin(CustomerModel.Customer, CustomerModel.Customer.customerID == QuizAttempt.studentID)
+    )
+
+    if after_id is not None:
+        # keyset on (started_at, attemptID)
+        Cursor = aliased(AttemptModel.QuizAttempt)
+        cursor_at = select(Cursor.started_at).where(Cursor.attemptID == after_id).scalar_subquery()
+        query = query.where(
+            or_(
+                QuizAttempt.started_at > cursor_at,
+                and_(QuizAttempt.started_at == cursor_at, QuizAttempt.attemptID > after_id),
+            )
+        )
+
+    return query.order_by(QuizAttempt.started_at.asc(), QuizAttempt.attemptID.asc()).limit(limit)
+
+
 @router.post("/", response_model=AttemptSchema.QuizAttemptRead, status_code=status.HTTP_201_CREATED)
 def start_quiz_attempt(payload: AttemptSchema.QuizAttemptCreate, db: Session = Depends(get_db)):
     quiz = db.query(QuizModel.Quiz).filter(QuizModel.Quiz.quizID == payload.quiz_id).first()
@@ -60,93 +147,175 @@ def start_quiz_attempt(payload: AttemptSchema.QuizAttemptCreate, db: Session = D
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
 
     student = (
-        db.query(StudentModel.Student)
+        db.query(StudentModel.Student.studentID, CustomerModel.Customer.fullname)
+        .outerjoin(CustomerModel.Customer, CustomerModel.Customer.customerID == StudentModel.Student.studentID)
         .filter(StudentModel.Student.studentID == payload.student_id)
         .first()
     )
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
 
-    existing_attempts = (
-        db.query(AttemptModel.QuizAttempt)
-        .filter(
-            AttemptModel.QuizAttempt.quizID == payload.quiz_id,
-            AttemptModel.QuizAttempt.studentID == payload.student_id,
+    now = datetime.utcnow()
+    if quiz.open_time is not None and now < quiz.open_time:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Quiz is not open yet")
+    if quiz.close_time is not None and now > quiz.close_time:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Quiz is closed")
+
+    answer_key = answer_key_cache.get(db, quiz.quizID)
+
+    # The unique (quizID, studentID, attempt_number) index does the locking:
+    # concurrent starts of the same student race for the same number, one
+    # wins and the others retry with the next one. Other students never wait.
+    for _ in range(ATTEMPT_START_RETRIES):
+        last_number = (
+            db.query(func.max(AttemptModel.QuizAttempt.attempt_number))
+            .filter(
+                AttemptModel.QuizAttempt.quizID == payload.quiz_id,
+                AttemptModel.QuizAttempt.studentID == payload.student_id,
+            )
+            .scalar()
         )
-        .count()
-    )
-
-    attempt_number = existing_attempts + 1
-
-    attempt = AttemptModel.QuizAttempt(
-        quizID=payload.quiz_id,
-        studentID=payload.student_id,
-        started_at=datetime.utcnow(),
-        attempt_number=attempt_number,
+        attempt_number = (last_number or 0) + 1
+
+        if quiz.number_of_attempts and attempt_number > quiz.number_of_attempts:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"No attempts left (limit {quiz.number_of_attempts})",
+            )
+
+        seed = new_seed(quiz)
+        attempt = AttemptModel.QuizAttempt(
+            quizID=payload.quiz_id,
+            studentID=payload.student_id,
+            started_at=now,
+            attempt_number=attempt_number,
+            seed=seed,
+            # the paper is fixed now, unanswered: questions added to the quiz
+            # later are not on it
+            answers=pack_answers({}, draw_paper(answer_key, quiz, seed)),
+        )
+        db.add(attempt)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            continue
+
+        db.refresh(attempt)
+        return _attempt_read(attempt, student.fullname)
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Too many simultaneous starts, please retry",
     )
-    db.add(attempt)
-    db.commit()
-    db.refresh(attempt)
 
-    return _serialize_attempt(db, attempt)
 
-
-@router.post("/{attempt_id}/submit", response_model=AttemptSchema.QuizAttemptRead)
-def submit_quiz_attempt(attempt_id: int, payload: AttemptSchema.QuizAttemptSubmit, db: Session = Depends(get_db)):
-    attempt = (
-        db.query(AttemptModel.QuizAttempt)
+@router.get("/{attempt_id}/questions")
+def get_attempt_questions(attempt_id: int, db: Session = Depends(get_db)):
+    """The attempt's paper, as recorded when it started, without the correct answers."""
+    row = (
+        db.query(AttemptModel.QuizAttempt, QuizModel.Quiz)
+        .join(QuizModel.Quiz, QuizModel.Quiz.quizID == AttemptModel.QuizAttempt.quizID)
         .filter(AttemptModel.QuizAttempt.attemptID == attempt_id)
+        .options(undefer(AttemptModel.QuizAttempt.answers))
         .first()
     )
-    if not attempt:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
+    attempt, quiz = row
+
+    paper = _attempt_paper(db, attempt, quiz)
 
     questions = (
         db.query(QuestionModel.Question)
-        .filter(QuestionModel.Question.quizID == attempt.quizID)
+        .filter(QuestionModel.Question.questionID.in_(paper))
         .all()
+        if paper
+        else []
     )
+    by_id = {question.questionID: question for question in questions}
+
+    return {
+        "questions": [
+            _question_payload(by_id[question_id], include_answer=False)
+            for question_id in paper
+            if question_id in by_id
+        ]
+    }
 
-    total = len(questions)
-    correct = 0
 
-    answers = payload.answers or {}
+@router.post("/{attempt_id}/submit", response_model=AttemptSchema.QuizAttemptRead)
+def submit_quiz_attempt(attempt_id: int, payload: AttemptSchema.QuizAttemptSubmit, db: Session = Depends(get_db)):
+    row = (
+        db.query(AttemptModel.QuizAttempt, CustomerModel.Customer.fullname, QuizModel.Quiz)
+        .join(QuizModel.Quiz, QuizModel.Quiz.quizID == AttemptModel.QuizAttempt.quizID)
+        .outerjoin(CustomerModel.Customer, CustomerModel.Customer.customerID == AttemptModel.QuizAttempt.studentID)
+        .filter(AttemptModel.QuizAttempt.attemptID == attempt_id)
+        .options(undefer(AttemptModel.QuizAttempt.answers))
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
+    attempt, student_name, quiz = row
 
-    if total > 0:
-        for q in questions:
-            ans = answers.get(q.questionID)
-            if ans is not None and ans == getattr(q, "correct_answer", None):
-                correct += 1
-        score = (correct / total) * 100.0
-    else:
-        score = 0.0
+    # graded in memory against the cached key, on the paper recorded when the
+    # attempt started; the commit is the only write
+    answer_key = answer_key_cache.get(db, attempt.quizID)
+    paper = _attempt_paper(db, attempt, quiz)
 
-    attempt.score = score
+    answers = payload.answers or {}
+    attempt.score = answer_key.score(answers, paper)
+    attempt.answers = pack_answers(answers, paper)
     attempt.completed_at = datetime.utcnow()
+    result = _attempt_read(attempt, student_name)
 
     db.commit()
-    db.refresh(attempt)
 
-    return _serialize_attempt(db, attempt)
+    return result
 
 
-@quiz_router.get("/{quiz_id}/attempts", response_model=List[AttemptSchema.QuizAttemptRead])
-def get_quiz_attempts(quiz_id: int, student_id: int | None = None, db: Session = Depends(get_db)):
+@quiz_router.post("/{quiz_id}/regrade")
+def regrade_quiz_attempts(quiz_id: int, db: Session = Depends(get_db)):
+    """Rescores the completed attempts against the quiz's current answer key."""
     quiz = db.query(QuizModel.Quiz).filter(QuizModel.Quiz.quizID == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
 
-    query = db.query(AttemptModel.QuizAttempt).filter(AttemptModel.QuizAttempt.quizID == quiz_id)
-    if student_id is not None:
-        query = query.filter(AttemptModel.QuizAttempt.studentID == student_id)
+    return regrade_quiz(db, quiz_id)
 
-    attempts = query.order_by(AttemptModel.QuizAttempt.started_at.asc()).all()
 
-    return [_serialize_attempt(db, a) for a in attempts]
+@quiz_router.get("/{quiz_id}/attempts", response_model=List[AttemptSchema.QuizAttemptRead])
+def get_quiz_attempts(
+    quiz_id: int,
+    student_id: int | None = None,
+    view: AttemptSchema.AttemptView = AttemptSchema.AttemptView.all,
+    after_id: int | None = Query(None, ge=1),
+    limit: int = Query(ATTEMPT_PAGE_SIZE, ge=1, le=ATTEMPT_MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Attempts of a quiz in start order, one page at a time: pass the last
+    attempt_id of a page as `after_id` for the next one.
+
+    view=best keeps each student's highest-scored completed attempt,
+    view=last each student's latest attempt; both are picked in SQL.
+    """
+    quiz = db.query(QuizModel.Quiz).filter(QuizModel.Quiz.quizID == quiz_id).first()
+    if not quiz:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
+
+    rows = db.execute(_attempts_query(quiz_id, student_id, view, after_id, limit)).all()
+
+    return [_attempt_read(attempt, student_name) for attempt, student_name in rows]
 
 
 @quiz_router.get("/{quiz_id}/questions")
-def get_quiz_questions(quiz_id: int, db: Session = Depends(get_db)):
+def get_quiz_questions(
+    quiz_id: int,
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+):
+    """The whole question bank; students get it without the correct answers."""
     quiz = db.query(QuizModel.Quiz).filter(QuizModel.Quiz.quizID == quiz_id).first()
     if not quiz:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
@@ -157,34 +326,5 @@ def get_quiz_questions(quiz_id: int, db: Session = Depends(get_db)):
         .all()
     )
 
-    level_map = {
-        "easy": "easy_question",
-        "medium": "medium_question",
-        "hard": "hard_question",
-        "easy_question": "easy_question",
-        "medium_question": "medium_question",
-        "hard_question": "hard_question",
-    }
-
-    results = []
-    for q in questions:
-        results.append(
-            {
-                "question_id": q.questionID,
-                "quiz_id": q.quizID,
-                "question_text": getattr(q, "question_text", ""),
-                "question_type": "multiple_choice",
-                "level": level_map.get(getattr(q, "level", None), "medium_question"),
-                "points": 1,
-                "options": [
-                    getattr(q, "answer_1", ""),
-                    getattr(q, "answer_2", ""),
-                    getattr(q, "answer_3", ""),
-                    getattr(q, "answer_4", ""),
-                ],
-                "correct_answer": getattr(q, "correct_answer", None),
-                "created_at": datetime.utcnow().isoformat(),
-            }
-        )
-
-    return {"questions": results}
+    include_answer = principal.role != "student"
+    return {"questions": [_question_payload(q, include_answer) for q in questions]}
@@ -0,0 +1,139 @@
+import struct
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..dependencies.answer_keys import AnswerKey, compile_answer_key
+from . import model as AttemptModel
+
+# Stored answers: one 5-byte record per question of the attempt's paper,
+# little-endian uint32 questionID + uint8 option (A=1 .. D=4, 0 = not answered).
+ANSWER_RECORD = np.dtype([("question", "<u4"), ("option", "u1")])
+OPTION_CODES = {"A": 1, "B": 2, "C": 3, "D": 4}
+
+# attempts per UPDATE ... CASE statement when writing regraded scores
+REGRADE_UPDATE_CHUNK = 1000
+
+
+def pack_answers(answers: Dict[int, str], paper: Iterable[int]) -> bytes:
+    """
+    Packs the answers to the paper's questions, unanswered ones included, so
+    the stored answers also record which questions the attempt was given.
+    Anything else the client sent is dropped.
+    """
+    records = [(question_id, OPTION_CODES.get(answers.get(question_id), 0)) for question_id in paper]
+    return struct.pack("<" + "IB" * len(records), *(value for record in records for value in record))
+
+
+def unpack_paper(packed: bytes) -> List[int]:
+    """Question IDs recorded in packed answers, in the order they were served."""
+    return np.frombuffer(packed, dtype=ANSWER_RECORD)["question"].tolist()
+
+
+def score_packed(packed: List[bytes], answer_key: AnswerKey) -> np.ndarray:
+    """
+    Scores many attempts in one vectorized pass.
+
+    The packed answers become an attempts x questions matrix of option codes
+    (0 = not answered), compared against the key's codes and weighted. Each
+    attempt is scored out of the questions recorded in its answers (its
+    paper) that are still in the key: a question added to the quiz later is
+    not on anyone's paper. Same percentages as `AnswerKey.score` with that
+    paper.
+    """
+    question_ids = np.fromiter(answer_key.correct, dtype=np.uint32, count=len(answer_key.correct))
+    if len(packed) == 0 or len(question_ids) == 0:
+        return np.zeros(len(packed), dtype=np.float64)
+
+    key_codes = np.fromiter(
+        (OPTION_CODES[option] for option in answer_key.correct.values()), dtype=np.uint8, count=len(question_ids)
+    )
+    weights = np.fromiter(answer_key.weights.values(), dtype=np.float64, count=len(question_ids))
+
+    records = np.frombuffer(b"".join(packed), dtype=ANSWER_RECORD)
+    rows = np.repeat(
+        np.arange(len(packed)),
+        np.fromiter((len(blob) // ANSWER_RECORD.itemsize for blob in packed), dtype=np.int64, count=len(packed)),
+    )
+
+    # answer key ids are sorted (compile_answer_key orders by questionID)
+    columns = np.searchsorted(question_ids, records["question"])
+    known = columns < len(question_ids)
+    known[known] = question_ids[columns[known]] == records["question"][known]
+
+    matrix = np.zeros((len(packed), len(question_ids)), dtype=np.uint8)
+    matrix[rows[known], columns[known]] = records["option"][known]
+
+    on_paper = np.zeros((len(packed), len(question_ids)), dtype=bool)
+    on_paper[rows[known], columns[known]] = True
+
+    # key codes are never 0, so unanswered questions never match
+    earned = (matrix == key_codes).astype(np.float64) @ weights
+    possible = on_paper.astype(np.float64) @ weights
+    return np.divide(earned, possible, out=np.zeros(len(packed)), where=possible > 0) * 100.0
+
+
+def regrade_quiz(db: Session, quiz_id: int) -> dict:
+    """
+    Rescores every completed attempt of the quiz against its current questions
+    and writes back the scores that changed. Each attempt is rescored on the
+    paper it was given, minus questions deleted since. Attempts submitted
+    before answers were stored can't be rescored and are left as they are.
+    """
+    QuizAttempt = AttemptModel.QuizAttempt
+    answer_key = compile_answer_key(db, quiz_id)
+
+    rows = (
+        db.query(QuizAttempt.attemptID, QuizAttempt.score, QuizAttempt.answers)
+        .filter(QuizAttempt.quizID == quiz_id, QuizAttempt.completed_at.is_not(None))
+        .all()
+    )
+    gradable = [row for row in rows if row.answers is not None]
+
+    started = time.perf_counter()
+    scores = score_packed([row.answers for row in gradable], answer_key)
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    changed = {
+        row.attemptID: float(score)
+        for row, score in zip(gradable, scores)
+        if row.score is None or not np.isclose(row.score, score)
+    }
+
+    attempt_ids = list(changed)
+    for start in range(0, len(attempt_ids), REGRADE_UPDATE_CHUNK):
+        chunk = attempt_ids[start:start + REGRADE_UPDATE_CHUNK]
+        db.execute(
+            update(QuizAttempt.__table__)
+            .where(QuizAttempt.__table__.c.attemptID.in_(chunk))
+            .values(
+                score=case(
+                    {attempt_id: changed[attempt_id] for attempt_id in chunk},
+                    value=QuizAttempt.__table__.c.attemptID,
+                )
+            )
+        )
+    db.commit()
+
+    print(f"Regraded quiz {quiz_id}: {len(gradable)} attempts in {compute_ms:.1f} ms, {len(changed)} scores changed")
+    return {
+        "quiz_id": quiz_id,
+        "regraded": len(gradable),
+        "changed": len(changed),
+        "skipped": len(rows) - len(gradable),
+    }
+
+
+def regrade_quiz_in_background(quiz_id: int) -> None:
+    """BackgroundTasks entry point: runs after the response, with its own session."""
+    db = SessionLocal()
+    try:
+        regrade_quiz(db, quiz_id)
+    except Exception as e:
+        print(f"ERROR: regrade of quiz {quiz_id} failed: {e}")
+    finally:
+        db.close()
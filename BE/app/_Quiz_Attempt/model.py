@@ -1,13 +1,22 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 
 from ..database import Base
 
 
 class QuizAttempt(Base):
     __tablename__ = "Quiz_Attempts"
+    __table_args__ = (
+        Index("ix_Quiz_Attempts_quizID_studentID", "quizID", "studentID"),
+        # allocates attempt numbers: two concurrent starts can't both take the same one
+        Index(
+            "uq_Quiz_Attempts_quizID_studentID_attempt_number",
+            "quizID", "studentID", "attempt_number",
+            unique=True,
+        ),
+    )
 
     attemptID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     quizID = Column(Integer, ForeignKey("Quizzes.quizID", ondelete="CASCADE"), nullable=False)
@@ -17,6 +26,11 @@ class QuizAttempt(Base):
     completed_at = Column(DateTime, nullable=True)
     score = Column(Float, nullable=True)
     attempt_number = Column(Integer, default=1)
+    # draws the attempt's questions (question_draw.draw_paper); NULL when the quiz has no draw
+    seed = Column(Integer, nullable=True)
+    # packed by grading.pack_answers: the paper, unanswered, from the start; the
+    # answers once submitted. Loaded only by submit, the paper route and the regrade
+    answers = deferred(Column(LargeBinary, nullable=True))
 
     quiz = relationship("Quiz")
     student = relationship("Student")
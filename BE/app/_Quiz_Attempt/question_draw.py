@@ -0,0 +1,43 @@
+import random
+import secrets
+from typing import List, Optional
+
+from ..dependencies.answer_keys import AnswerKey
+from .._Quiz import model as QuizModel
+
+# question level -> Quiz column holding how many of them an attempt gets
+LEVEL_COUNTS = (
+    ("easy_question", "easy_questions"),
+    ("medium_question", "medium_questions"),
+    ("hard_question", "hard_questions"),
+)
+
+
+def quiz_draws(quiz: QuizModel.Quiz) -> bool:
+    """A quiz with per-level counts gives each attempt a sample; without, every question."""
+    return any(getattr(quiz, count) for _, count in LEVEL_COUNTS)
+
+
+def new_seed(quiz: QuizModel.Quiz) -> Optional[int]:
+    return secrets.randbits(31) if quiz_draws(quiz) else None
+
+
+def draw_paper(answer_key: AnswerKey, quiz: QuizModel.Quiz, seed: Optional[int]) -> List[int]:
+    """
+    Question IDs of an attempt's paper, in the order they are served.
+
+    The same seed always draws the same paper from the same pools. Drawing
+    is `random.sample` on the key's precomputed level pools, O(k) in the
+    questions drawn however large the bank; a level with fewer questions
+    than asked contributes all of them. Without a seed, the paper is the
+    whole quiz.
+    """
+    if seed is None:
+        return list(answer_key.correct)
+
+    rng = random.Random(seed)
+    paper = []
+    for level, count in LEVEL_COUNTS:
+        pool = answer_key.pools.get(level, ())
+        paper.extend(rng.sample(pool, min(getattr(quiz, count) or 0, len(pool))))
+    return paper
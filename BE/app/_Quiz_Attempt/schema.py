@@ -1,9 +1,16 @@
+import enum
 from datetime import datetime
 from typing import Dict, Optional
 
 from pydantic import BaseModel
 
 
+class AttemptView(str, enum.Enum):
+    all = "all"
+    best = "best"
+    last = "last"
+
+
 class QuizAttemptCreate(BaseModel):
     quiz_id: int
     student_id: int
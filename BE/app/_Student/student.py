@@ -48,7 +48,7 @@ def create_student(db: Session, student_data: schema.StudentCreate):
     status_code=status.HTTP_201_CREATED,
     summary="Register a new student"
 )
-async def register_student(student_data: schema.StudentCreate, db: Session = Depends(get_db)):
+def register_student(student_data: schema.StudentCreate, db: Session = Depends(get_db)):
     return create_student(db, student_data)
 
 
@@ -57,7 +57,7 @@ async def register_student(student_data: schema.StudentCreate, db: Session = Dep
     response_model=schema.Student,
     summary="Get student details by ID"
 )
-async def read_student(student_id: int, db: Session = Depends(get_db)):
+def read_student(student_id: int, db: Session = Depends(get_db)):
     db_student = db.query(model.Student).filter(model.Student.studentID == student_id).first()
     if db_student is None:
         raise HTTPException(
@@ -72,7 +72,7 @@ async def read_student(student_id: int, db: Session = Depends(get_db)):
     response_model=List[schema.Student],
     summary="Get a list of all students"
 )
-async def read_students(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
+def read_students(db: Session = Depends(get_db), skip: int = 0, limit: int = 100):
     students = db.query(model.Student).offset(skip).limit(limit).all()
     return students
 
@@ -82,7 +82,7 @@ async def read_students(db: Session = Depends(get_db), skip: int = 0, limit: int
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a student entry"
 )
-async def delete_student(student_id: int, db: Session = Depends(get_db)):
+def delete_student(student_id: int, db: Session = Depends(get_db)):
     db_student = db.query(model.Student).filter(model.Student.studentID == student_id).first()
     if db_student is None:
         raise HTTPException(
@@ -1,4 +1,4 @@
-from sqlalchemy import DECIMAL, TIMESTAMP, Column, Numeric, String, DateTime, Float, Integer, ForeignKey, Text, Enum
+from sqlalchemy import DECIMAL, TIMESTAMP, Column, Index, Numeric, String, DateTime, Float, Integer, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime, timezone
@@ -6,6 +6,10 @@ from ..database import Base
 
 class StudentScore(Base):
     __tablename__ = "Student_Score"
+    __table_args__ = (
+        # the primary key leads with studentID; the instructor summary goes by group
+        Index("ix_Student_Score_groupID_quizID", "groupID", "quizID"),
+    )
 
     studentID = Column(Integer, primary_key=True)
     groupID = Column(Integer, primary_key=True)
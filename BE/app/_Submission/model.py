@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Float, String
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Float, String, Index
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -8,6 +8,9 @@ from ..database import Base
 
 class Submission(Base):
     __tablename__ = "Submissions"
+    __table_args__ = (
+        Index("ix_Submissions_assignmentID_studentID_submitted_at", "assignmentID", "studentID", "submitted_at"),
+    )
 
     submissionID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     assignmentID = Column(Integer, ForeignKey("Assignments.assignmentID", ondelete="CASCADE"), nullable=False)
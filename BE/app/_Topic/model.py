@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from ..database import Base
@@ -14,6 +14,13 @@ class Topic(Base):
     description = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     courseID = Column(Integer, ForeignKey("Courses.courseID", ondelete="CASCADE"), nullable=False)
+    # maintained by create_topic_chat / delete_topic_chat, so listings don't count chats
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_activity_at = Column(DateTime, default=datetime.utcnow)
+    # flushed from Redis in batches; add topic_views.pending_views() for the live number
+    view_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # token of the last flushed batch, so readers know whether view_count has it
+    view_flush_token = Column(String(32))
 
     course = relationship("Course")
     chats = relationship("TopicChat", back_populates="topic", cascade="all, delete-orphan")
@@ -22,11 +29,16 @@ class Topic(Base):
 
 class TopicChat(Base):
     __tablename__ = "Topic_Chats"
+    __table_args__ = (
+        Index("ix_Topic_Chats_topicID_messageID", "topicID", "messageID"),
+    )
 
     messageID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     message = Column(Text, nullable=False)
     topicID = Column(Integer, ForeignKey("Topics.topicID", ondelete="CASCADE"), nullable=False)
     studentID = Column(Integer, ForeignKey("Students.studentID", ondelete="SET NULL"))
+    # Topics.last_activity_at is the latest of these (or the topic's created_at)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
     topic = relationship("Topic", back_populates="chats")
     student = relationship("Student")
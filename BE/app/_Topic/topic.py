@@ -4,14 +4,18 @@ import os
 import shutil
 import uuid
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..database import get_db
+from ..dependencies.read_routing import get_async_read_db
+from ..dependencies.topic_views import pending_views_from_thread, record_view
+from ..storage import ensure_upload_dir, register_upload_dir
 from . import model as TopicModel, schema as TopicSchema
 from .._Course import model as CourseModel
 from .._Customer import model as CustomerModel
-from .._Student import model as StudentModel
 
 
 router = APIRouter(
@@ -24,40 +28,28 @@ chat_router = APIRouter(
     tags=["Topic Chats"],
 )
 
+CHAT_PAGE_SIZE = 50
+CHAT_MAX_PAGE_SIZE = 200
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-UPLOAD_DIR = os.path.join(CURRENT_DIR, "..", "..", "uploads", "forum")
 
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_DIR = register_upload_dir(os.path.join(CURRENT_DIR, "..", "..", "uploads", "forum"))
 
 
-def _serialize_topic(db: Session, topic: TopicModel.Topic) -> TopicSchema.TopicRead:
-    course = (
-        db.query(CourseModel.Course)
-        .filter(CourseModel.Course.courseID == topic.courseID)
-        .first()
-    )
+def _topic_read(
+    topic: TopicModel.Topic,
+    course: CourseModel.Course | None,
+    creator: CustomerModel.Customer | None,
+    pending_views: int = 0,
+) -> TopicSchema.TopicRead:
     course_name = course.course_name if course else None
 
     creator_id = course.instructorID if course else None
-    creator_name = None
-    creator_role = "instructor"
-    if creator_id is not None:
-        customer = (
-            db.query(CustomerModel.Customer)
-            .filter(CustomerModel.Customer.customerID == creator_id)
-            .first()
-        )
-        if customer:
-            creator_name = customer.fullname
-            creator_role = customer.role
+    creator_name = creator.fullname if creator else None
+    creator_role = creator.role if creator else "instructor"
 
-    reply_count = (
-        db.query(TopicModel.TopicChat)
-        .filter(TopicModel.TopicChat.topicID == topic.topicID)
-        .count()
-    )
-    view_count = reply_count
+    reply_count = topic.reply_count or 0
+    view_count = (topic.view_count or 0) + pending_views
 
     created_at = topic.created_at or datetime.utcnow()
 
@@ -73,26 +65,16 @@ def _serialize_topic(db: Session, topic: TopicModel.Topic) -> TopicSchema.TopicR
         view_count=view_count,
         reply_count=reply_count,
         created_at=created_at,
-        updated_at=None,
+        updated_at=topic.last_activity_at,
     )
 
 
-def _serialize_chat(db: Session, chat: TopicModel.TopicChat) -> TopicSchema.TopicChatRead:
+def _chat_read(chat: TopicModel.TopicChat, author: CustomerModel.Customer | None) -> TopicSchema.TopicChatRead:
     user_id = chat.studentID or 0
-    user_name = None
-    user_role = "student"
-
-    if chat.studentID is not None:
-        student = (
-            db.query(StudentModel.Student)
-            .filter(StudentModel.Student.studentID == chat.studentID)
-            .first()
-        )
-        if student and student.customer:
-            user_name = student.customer.fullname
-            user_role = student.customer.role
+    user_name = author.fullname if author else None
+    user_role = author.role if author else "student"
 
-    created_at = datetime.utcnow()
+    created_at = chat.created_at or datetime.utcnow()
 
     return TopicSchema.TopicChatRead(
         id=chat.messageID,
@@ -105,27 +87,82 @@ def _serialize_chat(db: Session, chat: TopicModel.TopicChat) -> TopicSchema.Topi
     )
 
 
-@router.get("/{topic_id}", response_model=TopicSchema.TopicRead)
-def get_topic(topic_id: int, db: Session = Depends(get_db)) -> TopicSchema.TopicRead:
-    topic = (
-        db.query(TopicModel.Topic)
-        .filter(TopicModel.Topic.topicID == topic_id)
+def _serialize_topic(db: Session, topic: TopicModel.Topic) -> TopicSchema.TopicRead:
+    row = (
+        db.query(CourseModel.Course, CustomerModel.Customer)
+        .outerjoin(
+            CustomerModel.Customer,
+            CustomerModel.Customer.customerID == CourseModel.Course.instructorID,
+        )
+        .filter(CourseModel.Course.courseID == topic.courseID)
         .first()
     )
-    if not topic:
+    course, creator = row if row else (None, None)
+    pending = pending_views_from_thread([topic]).get(topic.topicID, 0)
+
+    return _topic_read(topic, course, creator, pending)
+
+
+def _serialize_chat(db: Session, chat: TopicModel.TopicChat) -> TopicSchema.TopicChatRead:
+    # a student's customerID is its studentID
+    author = db.get(CustomerModel.Customer, chat.studentID) if chat.studentID is not None else None
+    return _chat_read(chat, author)
+
+
+def _topic_query(topic_id: int):
+    """(topic, course, course instructor) in one round trip."""
+    return (
+        select(TopicModel.Topic, CourseModel.Course, CustomerModel.Customer)
+        .outerjoin(CourseModel.Course, CourseModel.Course.courseID == TopicModel.Topic.courseID)
+        .outerjoin(
+            CustomerModel.Customer,
+            CustomerModel.Customer.customerID == CourseModel.Course.instructorID,
+        )
+        .where(TopicModel.Topic.topicID == topic_id)
+    )
+
+
+def _chats_query(topic_id: int, after_id: int | None, limit: int):
+    """(chat, author) for one page of the topic's chats, oldest first."""
+    query = (
+        # a student's customerID is its studentID, so the author is one join away
+        select(TopicModel.TopicChat, CustomerModel.Customer)
+        .outerjoin(
+            CustomerModel.Customer,
+            CustomerModel.Customer.customerID == TopicModel.TopicChat.studentID,
+        )
+        .where(TopicModel.TopicChat.topicID == topic_id)
+    )
+    if after_id is not None:
+        # range on ix_Topic_Chats_topicID_messageID
+        query = query.where(TopicModel.TopicChat.messageID > after_id)
+
+    return query.order_by(TopicModel.TopicChat.messageID.asc()).limit(limit)
+
+
+@router.get("/{topic_id}", response_model=TopicSchema.TopicRead)
+async def get_topic(topic_id: int, db: AsyncSession = Depends(get_async_read_db)) -> TopicSchema.TopicRead:
+    row = (await db.execute(_topic_query(topic_id))).first()
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Topic not found")
-    return _serialize_topic(db, topic)
+
+    topic, course, creator = row
+    # counted in Redis, written to the DB later by the flusher
+    pending = await record_view(topic)
+    return _topic_read(topic, course, creator, pending)
 
 
 @router.post("", response_model=TopicSchema.TopicRead, status_code=status.HTTP_201_CREATED)
 def create_topic(
     payload: TopicSchema.TopicCreate, db: Session = Depends(get_db)
 ) -> TopicSchema.TopicRead:
+    now = datetime.utcnow()
     topic = TopicModel.Topic(
         title=payload.title,
         description=payload.content,
         courseID=payload.course_id,
-        created_at=datetime.utcnow(),
+        created_at=now,
+        last_activity_at=now,
     )
     db.add(topic)
     db.commit()
@@ -173,24 +210,23 @@ def delete_topic(topic_id: int, db: Session = Depends(get_db)) -> None:
 
 
 @router.get("/{topic_id}/chats", response_model=List[TopicSchema.TopicChatRead])
-def get_topic_chats(
-    topic_id: int, db: Session = Depends(get_db)
+async def get_topic_chats(
+    topic_id: int,
+    after_id: int | None = Query(None, ge=1),
+    limit: int = Query(CHAT_PAGE_SIZE, ge=1, le=CHAT_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> List[TopicSchema.TopicChatRead]:
-    topic = (
-        db.query(TopicModel.Topic)
-        .filter(TopicModel.Topic.topicID == topic_id)
-        .first()
-    )
-    if not topic:
+    """
+    One page of the topic's chats, oldest first. Pass the last id of a page as
+    `after_id` to get the next one.
+    """
+    rows = (await db.execute(_chats_query(topic_id, after_id, limit))).all()
+
+    # an empty page is either the end of the topic or a missing topic
+    if not rows and not await db.get(TopicModel.Topic, topic_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Topic not found")
 
-    chats = (
-        db.query(TopicModel.TopicChat)
-        .filter(TopicModel.TopicChat.topicID == topic_id)
-        .order_by(TopicModel.TopicChat.messageID.asc())
-        .all()
-    )
-    return [_serialize_chat(db, chat) for chat in chats]
+    return [_chat_read(chat, author) for chat, author in rows]
 
 
 @chat_router.post("/", response_model=TopicSchema.TopicChatRead, status_code=status.HTTP_201_CREATED)
@@ -205,12 +241,22 @@ def create_topic_chat(
     if not topic:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Topic not found")
 
+    now = datetime.utcnow()
     chat = TopicModel.TopicChat(
         message=payload.message,
         topicID=payload.topic_id,
         studentID=payload.user_id,
+        created_at=now,
     )
     db.add(chat)
+    # in-place increment: concurrent replies can't overwrite each other's count
+    db.query(TopicModel.Topic).filter(TopicModel.Topic.topicID == payload.topic_id).update(
+        {
+            TopicModel.Topic.reply_count: TopicModel.Topic.reply_count + 1,
+            TopicModel.Topic.last_activity_at: now,
+        },
+        synchronize_session=False,
+    )
     db.commit()
     db.refresh(chat)
     return _serialize_chat(db, chat)
@@ -226,12 +272,30 @@ def delete_topic_chat(chat_id: int, db: Session = Depends(get_db)) -> None:
     if not chat:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat not found")
 
+    topic_id = chat.topicID
     db.delete(chat)
+    db.flush()
+
+    # the deleted chat may have been the latest one: take the newest that is left
+    latest_chat = (
+        select(func.max(TopicModel.TopicChat.created_at))
+        .where(TopicModel.TopicChat.topicID == topic_id)
+        .scalar_subquery()
+    )
+    db.query(TopicModel.Topic).filter(TopicModel.Topic.topicID == topic_id).update(
+        {
+            TopicModel.Topic.reply_count: case(
+                (TopicModel.Topic.reply_count > 0, TopicModel.Topic.reply_count - 1), else_=0
+            ),
+            TopicModel.Topic.last_activity_at: func.coalesce(latest_chat, TopicModel.Topic.created_at),
+        },
+        synchronize_session=False,
+    )
     db.commit()
 
 
 @router.post("/{topic_id}/files")
-async def upload_topic_file(
+def upload_topic_file(
     topic_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -246,7 +310,7 @@ async def upload_topic_file(
 
     file_extension = os.path.splitext(file.filename or "")[1]
     unique_filename = f"topic_{topic_id}_{uuid.uuid4()}{file_extension}"
-    file_path_on_disk = os.path.join(UPLOAD_DIR, unique_filename)
+    file_path_on_disk = os.path.join(ensure_upload_dir(UPLOAD_DIR), unique_filename)
 
     try:
         with open(file_path_on_disk, "wb") as buffer:
@@ -2,6 +2,7 @@ from datetime import datetime
 import json
 import bcrypt
 from fastapi import APIRouter, Depends, FastAPI, HTTPException, WebSocketDisconnect, status, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from pydantic import EmailStr
 from contextlib import asynccontextmanager
 import requests
@@ -13,6 +14,7 @@ from .._Topic import schema as TopicSchema
 from .._Topic.topic import create_topic_chat as create_topic_chat_handler
 # from .config import ACCOUNT_SERVICE_BASE_URL
 from ..dependencies.auth import get_raw_token, get_current_active_user, get_websocket_user_id
+from ..dependencies.read_routing import mark_primary
 # from .Realtime.channel_utils import add_message_to_db
 from.Realtime import redis_utils
 from .Realtime.connection_manager import manager
@@ -133,13 +135,15 @@ async def websocket_endpoint(
                             user_name=None,
                             message=message_content,
                         )
-                        chat = create_topic_chat_handler(topic_chat_payload, db)
+                        chat = await run_in_threadpool(create_topic_chat_handler, topic_chat_payload, db)
                     except HTTPException as exc:
                         await manager._send_to_local_user(
                             account_id, {"error": exc.detail}
                         )
                         continue
 
+                    await mark_primary(int(account_id))
+
                     ws_payload = {
                         "type": "new_topic_chat",
                         "chat": chat.model_dump(),
@@ -154,7 +158,8 @@ async def websocket_endpoint(
                         sender_id=int(account_id),
                     )
 
-                    created = create_message(message_data, db)
+                    created = await run_in_threadpool(create_message, message_data, db)
+                    await mark_primary(int(account_id))
 
                     payload = {
                         "type": "new_message",
@@ -0,0 +1,44 @@
+"""
+Schema management, run once per deploy instead of at every worker import.
+
+    python -m app.cli init-db   # create missing tables, then apply migrations
+    python -m app.cli migrate   # apply migrations only (alembic upgrade head)
+"""
+import argparse
+import os
+
+from alembic import command
+from alembic.config import Config
+
+from .database import create_db_tables
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "alembic.ini")
+
+
+def migrate() -> None:
+    command.upgrade(Config(ALEMBIC_INI), "head")
+
+
+def init_db() -> None:
+    # registers every table on Base.metadata
+    from . import models  # noqa: F401
+
+    create_db_tables()
+    # revisions skip what create_all already made, so this is safe on a fresh database too
+    migrate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("init-db", "migrate"))
+    args = parser.parse_args()
+
+    if args.command == "init-db":
+        init_db()
+    else:
+        migrate()
+    print(f"{args.command}: done")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,63 @@ AUTH_REQUIRED = False
 SECRET_KEY = "your-super-secret-key" 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
 
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", None)
+
+# Verified-principal cache (see dependencies/principal_cache.py)
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 10000))
+# Upper bound on how long a cached principal is trusted, even if the token lives longer.
+# Keeps workers that never saw an invalidation from serving a stale account for too long.
+PRINCIPAL_CACHE_MAX_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_MAX_TTL_SECONDS", 300))
+
+# Password hashing pool (see _Authenticate/hashing.py)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+# How many hash/verify calls may wait for a worker before new ones get a 503. Waiting
+# calls are awaited on the event loop and hold no threadpool thread, so this does not
+# need to stay below anyio's threadpool size (40).
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", 2))
+
+# Password hash policy. Hashes that don't match it are upgraded on the next successful login.
+# Size these with `python -m benchmarks.password_hash` (hashes/sec per core).
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # "bcrypt" or "argon2"
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", 65536))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+
+# Event-loop lag monitor (see dependencies/loop_monitor.py). Off when 0.
+# Set it in tests/staging: any stall of the loop longer than this is logged and counted.
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 0))
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", 10))
+
+# Per-request SQL counters (see _Metrics/query_stats.py).
+# Warn when the same statement runs this many times in one request (likely an N+1). Off when 0.
+QUERY_REPEAT_WARN_THRESHOLD = int(os.getenv("QUERY_REPEAT_WARN_THRESHOLD", 0))
+
+# Slow-query log, served at /metrics/slow-queries. Off when 0.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 0))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", 200))
+# Run EXPLAIN (in a background thread) the first time each statement shape is slow.
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+
+# Unread message/notification counters cached in Redis (see dependencies/unread_counters.py).
+# A counter is recounted from the DB at least this often.
+UNREAD_COUNTER_TTL_SECONDS = int(os.getenv("UNREAD_COUNTER_TTL_SECONDS", 3600))
+# Background reconcile of the cached counters against the DB: every this many
+# seconds, up to BATCH counters are recounted. 0 disables it.
+UNREAD_COUNTER_RECONCILE_SECONDS = float(os.getenv("UNREAD_COUNTER_RECONCILE_SECONDS", 300))
+UNREAD_COUNTER_RECONCILE_BATCH = int(os.getenv("UNREAD_COUNTER_RECONCILE_BATCH", 500))
+
+# Topic views are counted in Redis and written to Topics.view_count in batches
+# (see dependencies/topic_views.py). 0 disables the background flush.
+TOPIC_VIEW_FLUSH_SECONDS = float(os.getenv("TOPIC_VIEW_FLUSH_SECONDS", 30))
+TOPIC_VIEW_FLUSH_BATCH = int(os.getenv("TOPIC_VIEW_FLUSH_BATCH", 500))
+
+# Compiled quiz answer keys (see dependencies/answer_keys.py), kept in process and in Redis.
+# Without Redis, a worker may grade with a key up to this old after a question changed.
+ANSWER_KEY_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", 300))
+ANSWER_KEY_CACHE_MAX_SIZE = int(os.getenv("ANSWER_KEY_CACHE_MAX_SIZE", 1000))
@@ -1,7 +1,12 @@
 import os
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from ._Metrics.histogram import Histogram
 
 DB_USER = os.environ.get("DB_USER", "root")
 DB_PASS = os.environ.get("DB_PASS", "") # Empty default password
@@ -9,20 +14,149 @@ DB_HOST = os.environ.get("DB_HOST", "db") # Default is the Docker service name '
 DB_PORT = os.environ.get("DB_PORT", "3306")
 DB_NAME = os.environ.get("DB_NAME", "elearning_db")
 
-SQLALCHEMY_DATABASE_URL = (
-    f"mysql+mysqlconnector://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Connection pool. Per worker: at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections,
+# so (size + overflow) * workers * instances must stay below MySQL max_connections.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30)) # seconds to wait for a free connection
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800)) # keep below MySQL wait_timeout
+
+# DATABASE_URL replaces the DB_* parts entirely (tests point it at a sqlite file).
+SQLALCHEMY_DATABASE_URL = os.environ.get(
+    "DATABASE_URL",
+    f"mysql+mysqlconnector://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
 )
 
 # SQLALCHEMY_DATABASE_URL = "mysql+mysqlconnector://root:@localhost:3306/elearning_db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, echo=False
+# Async driver for the AsyncSession routes; tests point this at sqlite+aiosqlite.
+ASYNC_SQLALCHEMY_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL",
+    f"mysql+aiomysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+)
+
+# Read replica for the read-only routes that opt in with get_read_db / get_async_read_db
+# (see dependencies/read_routing.py). Without DB_REPLICA_HOST every read goes to the primary.
+DB_REPLICA_HOST = os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_PORT = os.environ.get("DB_REPLICA_PORT", DB_PORT)
+DB_REPLICA_USER = os.environ.get("DB_REPLICA_USER", DB_USER)
+DB_REPLICA_PASS = os.environ.get("DB_REPLICA_PASS", DB_PASS)
+DB_REPLICA_NAME = os.environ.get("DB_REPLICA_NAME", DB_NAME)
+# After a customer writes, their reads stay on the primary this long (covers replication lag).
+DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))
+
+REPLICA_SQLALCHEMY_DATABASE_URL = os.environ.get("REPLICA_DATABASE_URL") or (
+    f"mysql+mysqlconnector://{DB_REPLICA_USER}:{DB_REPLICA_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_REPLICA_NAME}"
+    if DB_REPLICA_HOST else None
+)
+ASYNC_REPLICA_SQLALCHEMY_DATABASE_URL = os.environ.get("ASYNC_REPLICA_DATABASE_URL") or (
+    f"mysql+aiomysql://{DB_REPLICA_USER}:{DB_REPLICA_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_REPLICA_NAME}"
+    if DB_REPLICA_HOST else None
 )
 
+# checkout can be fast (idle connection) or wait up to DB_POOL_TIMEOUT
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - started)
+
+def _create_engine(url: str):
+    # sqlite (tests) is shared with the threadpool, so it must not be bound to one thread
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return create_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=connect_args,
+    )
+
+def _create_async_engine(url: str):
+    # Same pool settings as the sync engine, but a separate set of connections.
+    # sqlite+aiosqlite picks its own pool and rejects the sizing arguments.
+    pool_args = {} if url.startswith("sqlite") else {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    return create_async_engine(url, echo=False, **pool_args)
+
+def _async_sessionmaker(bind):
+    # expire_on_commit=False: attributes are read after commit, and lazy reloads are not possible under asyncio
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = _create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+
+AsyncSessionLocal = _async_sessionmaker(async_engine)
+
+# Without a replica the read engines are the primary ones.
+read_engine = _create_engine(REPLICA_SQLALCHEMY_DATABASE_URL) if REPLICA_SQLALCHEMY_DATABASE_URL else engine
+async_read_engine = (
+    _create_async_engine(ASYNC_REPLICA_SQLALCHEMY_DATABASE_URL)
+    if ASYNC_REPLICA_SQLALCHEMY_DATABASE_URL else async_engine
+)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+AsyncReadSessionLocal = _async_sessionmaker(async_read_engine)
+
 Base = declarative_base()
 
+def pool_status(bind=None) -> dict:
+    """Live numbers for the connection pool behind `bind` (defaults to the primary engine)."""
+    pool = (bind or engine).pool
+    status = {
+        "pool_class": type(pool).__name__,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_seconds": DB_POOL_TIMEOUT,
+        "pre_ping": DB_POOL_PRE_PING,
+        "recycle_seconds": DB_POOL_RECYCLE,
+    }
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update({
+            "checkout_timeouts": pool.timeouts,
+            "checkout_wait_seconds": pool.checkout_wait.snapshot(),
+        })
+    return status
+
 def create_db_tables():
     Base.metadata.create_all(bind=engine)
     
@@ -31,4 +165,8 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,241 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from anyio import from_thread
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from .._Question import model as QuestionModel
+from .._Websocket.Realtime import redis_utils
+from ..config import ANSWER_KEY_CACHE_MAX_SIZE, ANSWER_KEY_CACHE_TTL_SECONDS
+
+# Bumped on every question change of the quiz. A cached key is only used if
+# it was compiled at the current version, so one INCR invalidates every worker.
+ANSWER_KEY_VERSION_KEY = "quiz:answer_key:version:{quiz_id}"
+ANSWER_KEY_KEY = "quiz:answer_key:{quiz_id}"
+
+# one letter per question level in the Redis copy
+LEVEL_CODES = {"easy_question": "E", "medium_question": "M", "hard_question": "H"}
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    Correct option, weight and level of every question of a quiz, by
+    questionID, plus the question IDs of each level (sorted) to draw from.
+    """
+
+    quiz_id: int
+    version: int
+    correct: Dict[int, str]
+    weights: Dict[int, float]
+    levels: Dict[int, str]
+    pools: Dict[str, Tuple[int, ...]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        pools = {level: [] for level in LEVEL_CODES}
+        for question_id, level in self.levels.items():
+            pools.setdefault(level, []).append(question_id)
+        object.__setattr__(self, "pools", {level: tuple(sorted(ids)) for level, ids in pools.items()})
+
+    @property
+    def total_weight(self) -> float:
+        return sum(self.weights.values())
+
+    def score(self, answers: Dict[int, str], paper: Optional[Iterable[int]] = None) -> float:
+        """
+        Percentage of the paper's weight answered correctly; the paper is the
+        whole quiz unless given. 0 for an empty paper.
+        """
+        question_ids = list(self.correct) if paper is None else [q for q in paper if q in self.correct]
+        total = sum(self.weights[question_id] for question_id in question_ids)
+        if total <= 0:
+            return 0.0
+
+        earned = sum(
+            self.weights[question_id]
+            for question_id in question_ids
+            if answers.get(question_id) == self.correct[question_id]
+        )
+        return (earned / total) * 100.0
+
+    def dumps(self) -> str:
+        question_ids = list(self.correct)
+        return json.dumps(
+            {
+                "version": self.version,
+                "ids": question_ids,
+                "options": "".join(self.correct[question_id] for question_id in question_ids),
+                "weights": [self.weights[question_id] for question_id in question_ids],
+                "levels": "".join(LEVEL_CODES[self.levels[question_id]] for question_id in question_ids),
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, quiz_id: int, raw) -> "AnswerKey":
+        data = json.loads(raw)
+        ids = data["ids"]
+        levels = {code: level for level, code in LEVEL_CODES.items()}
+        return cls(
+            quiz_id=quiz_id,
+            version=data["version"],
+            correct=dict(zip(ids, data["options"])),
+            weights=dict(zip(ids, data["weights"])),
+            levels={question_id: levels[code] for question_id, code in zip(ids, data["levels"])},
+        )
+
+
+def compile_answer_key(db: Session, quiz_id: int, version: int = 0) -> AnswerKey:
+    """Reads just (questionID, correct_answer, level) of the quiz; no Question objects are built."""
+    rows = (
+        db.query(
+            QuestionModel.Question.questionID,
+            QuestionModel.Question.correct_answer,
+            QuestionModel.Question.level,
+        )
+        .filter(QuestionModel.Question.quizID == quiz_id)
+        .order_by(QuestionModel.Question.questionID)
+        .all()
+    )
+    return AnswerKey(
+        quiz_id=quiz_id,
+        version=version,
+        correct={question_id: correct_answer for question_id, correct_answer, _ in rows},
+        # every question is worth one point for now
+        weights={question_id: 1.0 for question_id, _, _ in rows},
+        levels={question_id: level for question_id, _, level in rows},
+    )
+
+
+async def _shared_version(quiz_id: int) -> Optional[int]:
+    """Current version of the quiz's key, or None when Redis can't tell."""
+    if redis_utils.redis_client is None:
+        return None
+    try:
+        version = await redis_utils.redis_client.get(ANSWER_KEY_VERSION_KEY.format(quiz_id=quiz_id))
+    except RedisError as e:
+        print(f"ERROR: could not read answer key version of quiz {quiz_id}: {e}")
+        return None
+    return int(version) if version is not None else 0
+
+
+async def _load_shared(quiz_id: int, version: int) -> Optional[AnswerKey]:
+    try:
+        raw = await redis_utils.redis_client.get(ANSWER_KEY_KEY.format(quiz_id=quiz_id))
+    except RedisError as e:
+        print(f"ERROR: could not read answer key of quiz {quiz_id}: {e}")
+        return None
+
+    if raw is None:
+        return None
+    try:
+        key = AnswerKey.loads(quiz_id, raw)
+    except (KeyError, ValueError):
+        # written in an older format; recompiled and overwritten
+        return None
+    return key if key.version == version else None
+
+
+async def _store_shared(key: AnswerKey) -> None:
+    # Tagged with the version read before compiling: if the questions changed
+    # meanwhile, readers see an older version than the current one and skip it.
+    try:
+        await redis_utils.redis_client.set(
+            ANSWER_KEY_KEY.format(quiz_id=key.quiz_id), key.dumps(), ex=ANSWER_KEY_CACHE_TTL_SECONDS
+        )
+    except RedisError as e:
+        print(f"ERROR: could not cache answer key of quiz {key.quiz_id}: {e}")
+
+
+class AnswerKeyCache:
+    """
+    Compiled answer keys per quiz, in process and in Redis.
+
+    A lookup costs one Redis GET (the version) when the key is already in
+    process, and never touches the DB unless no worker compiled the current
+    version yet. Without Redis, in-process keys are trusted for `ttl` seconds.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, AnswerKey]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, quiz_id: int) -> AnswerKey:
+        """For sync endpoints running in the threadpool."""
+        version = from_thread.run(_shared_version, quiz_id)
+
+        key = self._local(quiz_id, version)
+        if key is not None:
+            return key
+
+        if version is not None:
+            key = from_thread.run(_load_shared, quiz_id, version)
+            if key is not None:
+                self._put(key)
+                return key
+
+        key = compile_answer_key(db, quiz_id, version or 0)
+        if version is not None:
+            from_thread.run(_store_shared, key)
+        self._put(key)
+        return key
+
+    async def invalidate(self, quiz_id: int) -> None:
+        self.forget(quiz_id)
+        if redis_utils.redis_client is None:
+            return
+
+        try:
+            async with redis_utils.redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(ANSWER_KEY_VERSION_KEY.format(quiz_id=quiz_id))
+                pipe.delete(ANSWER_KEY_KEY.format(quiz_id=quiz_id))
+                await pipe.execute()
+        except RedisError as e:
+            print(f"ERROR: could not invalidate answer key of quiz {quiz_id}: {e}")
+
+    def forget(self, quiz_id: int) -> None:
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _local(self, quiz_id: int, version: Optional[int]) -> Optional[AnswerKey]:
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None:
+                return None
+
+            cached_at, key = entry
+            if version is not None and key.version != version:
+                return None
+            if version is None and cached_at + self.ttl <= time.time():
+                del self._entries[quiz_id]
+                return None
+
+            self._entries.move_to_end(quiz_id)
+            return key
+
+    def _put(self, key: AnswerKey) -> None:
+        with self._lock:
+            self._entries[key.quiz_id] = (time.time(), key)
+            self._entries.move_to_end(key.quiz_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+answer_key_cache = AnswerKeyCache(ANSWER_KEY_CACHE_MAX_SIZE, ANSWER_KEY_CACHE_TTL_SECONDS)
+
+
+def invalidate_answer_key_from_thread(*quiz_ids: Optional[int]) -> None:
+    """Call after committing a question change; questions without a quiz are skipped."""
+    for quiz_id in {quiz_id for quiz_id in quiz_ids if quiz_id is not None}:
+        from_thread.run(answer_key_cache.invalidate, quiz_id)
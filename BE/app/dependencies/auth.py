@@ -1,15 +1,19 @@
 # app/auth.py
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
+import uuid
 import httpx
 from jose import jwt, JWTError
-from fastapi import Depends, HTTPException, Header, WebSocket, WebSocketException, status
+from fastapi import Depends, HTTPException, Header, Request, WebSocket, WebSocketException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from ..database import get_db
+from .._Customer.schema import RoleEnum
+from .principal_cache import Principal
+from .token_revocation import is_token_revoked
 
 security = HTTPBearer()
 
@@ -26,15 +30,25 @@ class CustomJWTError(Exception):
         self.detail = detail
         self.status_code = status_code
 
+def customer_token_claims(customer) -> dict:
+    """Claims that let a request authenticate without looking the customer up."""
+    return {
+        "sub": customer.fullname,
+        "customerID": customer.customerID,
+        "role": customer.role,
+    }
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Generates the JWT."""
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # iat keeps its fraction of a second, for the deny-list's revoked-before check
+    to_encode.update({"exp": expire, "iat": now.timestamp(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -63,31 +77,70 @@ def decode_access_token(token: str):
 async def get_raw_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     return credentials.credentials  
 
-async def get_current_active_user(
+async def authenticate_token(token: str, db: Session) -> Principal:
+    """
+    Fast path: tokens carrying signed customerID/role claims are trusted as-is
+    (only the Redis deny-list is consulted). Older tokens with just `sub`
+    fall back to validate_token, which resolves the customer by fullname.
+    """
+    try:
+        payload = decode_access_token(token)
+    except CustomJWTError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"X-Auth-Failed": "Token rejected"}
+        )
+
+    if payload.get("customerID") is None:
+        from .._Authenticate.authenticate import validate_token
+        return await validate_token(token, db)
+
+    if await is_token_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"X-Auth-Failed": "Token rejected"}
+        )
+
+    return Principal(
+        customerID=int(payload["customerID"]),
+        fullname=payload.get("sub"),
+        role=payload.get("role"),
+    )
+
+async def get_current_principal(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)):
-    from .._Authenticate.authenticate import validate_token
-    
+    db: Session = Depends(get_db)) -> Principal:
     token = credentials.credentials
     
-    auth_record = await validate_token(token, db)
+    principal = await authenticate_token(token, db)
     
-    if not auth_record:
+    if not principal:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
-    return auth_record.customerID
-    # return
+    # read routing (sticky primary after a write) needs to know who is asking
+    request.state.principal = principal
+    return principal
+
+async def get_current_active_user(principal: Principal = Depends(get_current_principal)):
+    return principal.customerID
+
+async def get_current_operator(principal: Principal = Depends(get_current_principal)) -> Principal:
+    """Operator-only endpoints (metrics, slow-query log): students are refused."""
+    if principal.role != RoleEnum.instructor:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operator access required")
+    return principal
     
 async def get_websocket_user_id(websocket: WebSocket, token: str, db : Session = Depends(get_db)):
-    from .._Authenticate.authenticate import validate_token
-    
     try:      
-        auth_record = await validate_token(token, db)
+        principal = await authenticate_token(token, db)
         
-        if not auth_record:
+        if not principal:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
         
-        return auth_record.customerID
+        return principal.customerID
 
     except httpx.HTTPError:
         raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, 
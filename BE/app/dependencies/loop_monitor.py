@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+from .._Metrics.histogram import Histogram
+from ..config import LOOP_BLOCK_THRESHOLD_MS, LOOP_MONITOR_INTERVAL_MS
+
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# how many recent stalls are kept for /metrics/event-loop
+RECENT_BLOCKS = 50
+
+
+class LoopMonitor:
+    """
+    Detects a blocked event loop.
+
+    A background task sleeps for `interval` seconds and measures how late it
+    wakes up; being late by more than `threshold` means something ran on the
+    loop without awaiting (sync DB call, file copy, hashing...). Each stall is
+    logged and counted, so a test run or staging soak can assert `blocks == 0`.
+
+    asyncio debug mode is switched on as well, so the coroutine that held the
+    loop is named in the "Executing <Task ...> took N seconds" log line.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.lag = Histogram(LOOP_LAG_BUCKETS)
+        self.blocks = 0
+        self.max_block = 0.0
+        self.recent: List[dict] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.observe(lag)
+
+    def observe(self, lag: float) -> None:
+        self.lag.observe(lag)
+        if lag < self.threshold:
+            return
+
+        with self._lock:
+            self.blocks += 1
+            self.max_block = max(self.max_block, lag)
+            self.recent.append({"at": time.time(), "ms": round(lag * 1000, 1)})
+            del self.recent[:-RECENT_BLOCKS]
+
+        print(f"WARNING: event loop blocked for {lag * 1000:.0f} ms (threshold {self.threshold * 1000:.0f} ms)")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            blocks = self.blocks
+            max_block = self.max_block
+            recent = list(self.recent)
+
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold * 1000,
+            "interval_ms": self.interval * 1000,
+            "blocks": blocks,
+            "max_block_ms": round(max_block * 1000, 1),
+            "recent_blocks": recent,
+            "lag_seconds": self.lag.snapshot(),
+        }
+
+
+loop_monitor = LoopMonitor(LOOP_BLOCK_THRESHOLD_MS, LOOP_MONITOR_INTERVAL_MS)
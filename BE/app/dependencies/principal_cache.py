@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from ..config import PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_MAX_TTL_SECONDS
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Session-independent snapshot of an authenticated customer."""
+
+    customerID: int
+    fullname: str
+    role: str
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of verified tokens -> Principal.
+
+    Each entry expires at the token's `exp` (capped by `max_ttl`), and every
+    token of a customer can be dropped at once with `invalidate_customer`.
+    """
+
+    def __init__(self, max_size: int, max_ttl: int):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._by_customer: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+
+            expires_at, principal = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, expires_at: Optional[float] = None) -> None:
+        deadline = time.time() + self.max_ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+
+            self._entries[token] = (deadline, principal)
+            self._by_customer.setdefault(principal.customerID, set()).add(token)
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_customer(self, customer_id: int) -> None:
+        """Drops every cached token that resolved to this customer."""
+        with self._lock:
+            for token in list(self._by_customer.get(customer_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_customer.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        # caller must hold the lock
+        _, principal = self._entries.pop(token)
+        tokens = self._by_customer.get(principal.customerID)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_customer[principal.customerID]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_MAX_TTL_SECONDS)
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict
+
+from anyio import from_thread
+from fastapi import Request
+
+from .._Websocket.Realtime import redis_utils
+from ..database import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    DB_REPLICA_STICKY_SECONDS,
+    ReadSessionLocal,
+    SessionLocal,
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+)
+
+# Shared across workers: a write served by one worker must pin reads served by the others.
+STICKY_PRIMARY_KEY = "db:sticky_primary:{customer_id}"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Clients that must see their own write right away can also ask for it explicitly.
+CONSISTENCY_HEADER = "X-Consistency"
+
+# expired entries are dropped once the map grows past this
+STICKY_PRUNE_SIZE = 10000
+
+
+class StickyPrimary:
+    """
+    Per-customer "read from the primary until" deadlines, kept in-process.
+
+    The Redis key is the source of truth across workers; this map only saves
+    the round trip for the worker that served the write.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, customer_id: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._until[customer_id] = now + self.window
+            if len(self._until) > STICKY_PRUNE_SIZE:
+                self._until = {cid: t for cid, t in self._until.items() if t > now}
+
+    def is_sticky(self, customer_id: int) -> bool:
+        with self._lock:
+            until = self._until.get(customer_id)
+        return until is not None and until > time.time()
+
+
+sticky_primary = StickyPrimary(DB_REPLICA_STICKY_SECONDS)
+
+
+async def mark_primary(customer_id: int) -> None:
+    """Called after a customer's write so their next reads see it."""
+    if read_engine is engine and async_read_engine is async_engine:
+        return
+
+    sticky_primary.mark(customer_id)
+    if redis_utils.redis_client is None:
+        return
+
+    await redis_utils.redis_client.set(
+        STICKY_PRIMARY_KEY.format(customer_id=customer_id),
+        1,
+        px=int(DB_REPLICA_STICKY_SECONDS * 1000),
+    )
+
+
+async def wants_primary(request: Request) -> bool:
+    if request.headers.get(CONSISTENCY_HEADER, "").lower() == "primary":
+        return True
+
+    # set by get_current_principal; anonymous reads are never sticky
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        return False
+
+    if sticky_primary.is_sticky(principal.customerID):
+        return True
+
+    if redis_utils.redis_client is None:
+        return False
+
+    return bool(await redis_utils.redis_client.exists(
+        STICKY_PRIMARY_KEY.format(customer_id=principal.customerID)
+    ))
+
+
+def get_read_db(request: Request):
+    """`get_db` for read-only routes: the replica, unless this request must read its own writes."""
+    session_factory = ReadSessionLocal
+    if read_engine is engine or from_thread.run(wants_primary, request):
+        session_factory = SessionLocal
+
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_read_sessionmaker(request: Request):
+    """For handlers that open their own session (e.g. a streamed response): the sessionmaker `get_read_db` would use."""
+    if read_engine is engine or await wants_primary(request):
+        return SessionLocal
+    return ReadSessionLocal
+
+
+async def get_async_read_db(request: Request):
+    """`get_async_db` for read-only routes: the replica, unless this request must read its own writes."""
+    session_factory = AsyncReadSessionLocal
+    if async_read_engine is async_engine or await wants_primary(request):
+        session_factory = AsyncSessionLocal
+
+    async with session_factory() as db:
+        yield db
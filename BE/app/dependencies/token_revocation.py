@@ -0,0 +1,100 @@
+import time
+from typing import Optional
+
+from anyio import from_thread
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from .._Authenticate.refresh_tokens import revoke_customer_refresh_tokens
+from .._Websocket.Realtime import redis_utils
+from ..config import ACCESS_TOKEN_EXPIRE_MINUTES
+from .principal_cache import principal_cache
+
+REVOKED_JTI_KEY = "auth:revoked:jti:{jti}"
+# Tokens of this customer issued before the stored time are rejected. Both the
+# stored time and the tokens' iat keep their fraction of a second, so a token
+# minted earlier in the revoking second is rejected and the new login right
+# after a password change is not.
+REVOKED_BEFORE_KEY = "auth:revoked_before:{customer_id}"
+# How long a client should wait before retrying while the deny-list can't be read
+REVOCATION_RETRY_AFTER_SECONDS = 1
+
+
+async def revoke_token(payload: dict) -> None:
+    """Puts a single token (by jti) on the deny-list until it expires on its own."""
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if not jti or exp is None:
+        return
+
+    ttl = int(exp - time.time()) + 1
+    if ttl <= 0 or redis_utils.redis_client is None:
+        return
+
+    try:
+        await redis_utils.redis_client.set(REVOKED_JTI_KEY.format(jti=jti), 1, ex=ttl)
+    except RedisError as e:
+        print(f"ERROR: could not revoke token {jti}: {e}")
+
+
+async def revoke_customer_tokens(customer_id: int) -> None:
+    """Rejects every token issued to this customer so far (password change, delete, role change)."""
+    principal_cache.invalidate_customer(customer_id)
+
+    if redis_utils.redis_client is None:
+        print("ERROR: Redis client is not initialized. Cannot revoke tokens.")
+        return
+
+    try:
+        await redis_utils.redis_client.set(
+            REVOKED_BEFORE_KEY.format(customer_id=customer_id),
+            time.time(),
+            ex=ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 60,
+        )
+        await revoke_customer_refresh_tokens(customer_id)
+    except RedisError as e:
+        print(f"ERROR: could not revoke tokens of customer {customer_id}: {e}")
+
+
+def revoke_customer_tokens_from_thread(customer_id: int) -> None:
+    """Same as `revoke_customer_tokens`, for sync endpoints running in the threadpool."""
+    from_thread.run(revoke_customer_tokens, customer_id)
+
+
+async def is_token_revoked(payload: dict) -> bool:
+    """
+    Checks a decoded token against the deny-list.
+
+    Fails closed: when Redis is configured but can't be read, the request gets
+    a 503 rather than being let through with a possibly revoked token. Without
+    Redis at all there is no deny-list, and tokens are checked by signature
+    and expiry only.
+    """
+    if redis_utils.redis_client is None:
+        return False
+
+    jti = payload.get("jti")
+    customer_id = payload.get("customerID")
+
+    try:
+        revoked_jti, revoked_before = await redis_utils.redis_client.mget(
+            REVOKED_JTI_KEY.format(jti=jti),
+            REVOKED_BEFORE_KEY.format(customer_id=customer_id),
+        )
+    except RedisError as e:
+        print(f"ERROR: could not check token revocation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not check the token, please retry shortly",
+            headers={"Retry-After": str(REVOCATION_RETRY_AFTER_SECONDS)},
+        )
+
+    if jti and revoked_jti is not None:
+        return True
+
+    if revoked_before is not None:
+        # tokens from before iat was added predate every revocation
+        issued_at: Optional[float] = payload.get("iat")
+        return float(issued_at or 0) < float(revoked_before)
+
+    return False
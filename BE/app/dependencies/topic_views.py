@@ -0,0 +1,236 @@
+import asyncio
+import uuid
+from typing import Dict, Iterable, Optional
+
+from anyio import from_thread
+from redis.exceptions import RedisError
+from sqlalchemy import bindparam, update
+
+from .._Topic import model as TopicModel
+from .._Websocket.Realtime import redis_utils
+from ..config import TOPIC_VIEW_FLUSH_BATCH, TOPIC_VIEW_FLUSH_SECONDS
+from ..database import AsyncSessionLocal
+
+# views not yet written to Topics.view_count
+PENDING_VIEWS_KEY = "topic:views:{topic_id}"
+DIRTY_TOPICS_KEY = "topic:views:dirty"
+FLUSH_LOCK_KEY = "topic:views:flush_lock"
+# The batch being written by the flusher: a hash of the flush token, the views
+# and whether the DB commit went through. The same token is written to
+# Topics.view_flush_token with the views, so a reader can tell whether the
+# row it read already includes them.
+INFLIGHT_VIEWS_KEY = "topic:views:inflight:{topic_id}"
+# a committed batch is kept this long, for readers that read the row before the commit
+INFLIGHT_TTL_SECONDS = 24 * 60 * 60
+
+# Moves the pending views into a new in-flight batch. A batch left uncommitted
+# by a flush that died is carried into the new one.
+_MOVE_SCRIPT = """
+local views = tonumber(redis.call('GET', KEYS[1]) or '0')
+if redis.call('HGET', KEYS[2], 'committed') == '0' then
+    views = views + tonumber(redis.call('HGET', KEYS[2], 'views'))
+end
+redis.call('DEL', KEYS[1])
+if views <= 0 then
+    redis.call('SREM', KEYS[3], ARGV[2])
+    return 0
+end
+redis.call('HSET', KEYS[2], 'token', ARGV[1], 'views', views, 'committed', '0')
+redis.call('PERSIST', KEYS[2])
+return views
+"""
+
+# Marks the batch written; the topic leaves the dirty set unless views came in
+# meanwhile. Atomic with record_view's MULTI, so a view can't slip in between.
+_SETTLE_SCRIPT = """
+if redis.call('HGET', KEYS[2], 'token') == ARGV[1] then
+    redis.call('HSET', KEYS[2], 'committed', '1')
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[3], ARGV[2])
+end
+"""
+
+
+def _unflushed(topic, pending, inflight_token, inflight_views) -> int:
+    """Views on top of the row's view_count: pending ones, plus the in-flight batch unless the row has it."""
+    views = int(pending or 0)
+    if inflight_token is not None and inflight_token.decode() != topic.view_flush_token:
+        views += int(inflight_views)
+    return views
+
+
+async def record_view(topic: TopicModel.Topic) -> int:
+    """
+    Counts one view in Redis and returns the views to add on top of the
+    topic's view_count (read before this call). Never touches the DB.
+    """
+    if redis_utils.redis_client is None:
+        return 0
+
+    try:
+        async with redis_utils.redis_client.pipeline(transaction=True) as pipe:
+            pipe.incr(PENDING_VIEWS_KEY.format(topic_id=topic.topicID))
+            pipe.sadd(DIRTY_TOPICS_KEY, topic.topicID)
+            pipe.hmget(INFLIGHT_VIEWS_KEY.format(topic_id=topic.topicID), "token", "views")
+            pending, _, (token, views) = await pipe.execute()
+        return _unflushed(topic, pending, token, views)
+    except RedisError as e:
+        print(f"ERROR: could not record a view of topic {topic.topicID}: {e}")
+        return 0
+
+
+async def pending_views(topics: Iterable[TopicModel.Topic]) -> Dict[int, int]:
+    """
+    Views counted in Redis but not in these rows yet, to add on top of their
+    view_count. The rows must have been read before this call.
+    """
+    topics = list(topics)
+    if not topics or redis_utils.redis_client is None:
+        return {}
+
+    try:
+        async with redis_utils.redis_client.pipeline(transaction=True) as pipe:
+            pipe.mget([PENDING_VIEWS_KEY.format(topic_id=topic.topicID) for topic in topics])
+            for topic in topics:
+                pipe.hmget(INFLIGHT_VIEWS_KEY.format(topic_id=topic.topicID), "token", "views")
+            counts, *inflight = await pipe.execute()
+    except RedisError as e:
+        print(f"ERROR: could not read pending topic views: {e}")
+        return {}
+
+    views = {
+        topic.topicID: _unflushed(topic, pending, token, inflight_views)
+        for topic, pending, (token, inflight_views) in zip(topics, counts, inflight)
+    }
+    return {topic_id: count for topic_id, count in views.items() if count}
+
+
+def pending_views_from_thread(topics: Iterable[TopicModel.Topic]) -> Dict[int, int]:
+    """Same as `pending_views`, for sync endpoints running in the threadpool."""
+    return from_thread.run(pending_views, topics)
+
+
+class TopicViewFlusher:
+    """
+    Writes the view counts buffered in Redis to Topics.view_count.
+
+    Every `interval` seconds, up to `batch` dirty topics are flushed in one
+    transaction: their pending views move to an in-flight batch (one Redis
+    step), are added to the column together with the batch's token, and the
+    batch is then marked committed. Views that arrive meanwhile stay pending
+    for the next round. Readers add the in-flight batch only while their row
+    doesn't carry its token, so the served count is exact at every step. A
+    flush that dies before its commit is retried by the next one; one that
+    dies between the commit and the mark counts that batch twice, never loses
+    it.
+
+    Only one instance flushes at a time (Redis lock), and a last flush runs on
+    shutdown.
+    """
+
+    def __init__(self, interval: float, batch: int):
+        self.interval = interval
+        self.batch = batch
+        self.flushed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"ERROR: topic view flush failed: {e}")
+
+    async def _move(self, topic_ids, flush_token: str) -> Dict[int, int]:
+        moved = {}
+        for topic_id in topic_ids:
+            views = await redis_utils.redis_client.eval(
+                _MOVE_SCRIPT,
+                3,
+                PENDING_VIEWS_KEY.format(topic_id=topic_id),
+                INFLIGHT_VIEWS_KEY.format(topic_id=topic_id),
+                DIRTY_TOPICS_KEY,
+                flush_token,
+                topic_id,
+            )
+            if views:
+                moved[topic_id] = int(views)
+        return moved
+
+    async def _write(self, moved: Dict[int, int], flush_token: str) -> None:
+        topics = TopicModel.Topic.__table__
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(topics)
+                .where(topics.c.topicID == bindparam("topic_id"))
+                .values(view_count=topics.c.view_count + bindparam("views"), view_flush_token=flush_token),
+                [{"topic_id": topic_id, "views": views} for topic_id, views in moved.items()],
+            )
+            await db.commit()
+
+    async def _settle(self, topic_ids, flush_token: str) -> None:
+        for topic_id in topic_ids:
+            await redis_utils.redis_client.eval(
+                _SETTLE_SCRIPT,
+                3,
+                PENDING_VIEWS_KEY.format(topic_id=topic_id),
+                INFLIGHT_VIEWS_KEY.format(topic_id=topic_id),
+                DIRTY_TOPICS_KEY,
+                flush_token,
+                topic_id,
+                INFLIGHT_TTL_SECONDS,
+            )
+
+    async def flush(self) -> int:
+        client = redis_utils.redis_client
+        if client is None:
+            return 0
+
+        token = uuid.uuid4().hex
+        lock_ttl_ms = int(max(self.interval, 1) * 1000)
+        if not await client.set(FLUSH_LOCK_KEY, token, nx=True, px=lock_ttl_ms):
+            return 0
+
+        try:
+            topic_ids = [int(topic_id) for topic_id in await client.srandmember(DIRTY_TOPICS_KEY, self.batch)]
+            if not topic_ids:
+                return 0
+
+            flush_token = uuid.uuid4().hex
+            moved = await self._move(topic_ids, flush_token)
+            if moved:
+                await self._write(moved, flush_token)
+            await self._settle(topic_ids, flush_token)
+
+            self.flushed += sum(moved.values())
+            return len(moved)
+        finally:
+            if await client.get(FLUSH_LOCK_KEY) == token.encode():
+                await client.delete(FLUSH_LOCK_KEY)
+
+
+topic_view_flusher = TopicViewFlusher(TOPIC_VIEW_FLUSH_SECONDS, TOPIC_VIEW_FLUSH_BATCH)
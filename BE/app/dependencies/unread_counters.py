@@ -0,0 +1,266 @@
+import asyncio
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from anyio import from_thread
+from redis.exceptions import RedisError
+
+from .._Websocket.Realtime import redis_utils
+from .._Websocket.Realtime.connection_manager import manager
+from ..config import (
+    UNREAD_COUNTER_RECONCILE_BATCH,
+    UNREAD_COUNTER_RECONCILE_SECONDS,
+    UNREAD_COUNTER_TTL_SECONDS,
+)
+from ..database import AsyncSessionLocal
+
+UNREAD_MESSAGES_KEY = "unread:messages:{user_id}"
+UNREAD_NOTIFICATIONS_KEY = "unread:notifications:{user_id}"
+# Changes on every adjust or reset of a counter. A seed or reconcile counted
+# from the DB is only stored if the version is still the one read before the
+# count, so a write that lands while counting is never overwritten.
+UNREAD_VERSION_KEY = "unread:version:{kind}:{user_id}"
+
+_COUNTER_KEYS = {
+    "messages": UNREAD_MESSAGES_KEY,
+    "notifications": UNREAD_NOTIFICATIONS_KEY,
+}
+
+# Only moves a counter that is already seeded: a missing key means "unknown,
+# count it from the DB", never 0. A negative result means it drifted; drop it.
+_ADJUST_SCRIPT = """
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local n = redis.call('INCRBY', KEYS[1], ARGV[1])
+if n < 0 then
+    redis.call('DEL', KEYS[1])
+    return nil
+end
+return n
+"""
+
+# Stores a count taken from the DB, unless the counter was adjusted or reset
+# since the version was read. Returns 1 when stored.
+_SEED_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+    return 0
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3], 'NX') then
+    return 1
+end
+return 0
+"""
+
+# Same check, but overwrites a seeded counter (keeping its expiry) and never
+# creates one. Returns the previous value when it was replaced.
+_RECONCILE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[2] then
+    return nil
+end
+local previous = redis.call('GET', KEYS[1])
+if not previous then
+    return nil
+end
+redis.call('SET', KEYS[1], ARGV[1], 'KEEPTTL')
+return previous
+"""
+
+
+def _keys(kind: str, user_id: int):
+    return _COUNTER_KEYS[kind].format(user_id=user_id), UNREAD_VERSION_KEY.format(kind=kind, user_id=user_id)
+
+
+async def _publish(kind: str, user_id: int, count: int) -> None:
+    await manager.publish_to_channel(
+        str(user_id),
+        {"type": "unread_count", "kind": kind, "count": int(count)},
+    )
+
+
+async def _adjust(kind: str, user_id: int, amount: int) -> None:
+    if amount == 0 or redis_utils.redis_client is None:
+        return
+
+    key, version_key = _keys(kind, user_id)
+    try:
+        count = await redis_utils.redis_client.eval(
+            _ADJUST_SCRIPT, 2, key, version_key, amount, uuid.uuid4().hex, UNREAD_COUNTER_TTL_SECONDS
+        )
+        if count is not None:
+            await _publish(kind, user_id, count)
+    except RedisError as e:
+        print(f"ERROR: could not update unread {kind} counter of {user_id}: {e}")
+
+
+async def _get_or_count(kind: str, user_id: int, count_from_db: Callable[[], Awaitable[int]]) -> int:
+    """
+    Serves the counter from Redis, seeding it from the DB on a miss.
+
+    The seed is dropped if the counter was adjusted while the DB was counted
+    (the next read counts again), so it can't hide a concurrent write. The
+    reconciler and the key's expiry catch any other drift.
+    """
+    key, version_key = _keys(kind, user_id)
+    client = redis_utils.redis_client
+    version = b""
+    if client is not None:
+        try:
+            cached, version = await client.mget(key, version_key)
+            if cached is not None:
+                return int(cached)
+        except RedisError as e:
+            print(f"ERROR: could not read unread counter {key}: {e}")
+            client = None
+
+    count = await count_from_db()
+
+    if client is not None:
+        try:
+            await client.eval(
+                _SEED_SCRIPT, 2, key, version_key, count, version or b"", UNREAD_COUNTER_TTL_SECONDS
+            )
+        except RedisError as e:
+            print(f"ERROR: could not seed unread counter {key}: {e}")
+    return count
+
+
+async def adjust_unread_messages(user_id: int, amount: int) -> None:
+    await _adjust("messages", user_id, amount)
+
+
+async def adjust_unread_notifications(user_id: int, amount: int) -> None:
+    await _adjust("notifications", user_id, amount)
+
+
+def adjust_unread_messages_from_thread(user_id: int, amount: int) -> None:
+    """Same as `adjust_unread_messages`, for sync endpoints running in the threadpool."""
+    from_thread.run(adjust_unread_messages, user_id, amount)
+
+
+def adjust_unread_notifications_from_thread(user_id: int, amount: int) -> None:
+    """Same as `adjust_unread_notifications`, for sync endpoints running in the threadpool."""
+    from_thread.run(adjust_unread_notifications, user_id, amount)
+
+
+async def get_unread_messages(user_id: int, count_from_db: Callable[[], Awaitable[int]]) -> int:
+    return await _get_or_count("messages", user_id, count_from_db)
+
+
+async def get_unread_notifications(user_id: int, count_from_db: Callable[[], Awaitable[int]]) -> int:
+    return await _get_or_count("notifications", user_id, count_from_db)
+
+
+async def reset_unread_counters(user_id: int, kind: Optional[str] = None) -> None:
+    """Forgets the cached counters of a user; the next read recounts from the DB."""
+    if redis_utils.redis_client is None:
+        return
+
+    try:
+        async with redis_utils.redis_client.pipeline(transaction=True) as pipe:
+            for name in _COUNTER_KEYS:
+                if kind in (None, name):
+                    key, version_key = _keys(name, user_id)
+                    pipe.delete(key)
+                    # a count already in flight must not seed the old value back
+                    pipe.set(version_key, uuid.uuid4().hex, ex=UNREAD_COUNTER_TTL_SECONDS)
+            await pipe.execute()
+    except RedisError as e:
+        print(f"ERROR: could not reset unread counters of {user_id}: {e}")
+
+
+def reset_unread_counters_from_thread(user_id: int, kind: Optional[str] = None) -> None:
+    """Same as `reset_unread_counters`, for sync endpoints running in the threadpool."""
+    from_thread.run(reset_unread_counters, user_id, kind)
+
+
+async def _count_unread(db, kind: str, user_id: int) -> int:
+    # the routers own the count queries (and import this module)
+    if kind == "messages":
+        from .._Message.message import _unread_total_query
+        return int(await db.scalar(_unread_total_query(user_id)))
+
+    from .._Notification.notification import _unread_count_query
+    return int(await db.scalar(_unread_count_query(user_id)))
+
+
+class UnreadCounterReconciler:
+    """
+    Recounts the cached unread counters against the DB.
+
+    Every `interval` seconds, the next `batch` counters (a SCAN cursor carried
+    over between rounds, so every counter is visited in turn) are counted on
+    the primary and overwritten when they drifted. A counter adjusted while it
+    was being counted is left alone until the next pass. Corrections are
+    pushed over the WebSocket like any other change.
+    """
+
+    def __init__(self, interval: float, batch: int):
+        self.interval = interval
+        self.batch = batch
+        self.corrected = 0
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"ERROR: unread counter reconcile failed: {e}")
+
+    async def reconcile(self) -> int:
+        """One round; returns how many counters were corrected."""
+        client = redis_utils.redis_client
+        if client is None:
+            return 0
+
+        self._cursor, keys = await client.scan(self._cursor, match="unread:*", count=self.batch)
+        counters = []
+        for key in keys:
+            _, kind, user_id = key.decode().split(":", 2)
+            if kind in _COUNTER_KEYS:
+                counters.append((kind, int(user_id)))
+
+        corrected = 0
+        async with AsyncSessionLocal() as db:
+            for kind, user_id in counters:
+                key, version_key = _keys(kind, user_id)
+                version = await client.get(version_key)
+                count = await _count_unread(db, kind, user_id)
+                # end the read, so the next count isn't taken on this one's snapshot
+                await db.rollback()
+                previous = await client.eval(
+                    _RECONCILE_SCRIPT, 2, key, version_key, count, version or b""
+                )
+                if previous is not None and int(previous) != count:
+                    corrected += 1
+                    await _publish(kind, user_id, count)
+
+        self.corrected += corrected
+        return corrected
+
+
+unread_counter_reconciler = UnreadCounterReconciler(UNREAD_COUNTER_RECONCILE_SECONDS, UNREAD_COUNTER_RECONCILE_BATCH)
@@ -1,8 +1,9 @@
 import os
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from .database import engine, Base
+from .database import async_engine, async_read_engine
 # from ._Account import account
 from ._Announcement import announcement
 from ._Assignment import assignment
@@ -16,6 +17,9 @@ from ._Instructor import instructor
 from ._Learning_Content import learning_content
 from ._Material import material
 from ._Message import message
+from ._Metrics import metrics
+from ._Metrics.query_stats import server_timing, track_queries
+from ._Metrics.slow_queries import slow_query_log
 from ._Notification import notification
 from ._Question import question
 from ._Quiz import quiz
@@ -28,19 +32,45 @@ from ._Submission import submission
 from ._Topic import topic
 from ._Websocket import realtime
 
-from .dependencies.auth import get_current_active_user
+from .dependencies.auth import get_current_active_user, get_current_operator
+from .dependencies.loop_monitor import loop_monitor
+from .dependencies.read_routing import SAFE_METHODS, mark_primary
+from .dependencies.topic_views import topic_view_flusher
+from .dependencies.unread_counters import unread_counter_reconciler
+from ._Authenticate.hashing import hash_pool
+from .storage import ensure_upload_dirs, register_upload_dir
 
-Base.metadata.create_all(bind=engine)
+# Schema is managed by `python -m app.cli init-db|migrate`, not at import:
+# importing the app must not need a live database.
 
-app = FastAPI(title="E-Learning Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_upload_dirs()
+    # no-op unless LOOP_BLOCK_THRESHOLD_MS is set
+    loop_monitor.start()
+    topic_view_flusher.start()
+    unread_counter_reconciler.start()
+    yield
+    await unread_counter_reconciler.stop()
+    await topic_view_flusher.stop()
+    await loop_monitor.stop()
+    hash_pool.shutdown()
+    slow_query_log.shutdown()
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
+app = FastAPI(title="E-Learning Backend", lifespan=lifespan)
 
 auth_dependency = [Depends(get_current_active_user)]
+operator_dependency = [Depends(get_current_operator)]
 
 current_file_dir = os.path.dirname(os.path.abspath(__file__))
 
-STATIC_DIR = os.path.join(current_file_dir, '..', 'uploads') 
+STATIC_DIR = register_upload_dir(os.path.join(current_file_dir, '..', 'uploads'))
 
-app.mount("/uploads", StaticFiles(directory=STATIC_DIR), name="uploads")
+# check_dir=False: the directory is created by the lifespan, not at import
+app.mount("/uploads", StaticFiles(directory=STATIC_DIR, check_dir=False), name="uploads")
 
 app.include_router(customer.router, dependencies=auth_dependency)
 # app.include_router(account.router, dependencies=auth_dependency)
@@ -67,11 +97,32 @@ app.include_router(topic.router, dependencies=auth_dependency)
 app.include_router(topic.chat_router, dependencies=auth_dependency)
 app.include_router(message.router, dependencies=auth_dependency)
 app.include_router(message.user_router, dependencies=auth_dependency)
+app.include_router(metrics.router, dependencies=operator_dependency)
 app.include_router(notification.student_router, dependencies=auth_dependency)
 app.include_router(notification.notification_router, dependencies=auth_dependency)
 app.include_router(submission.router, dependencies=auth_dependency)
 app.include_router(realtime.router)
 
+@app.middleware("http")
+async def count_db_queries(request: Request, call_next):
+    with track_queries(f"{request.method} {request.url.path}", request.scope) as stats:
+        response = await call_next(request)
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers.append("Server-Timing", server_timing(stats))
+    return response
+
+@app.middleware("http")
+async def stick_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+
+    # the replica may lag behind; keep this customer's next reads on the primary
+    principal = getattr(request.state, "principal", None)
+    if principal is not None and request.method not in SAFE_METHODS and response.status_code < 400:
+        await mark_primary(principal.customerID)
+
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
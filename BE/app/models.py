@@ -0,0 +1,24 @@
+# Imports every model module so Base.metadata knows all tables.
+# Used by migrations/env.py and the schema CLI, which don't load the routers.
+from ._Announcement import model as announcement
+from ._Assignment import model as assignment
+from ._Course import model as course
+from ._Course_Material import model as course_material
+from ._Customer import model as customer
+from ._File_Image import model as file_image
+from ._Group import model as group
+from ._Instructor import model as instructor
+from ._Learning_Content import model as learning_content
+from ._Material import model as material
+from ._Message import model as message
+from ._Notification import model as notification
+from ._Question import model as question
+from ._Quiz import model as quiz
+from ._Quiz_Attempt import model as quiz_attempt
+from ._Semester import model as semester
+from ._Student import model as student
+from ._Student_Group import model as student_group
+from ._Student_Score import model as student_score
+from ._Submission import model as submission
+from ._Topic import model as topic
+from .database import Base
@@ -0,0 +1,39 @@
+import os
+import threading
+from typing import Set
+
+# Upload directories, created on first use (or by the app lifespan) instead of at import.
+_registered: Set[str] = set()
+_created: Set[str] = set()
+_lock = threading.Lock()
+
+
+def register_upload_dir(path: str) -> str:
+    """Declares a directory uploads are written to; returns the normalized path."""
+    path = os.path.normpath(path)
+    with _lock:
+        _registered.add(path)
+    return path
+
+
+def ensure_upload_dir(path: str) -> str:
+    """Creates `path` if needed. Cheap after the first call, safe to call per request."""
+    if path in _created:
+        return path
+
+    os.makedirs(path, exist_ok=True)
+    with _lock:
+        _created.add(path)
+    return path
+
+
+def ensure_upload_dirs() -> None:
+    with _lock:
+        paths = sorted(_registered)
+
+    for path in paths:
+        try:
+            ensure_upload_dir(path)
+        except OSError as e:
+            # don't block startup; the upload itself will fail with a 500
+            print(f"ERROR: Could not create upload dir {path}: {e}")
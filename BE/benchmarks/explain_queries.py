@@ -0,0 +1,117 @@
+"""
+EXPLAIN the hot query shapes and fail if any of them scans its whole table.
+
+Run from the BE folder, against a database migrated to head:
+    python -m benchmarks.explain_queries
+
+Exits with status 1 when a query reads one of its tables with a full scan
+(MySQL access type ALL or index, sqlite "SCAN <table>" with or without an
+index), so it can run in CI after `alembic upgrade head`. On near-empty
+tables MySQL may prefer a full scan even when an index exists; use a
+database with realistic data.
+
+The statements come from the routers' own query builders, not copies.
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import select, text
+
+from app import models  # noqa: F401  every mapper, so the routers' models configure
+from app.database import engine
+from app._Assignment import assignment, model as AssignmentModel
+from app._Instructor import instructor
+from app._Message import message
+from app._Notification import notification
+from app._Quiz_Attempt import attempt
+from app._Quiz_Attempt.schema import AttemptView
+from app._Topic import topic
+
+# cursor ids of the keyset pages; the plan doesn't depend on them existing
+CURSOR_ID = 100
+PAGE = 50
+
+# not persisted: _submissions_query only reads its id and deadline
+_assignment = AssignmentModel.Assignment(assignmentID=1, deadline=datetime(2025, 1, 1))
+_courses, _group_metrics, _quizzes = instructor._summary_queries(1, 1)
+
+# name -> (tables that must not be scanned, statement); the statements are
+# built by the routers themselves, so a changed router query is what gets checked
+QUERY_SHAPES = {
+    "message.get_conversation": (("Messages", "Conversation_Reads"), (
+        message._conversation_query(1, 2, None, PAGE)
+    )),
+    "message.get_conversation (before_id page)": (("Messages", "Conversation_Reads"), (
+        message._conversation_query(1, 2, CURSOR_ID, PAGE)
+    )),
+    "message.get_unread_message_count (watermarks)": (("Messages", "Conversation_Reads"), (
+        message._unread_total_query(1)
+    )),
+    "message.get_user_conversations": (("Messages", "Conversation_Reads"), message._conversations_query(1)),
+    "notification.get_student_notifications": (("Notifications",), notification._notifications_query(1)),
+    "notification.get_student_unread_notification_count": (("Notifications",), (
+        notification._unread_count_query(1)
+    )),
+    "topic.get_topic": (("Topics",), topic._topic_query(1)),
+    "topic.get_topic_chats": (("Topic_Chats",), topic._chats_query(1, None, PAGE)),
+    "topic.get_topic_chats (after_id page)": (("Topic_Chats",), topic._chats_query(1, CURSOR_ID, PAGE)),
+    "attempt.get_quiz_attempts (student)": (("Quiz_Attempts",), (
+        attempt._attempts_query(1, 1, AttemptView.all, None, PAGE)
+    )),
+    "attempt.get_quiz_attempts (after_id page)": (("Quiz_Attempts",), (
+        attempt._attempts_query(1, None, AttemptView.all, CURSOR_ID, PAGE)
+    )),
+    "attempt.get_quiz_attempts (view=best)": (("Quiz_Attempts",), (
+        attempt._attempts_query(1, None, AttemptView.best, CURSOR_ID, PAGE)
+    )),
+    "attempt.get_quiz_attempts (view=last)": (("Quiz_Attempts",), (
+        attempt._attempts_query(1, None, AttemptView.last, CURSOR_ID, PAGE)
+    )),
+    "assignment.get_assignment_submissions (after_id page)": (("Submissions",), (
+        assignment._submissions_query(_assignment, None, False, False, CURSOR_ID).limit(PAGE + 1)
+    )),
+    "assignment.get_assignment_submissions (ungraded, late)": (("Submissions",), (
+        assignment._submissions_query(_assignment, None, True, True).limit(PAGE + 1)
+    )),
+    "instructor.get_instructor_summary (courses)": (("Courses",), _courses),
+    "instructor.get_instructor_summary (groups)": (("Courses", "Groups"), _group_metrics),
+    "instructor.get_instructor_summary (quizzes)": (("Courses", "Groups", "Student_Score"), _quizzes),
+}
+
+
+def explain(connection, statement) -> list:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return [row.detail for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [dict(row._mapping) for row in connection.execute(text(f"EXPLAIN {sql}"))]
+
+
+def is_full_scan(plan: list, tables, dialect: str) -> bool:
+    # walking a whole index in order is no better than walking the table
+    if dialect == "sqlite":
+        return any(
+            detail.split()[:2] == ["SCAN", table]
+            for detail in plan
+            for table in tables
+        )
+    return any(row.get("table") in tables and row.get("type") in ("ALL", "index") for row in plan)
+
+
+def main() -> int:
+    failures = 0
+    with engine.connect() as connection:
+        dialect = connection.dialect.name
+        for name, (tables, statement) in QUERY_SHAPES.items():
+            plan = explain(connection, statement)
+            full_scan = is_full_scan(plan, tables, dialect)
+            failures += full_scan
+            print(f"{'FULL SCAN' if full_scan else 'ok':<10}{name}")
+            if full_scan:
+                for row in plan:
+                    print(f"{'':<10}{row}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Password hashing throughput per setting, to size login capacity per core.
+
+Run from the BE folder:
+    python -m benchmarks.password_hash
+    python -m benchmarks.password_hash --bcrypt-rounds 10 12 --argon2 2,19456,1 3,65536,4
+
+Each setting is hashed on a single core for about `--seconds`; the
+"logins/sec" column multiplies by PASSWORD_HASH_WORKERS, i.e. what one
+backend instance can verify when the hashing pool is saturated.
+"""
+import argparse
+import time
+
+from app._Authenticate.hashing import HashPolicy, _hash, _verify, current_policy
+from app.config import PASSWORD_HASH_WORKERS
+
+
+def measure(policy: HashPolicy, seconds: float) -> float:
+    hashed = _hash("Benchmark-Password-1!", policy)
+
+    count = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds or count < 3:
+        _verify("Benchmark-Password-1!", hashed)
+        count += 1
+        elapsed = time.perf_counter() - started
+
+    return count / elapsed
+
+
+def describe(policy: HashPolicy) -> str:
+    if policy.scheme == "argon2":
+        return (
+            f"argon2 t={policy.argon2_time_cost} "
+            f"m={policy.argon2_memory_cost}KiB p={policy.argon2_parallelism}"
+        )
+    return f"bcrypt rounds={policy.bcrypt_rounds}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per setting")
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13])
+    parser.add_argument(
+        "--argon2", nargs="*", default=["2,19456,1", "3,65536,4"],
+        help="time_cost,memory_cost_kib,parallelism",
+    )
+    args = parser.parse_args()
+
+    policies = [HashPolicy(scheme="bcrypt", bcrypt_rounds=r) for r in args.bcrypt_rounds]
+    for spec in args.argon2:
+        t, m, p = (int(x) for x in spec.split(","))
+        policies.append(HashPolicy(
+            scheme="argon2", argon2_time_cost=t, argon2_memory_cost=m, argon2_parallelism=p,
+        ))
+
+    print(f"current policy: {describe(current_policy)}, PASSWORD_HASH_WORKERS={PASSWORD_HASH_WORKERS}")
+    print(f"{'setting':<36}{'ms/hash':>10}{'hashes/sec/core':>18}{'logins/sec':>12}")
+    for policy in policies:
+        rate = measure(policy, args.seconds)
+        print(
+            f"{describe(policy):<36}{1000 / rate:>10.1f}{rate:>18.2f}"
+            f"{rate * PASSWORD_HASH_WORKERS:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Exam-start stampede: many simultaneous POST /quiz-attempts against a running
+backend, then a check that attempt numbering held up.
+
+Run from the BE folder, with a backend already serving:
+    python -m benchmarks.quiz_start_concurrency --token $TOKEN --quiz-id 5 --students 1 2 3
+    python -m benchmarks.quiz_start_concurrency --token $TOKEN --quiz-id 5 --students 1 2 3 --per-student 100
+
+Every student fires `--per-student` starts at once (a whole class clicking
+"Start", each of them several times). Afterwards no (student, attempt_number)
+pair may appear twice and no student may hold more attempts than the quiz
+allows; the script exits with 1 if either happened. Use a quiz without other
+attempts, the check covers every attempt of the quiz.
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url: str, token: str, method: str = "GET", body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header("Authorization", f"Bearer {token}")
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            return response.status, json.loads(response.read() or b"null")
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def start_attempt(args, student_id: int, barrier: threading.Barrier):
+    barrier.wait()
+    started = time.perf_counter()
+    status, _ = request(
+        f"{args.url}/quiz-attempts",
+        args.token,
+        method="POST",
+        body={"quiz_id": args.quiz_id, "student_id": student_id},
+    )
+    return status, time.perf_counter() - started
+
+
+def fetch_attempts(args) -> list:
+    attempts = []
+    after_id = None
+    while True:
+        url = f"{args.url}/quizzes/{args.quiz_id}/attempts?limit=500"
+        if after_id is not None:
+            url += f"&after_id={after_id}"
+        status, page = request(url, args.token)
+        if status != 200:
+            raise RuntimeError(f"GET attempts answered {status}")
+        attempts.extend(page)
+        if len(page) < 500:
+            return attempts
+        after_id = page[-1]["attempt_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", required=True, help="access token of a user allowed to start attempts")
+    parser.add_argument("--quiz-id", type=int, required=True)
+    parser.add_argument("--students", type=int, nargs="+", required=True, help="student ids")
+    parser.add_argument("--per-student", type=int, default=50, help="simultaneous starts per student")
+    parser.add_argument("--limit", type=int, default=None, help="the quiz's number_of_attempts, to check it")
+    args = parser.parse_args()
+    args.url = args.url.rstrip("/")
+
+    jobs = [student_id for student_id in args.students for _ in range(args.per_student)]
+    barrier = threading.Barrier(len(jobs))
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        results = list(pool.map(lambda student_id: start_attempt(args, student_id, barrier), jobs))
+
+    statuses = Counter(status for status, _ in results)
+    latencies = [elapsed for _, elapsed in results]
+    print(f"{len(jobs)} starts: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items())))
+    print(
+        f"latency ms: min {min(latencies) * 1000:.0f}, median {statistics.median(latencies) * 1000:.0f}, "
+        f"max {max(latencies) * 1000:.0f}"
+    )
+
+    attempts = fetch_attempts(args)
+    numbers = Counter((attempt["student_id"], attempt["attempt_number"]) for attempt in attempts)
+    per_student = Counter(attempt["student_id"] for attempt in attempts)
+
+    failed = False
+    duplicates = {pair: count for pair, count in numbers.items() if count > 1}
+    if duplicates:
+        failed = True
+        print(f"FAIL: duplicate (student, attempt_number): {duplicates}")
+    if args.limit is not None:
+        over = {student_id: count for student_id, count in per_student.items() if count > args.limit}
+        if over:
+            failed = True
+            print(f"FAIL: students over the limit of {args.limit}: {over}")
+    if statuses.get(500):
+        failed = True
+        print("FAIL: some starts answered 500")
+
+    print(f"{len(attempts)} attempts stored for {len(per_student)} students")
+    if failed:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compute time of a quiz regrade: scoring stored answers against a new key.
+
+Run from the BE folder:
+    python -m benchmarks.regrade
+    python -m benchmarks.regrade --attempts 50000 --questions 100
+
+Builds random packed answers (what Quiz_Attempts.answers holds) and times
+`score_packed` alone, i.e. the part of POST /quizzes/{id}/regrade that is
+not the SELECT and the UPDATEs. Also checks it agrees with the per-submission
+grading (`AnswerKey.score`) on a sample.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app._Quiz_Attempt.grading import OPTION_CODES, pack_answers, score_packed
+from app.dependencies.answer_keys import AnswerKey
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--attempts", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--answered", type=float, default=0.9, help="share of questions each attempt answers")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    options = list(OPTION_CODES)
+    question_ids = sorted(rng.sample(range(1, args.questions * 20), args.questions))
+    key = AnswerKey(
+        quiz_id=1,
+        version=0,
+        correct={question_id: rng.choice(options) for question_id in question_ids},
+        weights={question_id: 1.0 for question_id in question_ids},
+        levels={question_id: "medium_question" for question_id in question_ids},
+    )
+
+    answers = [
+        {question_id: rng.choice(options) for question_id in question_ids if rng.random() < args.answered}
+        for _ in range(args.attempts)
+    ]
+    packed = [pack_answers(attempt, question_ids) for attempt in answers]
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        scores = score_packed(packed, key)
+        timings.append(time.perf_counter() - started)
+
+    for attempt, score in zip(answers[:100], scores[:100]):
+        assert abs(key.score(attempt) - score) < 1e-9, (key.score(attempt), score)
+
+    size = sum(len(blob) for blob in packed)
+    print(f"{args.attempts} attempts x {args.questions} questions, {size / len(packed):.0f} bytes stored per attempt")
+    print(f"score_packed ms: min {min(timings) * 1000:.1f}, median {statistics.median(timings) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Cold-start and worker-respawn time of the backend.
+
+Run from the BE folder:
+    python -m benchmarks.startup_time
+    python -m benchmarks.startup_time --runs 10 --lifespan off
+
+"import" is a fresh interpreter importing app.main (what every worker pays).
+"first response" is a fresh uvicorn worker until GET / answers, i.e. how long
+a respawned or newly scaled-out worker is unavailable. The lifespan connects
+to Redis; use --lifespan off to time a worker without it.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def time_import() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True)
+    return time.perf_counter() - started
+
+
+def time_first_response(port: int, lifespan: str, timeout: float) -> float:
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--lifespan", lifespan, "--log-level", "warning",
+        ],
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if worker.poll() is not None:
+                raise RuntimeError(f"worker exited with code {worker.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1):
+                    return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def summarize(name: str, samples: list) -> None:
+    print(
+        f"{name:<16}{min(samples) * 1000:>10.0f}{statistics.median(samples) * 1000:>10.0f}"
+        f"{max(samples) * 1000:>10.0f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--lifespan", choices=("on", "off"), default="on")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a worker")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_responses = [
+        time_first_response(args.port, args.lifespan, args.timeout) for _ in range(args.runs)
+    ]
+
+    print(f"{'ms':<16}{'min':>10}{'median':>10}{'max':>10}")
+    summarize("import", imports)
+    summarize("first response", first_responses)
+
+
+if __name__ == "__main__":
+    main()
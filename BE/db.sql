@@ -86,7 +86,8 @@ CREATE TABLE `Courses` (
     `instructorID` INT,
     PRIMARY KEY (`courseID`),
     FOREIGN KEY (`semesterID`) REFERENCES `Semesters`(`semesterID`) ON DELETE SET NULL,
-    FOREIGN KEY (`instructorID`) REFERENCES `Instructors`(`instructorID`) ON DELETE SET NULL
+    FOREIGN KEY (`instructorID`) REFERENCES `Instructors`(`instructorID`) ON DELETE SET NULL,
+    INDEX `ix_Courses_instructorID_semesterID` (`instructorID`, `semesterID`)
 ) ENGINE=InnoDB;
 
 -- Groups (Classes within a course)
@@ -170,7 +171,8 @@ CREATE TABLE `Assignments` (
     `groupID` INT,
     PRIMARY KEY (`assignmentID`),
     FOREIGN KEY (`assignmentID`) REFERENCES `Learning_Content`(`contentID`) ON DELETE CASCADE,
-    FOREIGN KEY (`groupID`) REFERENCES `Groups`(`groupID`) ON DELETE SET NULL
+    FOREIGN KEY (`groupID`) REFERENCES `Groups`(`groupID`) ON DELETE SET NULL,
+    INDEX `ix_Assignments_groupID_deadline` (`groupID`, `deadline`)
 ) ENGINE=InnoDB;
 
 -- ============================================
@@ -241,6 +243,10 @@ CREATE TABLE `Topics` (
     `description` TEXT,
     `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `courseID` INT NOT NULL,
+    `reply_count` INT NOT NULL DEFAULT 0,
+    `last_activity_at` TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
+    `view_count` INT NOT NULL DEFAULT 0,
+    `view_flush_token` VARCHAR(32) NULL,
     PRIMARY KEY (`topicID`),
     FOREIGN KEY (`courseID`) REFERENCES `Courses`(`courseID`) ON DELETE CASCADE
 ) ENGINE=InnoDB;
@@ -251,9 +257,11 @@ CREATE TABLE `Topic_Chats` (
     `message` TEXT NOT NULL,
     `topicID` INT NOT NULL,
     `studentID` INT,
+    `created_at` TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (`messageID`),
     FOREIGN KEY (`topicID`) REFERENCES `Topics`(`topicID`) ON DELETE CASCADE,
-    FOREIGN KEY (`studentID`) REFERENCES `Students`(`studentID`) ON DELETE SET NULL
+    FOREIGN KEY (`studentID`) REFERENCES `Students`(`studentID`) ON DELETE SET NULL,
+    INDEX `ix_Topic_Chats_topicID_messageID` (`topicID`, `messageID`)
 ) ENGINE=InnoDB;
 
 -- Topic Files (Attachments for topics)
@@ -289,7 +297,20 @@ CREATE TABLE `Messages` (
     `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (`messageID`),
     FOREIGN KEY (`senderID`) REFERENCES `Customers`(`customerID`) ON DELETE CASCADE,
-    FOREIGN KEY (`receiverID`) REFERENCES `Customers`(`customerID`) ON DELETE CASCADE
+    FOREIGN KEY (`receiverID`) REFERENCES `Customers`(`customerID`) ON DELETE CASCADE,
+    INDEX `ix_Messages_senderID_receiverID_created_at` (`senderID`, `receiverID`, `created_at`),
+    INDEX `ix_Messages_receiverID_senderID_messageID` (`receiverID`, `senderID`, `messageID`)
+) ENGINE=InnoDB;
+
+-- Conversation_Reads (read watermark: userID has read everything counterpartID sent up to last_read_messageID)
+CREATE TABLE `Conversation_Reads` (
+    `userID` INT NOT NULL,
+    `counterpartID` INT NOT NULL,
+    `last_read_messageID` INT NOT NULL DEFAULT 0,
+    `updated_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`userID`, `counterpartID`),
+    FOREIGN KEY (`userID`) REFERENCES `Customers`(`customerID`) ON DELETE CASCADE,
+    FOREIGN KEY (`counterpartID`) REFERENCES `Customers`(`customerID`) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
 -- ============================================
@@ -305,7 +326,8 @@ CREATE TABLE `Notifications` (
     `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `studentID` INT NOT NULL,
     PRIMARY KEY (`notificationID`),
-    FOREIGN KEY (`studentID`) REFERENCES `Students`(`studentID`) ON DELETE CASCADE
+    FOREIGN KEY (`studentID`) REFERENCES `Students`(`studentID`) ON DELETE CASCADE,
+    INDEX `ix_Notifications_studentID_status_created_at` (`studentID`, `status`, `created_at`)
 ) ENGINE=InnoDB;
 
 -- ============================================
@@ -0,0 +1,74 @@
+"""
+Idempotent DDL helpers for the revisions.
+
+Databases here were created three different ways (db.sql, create_all at
+startup, or these migrations), so a table or index may already exist, or may
+be missing, when a revision runs. With --sql there is no connection to
+inspect, and everything is emitted.
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import context, op
+
+
+def _inspector():
+    if context.is_offline_mode():
+        return None
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table: str) -> bool:
+    inspector = _inspector()
+    return inspector is None or inspector.has_table(table)
+
+
+def table_missing(table: str) -> bool:
+    """True when `table` has to be created. Offline, always (the DDL is emitted)."""
+    inspector = _inspector()
+    return inspector is None or not inspector.has_table(table)
+
+
+def has_index(table: str, name: str) -> bool:
+    inspector = _inspector()
+    if inspector is None:
+        return False
+    return any(index["name"] == name for index in inspector.get_indexes(table))
+
+
+def column_missing(table: str, column: str) -> bool:
+    """True when `column` has to be added. Offline, always."""
+    inspector = _inspector()
+    if inspector is None:
+        return True
+    return column not in {c["name"] for c in inspector.get_columns(table)}
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> None:
+    if not has_table(table) or not column_missing(table, column.name):
+        return
+    op.add_column(table, column)
+
+
+def drop_column_if_present(table: str, column: str) -> None:
+    if not has_table(table):
+        return
+    inspector = _inspector()
+    if inspector is not None and column_missing(table, column):
+        return
+    op.drop_column(table, column)
+
+
+def create_index_if_missing(name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    if not has_table(table) or has_index(table, name):
+        return
+    op.create_index(name, table, list(columns), unique=unique)
+
+
+def drop_index_if_present(name: str, table: str) -> None:
+    if not has_table(table):
+        return
+    inspector = _inspector()
+    if inspector is not None and not has_index(table, name):
+        return
+    op.drop_index(name, table_name=table)
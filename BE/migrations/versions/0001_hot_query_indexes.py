@@ -0,0 +1,49 @@
+"""composite indexes for the hot query shapes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Baseline: the tables themselves come from db.sql / create_all, this revision
+only adds the indexes the routers need.
+
+Files_Images(resourceID) is not added: resourceID is already the primary key
+(the leading column of PRIMARY KEY (resourceID, contentID) in db.sql), and
+contentID is covered by its foreign key index.
+"""
+from typing import Sequence, Union
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    # message.py: conversation (sender, receiver) pairs ordered by time
+    ("ix_Messages_senderID_receiverID_created_at", "Messages", ("senderID", "receiverID", "created_at")),
+    # notification.py: feed and unread count per student
+    ("ix_Notifications_studentID_status_created_at", "Notifications", ("studentID", "status", "created_at")),
+    # topic.py / course.py: chats of a topic in id order, reply counts
+    ("ix_Topic_Chats_topicID_messageID", "Topic_Chats", ("topicID", "messageID")),
+    # submission.py: submissions of an assignment, per student, by time
+    ("ix_Submissions_assignmentID_studentID_submitted_at", "Submissions", ("assignmentID", "studentID", "submitted_at")),
+    # attempt.py: attempts of a quiz, optionally for one student
+    ("ix_Quiz_Attempts_quizID_studentID", "Quiz_Attempts", ("quizID", "studentID")),
+    # assignment listings of a group by deadline
+    ("ix_Assignments_groupID_deadline", "Assignments", ("groupID", "deadline")),
+    # instructor.py: courses of an instructor, optionally per semester
+    ("ix_Courses_instructorID_semesterID", "Courses", ("instructorID", "semesterID")),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_if_missing(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_if_present(name, table)
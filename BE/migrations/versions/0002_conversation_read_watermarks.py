@@ -0,0 +1,88 @@
+"""read watermarks per conversation instead of one Message_Read row per message
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Message_Read (messageID, userID) becomes Conversation_Reads (userID,
+counterpartID, last_read_messageID). Each user's read rows are folded into
+the highest message id they read from each counterpart, so an older message
+left unread below a later read one now counts as read.
+
+Message_Read was only ever created by create_all (it is not in db.sql), so it
+may be missing; the conversion is skipped then.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present, has_table, table_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNREAD_INDEX = ("ix_Messages_receiverID_senderID_messageID", "Messages", ("receiverID", "senderID", "messageID"))
+
+
+def upgrade() -> None:
+    # init-db runs create_all before the migrations, so the table may already be there
+    if table_missing("Conversation_Reads"):
+        op.create_table(
+            "Conversation_Reads",
+            sa.Column("userID", sa.Integer, sa.ForeignKey("Customers.customerID", ondelete="CASCADE"), primary_key=True),
+            sa.Column("counterpartID", sa.Integer, sa.ForeignKey("Customers.customerID", ondelete="CASCADE"), primary_key=True),
+            sa.Column("last_read_messageID", sa.Integer, nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime),
+        )
+
+    create_index_if_missing(*UNREAD_INDEX)
+
+    if has_table("Message_Read"):
+        op.execute(
+            """
+            INSERT INTO Conversation_Reads (userID, counterpartID, last_read_messageID, updated_at)
+            SELECT r.userID, m.senderID, MAX(r.messageID), CURRENT_TIMESTAMP
+            FROM Message_Read r
+            JOIN Messages m ON m.messageID = r.messageID AND m.receiverID = r.userID
+            WHERE NOT EXISTS (
+                SELECT 1 FROM Conversation_Reads c
+                WHERE c.userID = r.userID AND c.counterpartID = m.senderID
+            )
+            GROUP BY r.userID, m.senderID
+            """
+        )
+        op.drop_table("Message_Read")
+
+
+def downgrade() -> None:
+    if table_missing("Message_Read"):
+        op.create_table(
+            "Message_Read",
+            sa.Column("messageID", sa.Integer, sa.ForeignKey("Messages.messageID", ondelete="CASCADE"), primary_key=True),
+            sa.Column("userID", sa.Integer, sa.ForeignKey("Customers.customerID", ondelete="CASCADE"), primary_key=True),
+        )
+
+    if has_table("Conversation_Reads"):
+        # every message at or below the watermark was read
+        op.execute(
+            """
+            INSERT INTO Message_Read (messageID, userID)
+            SELECT m.messageID, c.userID
+            FROM Conversation_Reads c
+            JOIN Messages m
+              ON m.receiverID = c.userID
+             AND m.senderID = c.counterpartID
+             AND m.messageID <= c.last_read_messageID
+            WHERE NOT EXISTS (
+                SELECT 1 FROM Message_Read r
+                WHERE r.messageID = m.messageID AND r.userID = c.userID
+            )
+            """
+        )
+        op.drop_table("Conversation_Reads")
+
+    drop_index_if_present(*UNREAD_INDEX[:2])
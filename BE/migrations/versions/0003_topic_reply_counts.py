@@ -0,0 +1,43 @@
+"""denormalized reply_count / last_activity_at on Topics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Both columns are kept up to date by create_topic_chat / delete_topic_chat.
+The backfill recounts every topic, so re-running it is harmless. Topic_Chats
+has no timestamp, so last_activity_at starts out as the topic's created_at.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present, has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Topics", sa.Column("reply_count", sa.Integer, nullable=False, server_default="0"))
+    add_column_if_missing("Topics", sa.Column("last_activity_at", sa.DateTime))
+
+    if has_table("Topics") and has_table("Topic_Chats"):
+        op.execute(
+            """
+            UPDATE Topics
+            SET reply_count = (
+                    SELECT COUNT(*) FROM Topic_Chats WHERE Topic_Chats.topicID = Topics.topicID
+                ),
+                last_activity_at = COALESCE(last_activity_at, created_at)
+            """
+        )
+
+
+def downgrade() -> None:
+    drop_column_if_present("Topics", "last_activity_at")
+    drop_column_if_present("Topics", "reply_count")
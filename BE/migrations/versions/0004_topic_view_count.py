@@ -0,0 +1,27 @@
+"""Topics.view_count, flushed from the Redis view counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Starts at 0: views were never recorded before.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Topics", sa.Column("view_count", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    drop_column_if_present("Topics", "view_count")
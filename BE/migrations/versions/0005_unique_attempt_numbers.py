@@ -0,0 +1,72 @@
+"""unique (quizID, studentID, attempt_number) on Quiz_Attempts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+start_quiz_attempt used count() + 1, so concurrent starts left duplicate
+attempt numbers behind. Students that have duplicates get their attempts
+renumbered 1..n in start order first, otherwise the unique index can't be
+built. Students without duplicates keep their numbers.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present, has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNIQUE_INDEX = (
+    "uq_Quiz_Attempts_quizID_studentID_attempt_number",
+    "Quiz_Attempts",
+    ("quizID", "studentID", "attempt_number"),
+)
+
+# (quizID, studentID) pairs with a repeated attempt number
+_DUPLICATED = """
+    SELECT quizID, studentID FROM Quiz_Attempts
+    GROUP BY quizID, studentID
+    HAVING COUNT(*) <> COUNT(DISTINCT attempt_number)
+"""
+
+_RENUMBERED = f"""
+    SELECT a.attemptID,
+           ROW_NUMBER() OVER (PARTITION BY a.quizID, a.studentID ORDER BY a.started_at, a.attemptID) AS rn
+    FROM Quiz_Attempts a
+    JOIN ({_DUPLICATED}) d ON d.quizID = a.quizID AND d.studentID = a.studentID
+"""
+
+
+def upgrade() -> None:
+    if not has_table("Quiz_Attempts"):
+        return
+
+    if op.get_context().dialect.name == "mysql":
+        # MySQL can't UPDATE ... FROM, and the derived table is materialized first
+        op.execute(
+            f"""
+            UPDATE Quiz_Attempts qa
+            JOIN ({_RENUMBERED}) r ON r.attemptID = qa.attemptID
+            SET qa.attempt_number = r.rn
+            """
+        )
+    else:
+        op.execute(
+            f"""
+            UPDATE Quiz_Attempts
+            SET attempt_number = r.rn
+            FROM ({_RENUMBERED}) r
+            WHERE r.attemptID = Quiz_Attempts.attemptID
+            """
+        )
+
+    create_index_if_missing(*UNIQUE_INDEX, unique=True)
+
+
+def downgrade() -> None:
+    drop_index_if_present(*UNIQUE_INDEX[:2])
@@ -0,0 +1,28 @@
+"""Quiz_Attempts.answers, the packed answers a regrade rescores
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+NULL for attempts submitted before: their answers were never stored, so a
+regrade leaves their score alone.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Quiz_Attempts", sa.Column("answers", sa.LargeBinary, nullable=True))
+
+
+def downgrade() -> None:
+    drop_column_if_present("Quiz_Attempts", "answers")
@@ -0,0 +1,28 @@
+"""Quiz_Attempts.seed, the per-attempt question draw
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+NULL for existing attempts: they were given every question of the quiz,
+which is what a NULL seed means.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Quiz_Attempts", sa.Column("seed", sa.Integer, nullable=True))
+
+
+def downgrade() -> None:
+    drop_column_if_present("Quiz_Attempts", "seed")
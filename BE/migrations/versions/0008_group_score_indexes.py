@@ -0,0 +1,33 @@
+"""indexes for the instructor summary joins
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+The summary walks Courses -> Groups -> Student_Score; neither join column
+led an index (Student_Score's primary key starts with studentID).
+"""
+from typing import Sequence, Union
+
+from migrations.helpers import create_index_if_missing, drop_index_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_Groups_courseID", "Groups", ("courseID",)),
+    ("ix_Student_Score_groupID_quizID", "Student_Score", ("groupID", "quizID")),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        create_index_if_missing(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index_if_present(name, table)
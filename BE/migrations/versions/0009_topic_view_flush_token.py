@@ -0,0 +1,28 @@
+"""Topics.view_flush_token, the last view batch written to view_count
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+Lets readers tell whether the batch the flusher has in flight is already in
+the row they read, instead of counting it twice until Redis is settled.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Topics", sa.Column("view_flush_token", sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    drop_column_if_present("Topics", "view_flush_token")
@@ -0,0 +1,50 @@
+"""Topic_Chats.created_at, so last_activity_at can be recomputed on delete
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+Existing chats get their topic's created_at (the same assumption 0003 made
+for last_activity_at), and last_activity_at is recomputed as the newest chat
+or the topic's created_at. Re-running it is harmless.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from migrations.helpers import add_column_if_missing, drop_column_if_present, has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("Topic_Chats", sa.Column("created_at", sa.DateTime))
+
+    if has_table("Topics") and has_table("Topic_Chats"):
+        op.execute(
+            """
+            UPDATE Topic_Chats
+            SET created_at = (
+                SELECT Topics.created_at FROM Topics WHERE Topics.topicID = Topic_Chats.topicID
+            )
+            WHERE created_at IS NULL
+            """
+        )
+        op.execute(
+            """
+            UPDATE Topics
+            SET last_activity_at = COALESCE(
+                (SELECT MAX(Topic_Chats.created_at) FROM Topic_Chats WHERE Topic_Chats.topicID = Topics.topicID),
+                created_at
+            )
+            """
+        )
+
+
+def downgrade() -> None:
+    drop_column_if_present("Topic_Chats", "created_at")
@@ -0,0 +1,109 @@
+"""
+Test setup: the app on a throwaway sqlite file, no Redis unless a test asks
+for the in-memory one (the `redis` fixture).
+
+The env vars must be set before `app` is imported (database.py and config.py
+read them at import), which is why they are at the top of this file.
+"""
+import os
+import tempfile
+
+_db_file = os.path.join(tempfile.mkdtemp(prefix="elearning-tests-"), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file}")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_db_file}")
+# cheapest cost bcrypt allows; hashing speed is not what the tests are about
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models  # noqa: F401  registers every table on Base.metadata
+from app.database import Base, SessionLocal, engine
+from app.dependencies.auth import create_access_token, customer_token_claims
+from app.dependencies.answer_keys import answer_key_cache
+from app.dependencies.principal_cache import principal_cache
+from app.main import app as fastapi_app
+from app._Authenticate.hashing import _hash, current_policy, hash_pool
+from app._Customer.model import Customer
+from app._Instructor.model import Instructor
+from app._Student.model import Student
+from app._Websocket.Realtime import redis_utils
+
+pytest_plugins = ["tests.query_budget", "tests.loop_guard"]
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Fresh tables and empty in-process caches for every test."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    answer_key_cache.clear()
+    redis_utils.redis_client = None
+    yield
+    # worker processes left running keep pytest from exiting
+    hash_pool.shutdown()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    # no `with`: the lifespan (Redis, background tasks) is not started
+    return TestClient(fastapi_app)
+
+
+@pytest.fixture
+def redis_server():
+    """`redis_server.connected = False` makes every Redis command fail."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis(redis_server):
+    """An in-memory Redis installed as the app's client."""
+    client = fakeredis.aioredis.FakeRedis(server=redis_server)
+    redis_utils.redis_client = client
+    return client
+
+
+@pytest.fixture
+def make_user(db):
+    """make_user("alice", "student") -> Customer; students and instructors get their role row too."""
+
+    def make(fullname: str, role: str = "student", password: str = "password") -> Customer:
+        customer = Customer(
+            fullname=fullname,
+            email=f"{fullname}@example.com",
+            password=_hash(password, current_policy),
+            role=role,
+        )
+        db.add(customer)
+        db.commit()
+        if role == "student":
+            db.add(Student(studentID=customer.customerID))
+        elif role == "instructor":
+            db.add(Instructor(instructorID=customer.customerID))
+        db.commit()
+        return customer
+
+    return make
+
+
+@pytest.fixture
+def auth_headers():
+    """Bearer headers for a customer, minted directly (no login round trip)."""
+
+    def headers(customer: Customer) -> dict:
+        token = create_access_token(customer_token_claims(customer))
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
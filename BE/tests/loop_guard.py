@@ -0,0 +1,83 @@
+"""
+Pytest plugin: fail a test when something blocks the event loop.
+
+`loop_guard.check(main)` runs the coroutine function `main` on a fresh event
+loop watched by a LoopMonitor (the same monitor LOOP_BLOCK_THRESHOLD_MS turns
+on in production) and fails the test if the loop stalled past the threshold:
+
+    def test_topic_page(loop_guard):
+        async def main():
+            async with asgi_client() as client:
+                await client.get("/topics/1")
+
+        loop_guard.check(main)
+
+Requests go through httpx.ASGITransport rather than TestClient, so that every
+request of the test shares the watched loop.
+"""
+import asyncio
+import gc
+from typing import Awaitable, Callable
+
+import httpx
+import pytest
+
+from app.database import async_engine, async_read_engine
+from app.dependencies.loop_monitor import LoopMonitor
+from app.main import app as fastapi_app
+
+# well above scheduling noise on a loaded CI box, well below a sync DB round trip + hash
+LOOP_GUARD_THRESHOLD_MS = 100
+LOOP_GUARD_INTERVAL_MS = 5
+
+
+def asgi_client(app=fastapi_app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class LoopGuard:
+    def __init__(self, threshold_ms: float = LOOP_GUARD_THRESHOLD_MS):
+        self.threshold_ms = threshold_ms
+
+    def run(self, main: Callable[[], Awaitable]) -> LoopMonitor:
+        """Runs `main()` under a monitor and returns the monitor, for its counts."""
+        monitor = LoopMonitor(self.threshold_ms, LOOP_GUARD_INTERVAL_MS)
+
+        async def watched():
+            monitor.start()
+            # let the monitor start its first timed sleep before main runs
+            await asyncio.sleep(0)
+            try:
+                await main()
+                # let the monitor wake up once more, in case the stall was the last thing main did
+                await asyncio.sleep(monitor.interval * 2)
+            finally:
+                await monitor.stop()
+                # pooled aiosqlite connections belong to this loop (and keep a thread alive)
+                await async_engine.dispose()
+                await async_read_engine.dispose()
+
+        # A full collection of the test process's heap can pause for 100+ ms; that
+        # is not the code under test blocking, so start from a collected, frozen heap.
+        gc.collect()
+        gc.freeze()
+        try:
+            asyncio.run(watched())
+        finally:
+            gc.unfreeze()
+        return monitor
+
+    def check(self, main: Callable[[], Awaitable]) -> LoopMonitor:
+        monitor = self.run(main)
+        if monitor.blocks:
+            snapshot = monitor.snapshot()
+            pytest.fail(
+                f"event loop blocked {snapshot['blocks']} time(s), longest {snapshot['max_block_ms']} ms "
+                f"(threshold {self.threshold_ms} ms): something sync ran in an async def"
+            )
+        return monitor
+
+
+@pytest.fixture
+def loop_guard() -> LoopGuard:
+    return LoopGuard()
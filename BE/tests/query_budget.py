@@ -0,0 +1,85 @@
+"""
+Pytest plugin: SQL query budgets per request, to catch N+1 patterns.
+
+Every response carries the number of statements the request ran in its
+X-DB-Queries header (see the count_db_queries middleware). The
+`query_budget` fixture turns that into assertions:
+
+    def test_inbox(client, query_budget):
+        response = client.get("/users/1/conversations", headers=...)
+        query_budget.check(response, 3)
+
+    def test_inbox_has_no_n_plus_one(client, query_budget):
+        query_budget.assert_constant(
+            lambda: client.get("/users/1/conversations", headers=...),
+            grow=lambda: add_conversations(5),
+        )
+
+`@pytest.mark.query_budget(n)` applies `check(response, n)` to every
+response checked with `query_budget.check(response)` in that test.
+"""
+from typing import Callable, List, Optional
+
+import pytest
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(n): default query budget for query_budget.check() in this test",
+    )
+
+
+class QueryBudget:
+    def __init__(self, default: Optional[int] = None):
+        self.default = default
+
+    @staticmethod
+    def count(response) -> int:
+        value = response.headers.get(QUERY_COUNT_HEADER)
+        if value is None:
+            pytest.fail(f"{response.request.method} {response.request.url} has no {QUERY_COUNT_HEADER} header")
+        return int(value)
+
+    def check(self, response, limit: Optional[int] = None) -> int:
+        """Fails the test when the request ran more than `limit` statements; returns the count."""
+        limit = self.default if limit is None else limit
+        if limit is None:
+            raise ValueError("no query budget: pass `limit` or mark the test with query_budget(n)")
+
+        count = self.count(response)
+        if count > limit:
+            pytest.fail(
+                f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {limit}"
+            )
+        return count
+
+    def assert_constant(self, fetch: Callable, grow: Callable[[], None], rounds: int = 3) -> List[int]:
+        """
+        Calls `fetch()`, then `grow()` (more rows in the result), `rounds` times
+        over. Fails if the query count changes with the result size: one query
+        per row is an N+1.
+        """
+        counts = []
+        for i in range(rounds):
+            if i:
+                grow()
+            response = fetch()
+            assert response.status_code == 200, response.text
+            counts.append(self.count(response))
+
+        if len(set(counts)) > 1:
+            request = response.request
+            pytest.fail(
+                f"{request.method} {request.url.path} ran {counts} queries as its result grew: "
+                f"the count must not depend on the number of rows (N+1)"
+            )
+        return counts
+
+
+@pytest.fixture
+def query_budget(request) -> QueryBudget:
+    marker = request.node.get_closest_marker("query_budget")
+    return QueryBudget(marker.args[0] if marker is not None else None)
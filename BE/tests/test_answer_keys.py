@@ -0,0 +1,92 @@
+import asyncio
+
+import anyio
+import pytest
+
+from app.dependencies import answer_keys
+from app.dependencies.answer_keys import AnswerKeyCache
+from app._Quiz.model import Quiz
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("instructor", "instructor"))
+
+
+@pytest.fixture
+def quiz(db):
+    quiz = Quiz(duration=30, number_of_attempts=0)
+    db.add(quiz)
+    db.commit()
+    return quiz
+
+
+@pytest.fixture
+def question_id(client, headers, quiz, redis):
+    response = client.post(
+        "/questions/",
+        json={
+            "quizID": quiz.quizID,
+            "question_text": "2 + 2?",
+            "answer_1": "4",
+            "answer_2": "5",
+            "answer_3": "6",
+            "answer_4": "7",
+            "level": "easy_question",
+            "correct_answer": "A",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["question"]["question_id"]
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    """Quiz IDs compiled from the DB, in order."""
+    compiled = []
+    compile_answer_key = answer_keys.compile_answer_key
+
+    def counting(db, quiz_id, version=0):
+        compiled.append(quiz_id)
+        return compile_answer_key(db, quiz_id, version)
+
+    monkeypatch.setattr(answer_keys, "compile_answer_key", counting)
+    return compiled
+
+
+def lookup(cache: AnswerKeyCache, db, quiz_id: int):
+    # as a sync endpoint would, from the threadpool
+    return asyncio.run(anyio.to_thread.run_sync(cache.get, db, quiz_id))
+
+
+def test_workers_sharing_redis_pick_up_a_changed_answer(client, db, headers, quiz, question_id, compiles):
+    # two processes: separate in-process caches, one Redis
+    worker_a = AnswerKeyCache(max_size=10, ttl=300)
+    worker_b = AnswerKeyCache(max_size=10, ttl=300)
+
+    assert lookup(worker_a, db, quiz.quizID).correct == {question_id: "A"}
+    assert lookup(worker_b, db, quiz.quizID).correct == {question_id: "A"}
+    # the second worker took the key worker_a stored in Redis
+    assert compiles == [quiz.quizID]
+
+    # served by a third worker; neither cache above hears about it directly
+    response = client.patch(f"/questions/{question_id}", json={"correct_answer": "B"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert lookup(worker_a, db, quiz.quizID).correct == {question_id: "B"}
+    assert lookup(worker_b, db, quiz.quizID).correct == {question_id: "B"}
+    # one recompile between them: worker_b read the new key worker_a stored
+    assert compiles == [quiz.quizID, quiz.quizID]
+    assert lookup(worker_a, db, quiz.quizID).version == lookup(worker_b, db, quiz.quizID).version
+
+
+def test_text_edit_keeps_the_cached_key(client, db, headers, quiz, question_id, compiles):
+    worker = AnswerKeyCache(max_size=10, ttl=300)
+    key = lookup(worker, db, quiz.quizID)
+
+    response = client.patch(f"/questions/{question_id}", json={"question_text": "2 + 3?"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert lookup(worker, db, quiz.quizID) is key
+    assert compiles == [quiz.quizID]
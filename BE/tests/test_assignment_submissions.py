@@ -0,0 +1,165 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import SessionLocal
+from app.dependencies.read_routing import get_read_sessionmaker
+from app.main import app as fastapi_app
+from app._Assignment.model import Assignment
+from app._Learning_Content.model import LearningContent
+from app._Submission.model import Submission
+
+DEADLINE = datetime(2026, 10, 1, 23, 59)
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("instructor", "instructor"))
+
+
+@pytest.fixture
+def students(make_user):
+    return [make_user(f"student{n}") for n in range(3)]
+
+
+@pytest.fixture
+def assignment(db):
+    content = LearningContent(title="Lab 1")
+    db.add(content)
+    db.commit()
+    assignment = Assignment(assignmentID=content.contentID, title="Lab 1", deadline=DEADLINE)
+    db.add(assignment)
+    db.commit()
+    return assignment
+
+
+@pytest.fixture
+def submissions(db, assignment, students):
+    """Eight submissions, some sharing a submitted_at, some graded, some late."""
+    rows = []
+    for n in range(8):
+        rows.append(
+            Submission(
+                assignmentID=assignment.assignmentID,
+                studentID=students[n % 3].customerID,
+                submission_text=f"attempt {n}",
+                # pairs share a timestamp, so the cursor's tie-breaker is exercised
+                submitted_at=DEADLINE + timedelta(hours=(n // 2) - 2),
+                score=80.0 if n % 3 == 0 else None,
+            )
+        )
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def submission_order(rows):
+    return [row.submissionID for row in sorted(rows, key=lambda row: (row.submitted_at, row.submissionID))]
+
+
+def all_pages(client, assignment, headers, **params):
+    path = f"/assignments/{assignment.assignmentID}/submissions"
+    seen, after_id = [], None
+    while True:
+        query = dict(params, **({"after_id": after_id} if after_id else {}))
+        response = client.get(path, params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen += [row["submission_id"] for row in page["submissions"]]
+        after_id = page["next_after_id"]
+        if after_id is None:
+            return seen
+
+
+def test_pages_cover_every_submission_once(client, assignment, submissions, headers):
+    seen = all_pages(client, assignment, headers, limit=3)
+    assert seen == submission_order(submissions)
+
+
+def test_pages_do_not_shift_when_earlier_submissions_arrive(client, db, assignment, submissions, students, headers):
+    path = f"/assignments/{assignment.assignmentID}/submissions"
+    first = client.get(path, params={"limit": 3}, headers=headers).json()
+
+    # an offset would now repeat the third row
+    early = Submission(
+        assignmentID=assignment.assignmentID,
+        studentID=students[0].customerID,
+        submitted_at=DEADLINE - timedelta(days=1),
+    )
+    db.add(early)
+    db.commit()
+
+    rest = all_pages(client, assignment, headers, limit=3, after_id=first["next_after_id"])
+    seen = [row["submission_id"] for row in first["submissions"]] + rest
+    assert seen == submission_order(submissions)
+
+
+@pytest.mark.parametrize(
+    "params, keep",
+    [
+        ({"ungraded_only": True}, lambda row: row.score is None),
+        ({"late_only": True}, lambda row: row.submitted_at > DEADLINE),
+        ({"ungraded_only": True, "late_only": True}, lambda row: row.score is None and row.submitted_at > DEADLINE),
+    ],
+)
+def test_filters_page_through_matching_submissions(client, assignment, submissions, headers, params, keep):
+    expected = submission_order([row for row in submissions if keep(row)])
+    assert expected  # the fixture has rows on both sides of every filter
+    assert len(expected) < len(submissions)
+
+    assert all_pages(client, assignment, headers, limit=2, **params) == expected
+
+
+@pytest.fixture
+def tracked_sessions():
+    """Every session the stream route opens, with whether it was closed."""
+    sessions = []
+
+    def session_factory():
+        session = SessionLocal()
+        record = {"closed": False}
+        close = session.close
+
+        def tracked_close():
+            record["closed"] = True
+            close()
+
+        session.close = tracked_close
+        sessions.append(record)
+        return session
+
+    fastapi_app.dependency_overrides[get_read_sessionmaker] = lambda: session_factory
+    yield sessions
+    fastapi_app.dependency_overrides.pop(get_read_sessionmaker, None)
+
+
+def stream(client, assignment, headers, **params):
+    response = client.get(f"/assignments/{assignment.assignmentID}/submissions/stream", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_emits_every_row_and_closes_its_session(
+    client, assignment, submissions, headers, tracked_sessions, monkeypatch
+):
+    # more than one fetch round trip
+    monkeypatch.setattr("app._Assignment.assignment.SUBMISSION_STREAM_CHUNK", 3)
+
+    rows = stream(client, assignment, headers)
+    assert [row["submission_id"] for row in rows] == submission_order(submissions)
+    assert rows[0]["student_name"] == "student0"
+
+    late = stream(client, assignment, headers, late_only=True)
+    assert [row["submission_id"] for row in late] == submission_order(
+        [row for row in submissions if row.submitted_at > DEADLINE]
+    )
+
+    assert [session["closed"] for session in tracked_sessions] == [True, True]
+
+
+def test_stream_of_a_missing_assignment_closes_its_session(client, headers, tracked_sessions):
+    response = client.get("/assignments/999/submissions/stream", headers=headers)
+    assert response.status_code == 404
+    assert [session["closed"] for session in tracked_sessions] == [True]
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import select
+
+from app.cli import init_db
+from app.database import engine
+from app._Message.model import Message
+from benchmarks.explain_queries import QUERY_SHAPES, explain, is_full_scan
+
+
+@pytest.fixture
+def schema():
+    """The schema a deploy ends up with: create_all, then every migration."""
+    # clean_state drops the model tables only; forget the previous test's upgrade
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    init_db()
+
+
+@pytest.mark.parametrize("name", QUERY_SHAPES)
+def test_hot_query_uses_an_index(schema, name):
+    tables, statement = QUERY_SHAPES[name]
+    with engine.connect() as connection:
+        plan = explain(connection, statement)
+    assert not is_full_scan(plan, tables, connection.dialect.name), "\n".join(map(str, plan))
+
+
+def test_full_scan_is_detected(schema):
+    with engine.connect() as connection:
+        plan = explain(connection, select(Message).where(Message.content == "hello"))
+    assert is_full_scan(plan, ("Messages",), connection.dialect.name)
+
+
+def test_full_index_walk_is_detected(schema):
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_Student_Score_groupID_quizID")
+    # sqlite doesn't re-prepare a cached EXPLAIN on a schema change: plan on a fresh connection
+    engine.dispose()
+    with engine.connect() as connection:
+        plan = explain(connection, QUERY_SHAPES["instructor.get_instructor_summary (quizzes)"][1])
+    # the primary key (studentID, groupID, quizID) covers the query, but only by walking all of it
+    assert is_full_scan(plan, ("Student_Score",), connection.dialect.name), "\n".join(map(str, plan))
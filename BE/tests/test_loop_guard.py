@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app._Course.model import Course
+from app._Message.model import Message
+from app._Quiz.model import Quiz
+from app._Topic.model import Topic, TopicChat
+from app.dependencies.auth import create_access_token
+from tests.loop_guard import asgi_client
+
+
+def test_guard_catches_sync_work_in_async_def(loop_guard):
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        time.sleep(0.3)
+
+    @app.get("/awaiting")
+    async def awaiting():
+        await asyncio.sleep(0.3)
+
+    async def call(path):
+        async with asgi_client(app) as client:
+            assert (await client.get(path)).status_code == 200
+
+    assert loop_guard.run(lambda: call("/blocking")).blocks >= 1
+    assert loop_guard.run(lambda: call("/awaiting")).blocks == 0
+
+
+def test_async_routes_do_not_block_the_loop(db, make_user, auth_headers, loop_guard):
+    instructor = make_user("instructor", "instructor")
+    student = make_user("student")
+    course = Course(course_name="Databases", number_of_sessions="10", instructorID=instructor.customerID)
+    quiz = Quiz(duration=30)
+    db.add_all([course, quiz])
+    db.commit()
+    topic = Topic(title="Indexes", courseID=course.courseID)
+    db.add(topic)
+    db.commit()
+    db.add_all([
+        TopicChat(message="why a composite index?", topicID=topic.topicID, studentID=student.customerID),
+        Message(content="hello", senderID=student.customerID, receiverID=instructor.customerID),
+    ])
+    db.commit()
+
+    # tokens with only `sub` are resolved by fullname, on the threadpool
+    legacy_headers = {"Authorization": f"Bearer {create_access_token({'sub': student.fullname})}"}
+    headers = auth_headers(instructor)
+    requests = [
+        ("post", "/auth/login", {"json": {"username": "student", "password": "password"}}),
+        ("get", f"/courses/{course.courseID}/topics", {"headers": headers}),
+        ("get", f"/topics/{topic.topicID}", {"headers": headers}),
+        ("get", f"/topics/{topic.topicID}/chats", {"headers": headers}),
+        ("get", f"/instructors/{instructor.customerID}/summary", {"headers": headers}),
+        ("get", f"/users/{instructor.customerID}/conversations", {"headers": headers}),
+        ("get", f"/messages/conversation/{student.customerID}/{instructor.customerID}", {"headers": headers}),
+        ("get", f"/quizzes/{quiz.quizID}/questions", {"headers": legacy_headers}),
+    ]
+
+    async def main():
+        async with asgi_client() as client:
+            for method, path, kwargs in requests:
+                response = await getattr(client, method)(path, **kwargs)
+                assert response.status_code == 200, f"{path}: {response.text}"
+
+    # first pass outside the guard: imports, the hashing pool's worker start-up
+    loop_guard.run(main)
+    loop_guard.check(main)
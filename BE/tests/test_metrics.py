@@ -0,0 +1,20 @@
+import pytest
+
+METRICS = ["/metrics/password-hashing", "/metrics/db-pool", "/metrics/event-loop", "/metrics/slow-queries"]
+
+
+@pytest.mark.parametrize("path", METRICS)
+def test_students_cannot_read_metrics(client, make_user, auth_headers, path):
+    response = client.get(path, headers=auth_headers(make_user("student")))
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Operator access required"
+
+
+@pytest.mark.parametrize("path", METRICS)
+def test_instructors_can_read_metrics(client, make_user, auth_headers, path):
+    response = client.get(path, headers=auth_headers(make_user("instructor", "instructor")))
+    assert response.status_code == 200, response.text
+
+
+def test_metrics_need_a_token(client):
+    assert client.get("/metrics/slow-queries").status_code in (401, 403)
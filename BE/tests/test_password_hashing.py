@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from anyio import to_thread
+
+from app._Authenticate import hashing
+from app._Authenticate.hashing import PasswordHashPool
+from app.main import app as fastapi_app
+
+LOGINS = 60
+
+
+@pytest.fixture
+def gated_pool(monkeypatch):
+    """
+    A one-worker pool whose verifications wait for `gate`, on a thread pool
+    so the patched verify needs no pickling.
+    """
+    gate = threading.Event()
+    verify = hashing._verify
+
+    def gated_verify(plain_password, hashed_password):
+        gate.wait(10)
+        return verify(plain_password, hashed_password)
+
+    pool = PasswordHashPool(workers=1, max_pending=1, retry_after=2)
+    pool._executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hashing, "_verify", gated_verify)
+    monkeypatch.setattr(hashing, "hash_pool", pool)
+    yield pool, gate
+    gate.set()
+    pool.shutdown()
+
+
+def test_login_storm_is_shed_without_holding_threadpool_threads(make_user, auth_headers, gated_pool):
+    pool, gate = gated_pool
+    alice = make_user("alice")
+
+    async def storm():
+        # one event loop (and one threadpool limiter) for every request
+        transport = httpx.ASGITransport(app=fastapi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            logins = [
+                asyncio.create_task(client.post("/auth/login", json={"username": "alice", "password": "password"}))
+                for _ in range(LOGINS)
+            ]
+            while pool.rejected + pool.in_flight < LOGINS:
+                await asyncio.sleep(0.01)
+
+            # the admitted logins wait for the pool on the loop, not in the threadpool
+            borrowed = to_thread.current_default_thread_limiter().borrowed_tokens
+            me = await client.get("/auth/me", headers=auth_headers(alice))
+
+            gate.set()
+            return borrowed, me, await asyncio.gather(*logins)
+
+    borrowed, me, responses = asyncio.run(storm())
+
+    assert borrowed == 0
+    assert me.status_code == 200, me.text
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == pool.workers + pool.max_pending
+    assert statuses.count(503) == LOGINS - statuses.count(200)
+    assert all(r.headers["Retry-After"] == "2" for r in responses if r.status_code == 503)
+
+
+def test_password_change_hashes_through_the_pool(client, make_user, auth_headers):
+    alice = make_user("alice")
+
+    response = client.patch(
+        f"/auth/{alice.customerID}/change-password",
+        json={"current_password": "password", "new_password": "new-password"},
+        headers=auth_headers(alice),
+    )
+    assert response.status_code == 200, response.text
+
+    login = client.post("/auth/login", json={"username": "alice", "password": "new-password"})
+    assert login.status_code == 200, login.text
@@ -0,0 +1,77 @@
+import pytest
+
+from app.dependencies.auth import create_access_token
+from app.dependencies.principal_cache import principal_cache
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+def legacy_headers(customer) -> dict:
+    # `sub` only: resolved by fullname and cached by token
+    return {"Authorization": f"Bearer {create_access_token({'sub': customer.fullname})}"}
+
+
+def token_of(headers: dict) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+def conversations(client, customer, headers):
+    return client.get(f"/users/{customer.customerID}/conversations", headers=headers)
+
+
+def update_profile(client, customer, headers, **fields):
+    response = client.patch(f"/customers/{customer.customerID}/profile", data=fields, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_role_change_is_not_served_from_the_cache(client, alice):
+    headers = legacy_headers(alice)
+    assert client.get("/metrics/slow-queries", headers=headers).status_code == 403
+    assert principal_cache.get(token_of(headers)).role == "student"
+
+    update_profile(client, alice, headers, role="instructor")
+
+    # no Redis deny-list here: the token lives on, but is resolved again
+    assert client.get("/metrics/slow-queries", headers=headers).status_code == 200
+    assert principal_cache.get(token_of(headers)).role == "instructor"
+
+
+def test_role_change_retires_cached_tokens(client, alice, redis):
+    headers = legacy_headers(alice)
+    assert conversations(client, alice, headers).status_code == 200
+
+    update_profile(client, alice, headers, role="instructor")
+
+    assert conversations(client, alice, headers).status_code == 401
+
+
+def test_password_change_retires_cached_tokens(client, alice, redis):
+    headers = legacy_headers(alice)
+    assert conversations(client, alice, headers).status_code == 200
+    assert principal_cache.get(token_of(headers)) is not None
+
+    response = client.patch(
+        f"/auth/{alice.customerID}/change-password",
+        json={"current_password": "password", "new_password": "new-password"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+
+    assert principal_cache.get(token_of(headers)) is None
+    assert conversations(client, alice, headers).status_code == 401
+
+
+def test_profile_update_drops_the_cached_principal(client, alice):
+    headers = legacy_headers(alice)
+    assert conversations(client, alice, headers).status_code == 200
+
+    update_profile(client, alice, headers, fullname="alice2")
+
+    assert principal_cache.get(token_of(headers)) is None
+    # the cached principal would still say "alice"; the name no longer resolves
+    assert conversations(client, alice, headers).status_code == 401
+
@@ -0,0 +1,78 @@
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from app._Message.model import Message
+from app._Quiz.model import Quiz
+from app._Quiz_Attempt.model import QuizAttempt
+
+_names = itertools.count()
+
+
+def add_students(make_user, n: int):
+    return [make_user(f"student{next(_names)}") for _ in range(n)]
+
+
+@pytest.fixture
+def instructor(make_user):
+    return make_user("instructor", "instructor")
+
+
+def test_inbox_queries_do_not_grow_with_conversations(client, db, make_user, auth_headers, query_budget, instructor):
+    def add_conversations(n: int):
+        for student in add_students(make_user, n):
+            db.add_all([
+                Message(content="hello", senderID=student.customerID, receiverID=instructor.customerID),
+                Message(content="hi", senderID=instructor.customerID, receiverID=student.customerID),
+            ])
+        db.commit()
+
+    add_conversations(1)
+    query_budget.assert_constant(
+        lambda: client.get(f"/users/{instructor.customerID}/conversations", headers=auth_headers(instructor)),
+        grow=lambda: add_conversations(5),
+    )
+
+
+@pytest.mark.query_budget(2)
+def test_conversation_page_budget(client, db, make_user, auth_headers, query_budget, instructor):
+    student, = add_students(make_user, 1)
+    db.add_all(
+        Message(content=str(i), senderID=student.customerID, receiverID=instructor.customerID)
+        for i in range(30)
+    )
+    db.commit()
+
+    response = client.get(
+        f"/messages/conversation/{instructor.customerID}/{student.customerID}?limit=20",
+        headers=auth_headers(instructor),
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+    query_budget.check(response)
+
+
+@pytest.mark.parametrize("view", ["all", "best", "last"])
+def test_quiz_attempts_queries_do_not_grow_with_attempts(client, db, make_user, auth_headers, query_budget, instructor, view):
+    quiz = Quiz(number_of_attempts=0)
+    db.add(quiz)
+    db.commit()
+
+    def add_attempts(n: int):
+        for i, student in enumerate(add_students(make_user, n)):
+            db.add(QuizAttempt(
+                quizID=quiz.quizID,
+                studentID=student.customerID,
+                started_at=datetime(2026, 1, 1) + timedelta(minutes=i),
+                completed_at=datetime(2026, 1, 1, 1),
+                score=50.0,
+                attempt_number=1,
+            ))
+        db.commit()
+
+    add_attempts(1)
+    query_budget.assert_constant(
+        lambda: client.get(f"/quizzes/{quiz.quizID}/attempts?view={view}", headers=auth_headers(instructor)),
+        grow=lambda: add_attempts(3),
+    )
@@ -0,0 +1,124 @@
+import itertools
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app._Quiz.model import Quiz
+from app._Quiz_Attempt import attempt as attempt_routes
+from app._Quiz_Attempt.model import QuizAttempt
+
+STUDENTS = 10
+STARTS_PER_STUDENT = 20
+ATTEMPT_LIMIT = 5
+
+_names = itertools.count()
+
+
+@pytest.fixture
+def make_quiz(db):
+    def make(**columns) -> Quiz:
+        quiz = Quiz(**{"duration": 30, "number_of_attempts": ATTEMPT_LIMIT, **columns})
+        db.add(quiz)
+        db.commit()
+        return quiz
+
+    return make
+
+
+@pytest.fixture
+def start(client, make_user, auth_headers):
+    headers = auth_headers(make_user("instructor", "instructor"))
+
+    def start_attempt(quiz_id: int, student_id: int):
+        return client.post("/quiz-attempts/", json={"quiz_id": quiz_id, "student_id": student_id}, headers=headers)
+
+    return start_attempt
+
+
+def test_concurrent_starts_never_share_an_attempt_number(db, make_user, make_quiz, start, monkeypatch):
+    # enough retries that every start ends in a number or the limit, never a 409
+    monkeypatch.setattr(attempt_routes, "ATTEMPT_START_RETRIES", STARTS_PER_STUDENT)
+    quiz = make_quiz()
+    students = [make_user(f"student{next(_names)}").customerID for _ in range(STUDENTS)]
+
+    jobs = [student_id for student_id in students for _ in range(STARTS_PER_STUDENT)]
+    barrier = threading.Barrier(32)
+
+    def run(student_id):
+        try:
+            barrier.wait(timeout=1)
+        except threading.BrokenBarrierError:
+            pass
+        return student_id, start(quiz.quizID, student_id)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(run, jobs))
+
+    statuses = defaultdict(Counter)
+    for student_id, response in results:
+        statuses[student_id][response.status_code] += 1
+        if response.status_code == 403:
+            assert response.json()["detail"] == f"No attempts left (limit {ATTEMPT_LIMIT})"
+
+    for student_id in students:
+        assert statuses[student_id] == {201: ATTEMPT_LIMIT, 403: STARTS_PER_STUDENT - ATTEMPT_LIMIT}
+
+    numbers = defaultdict(list)
+    for student_id, number in db.query(QuizAttempt.studentID, QuizAttempt.attempt_number).all():
+        numbers[student_id].append(number)
+    assert {s: sorted(n) for s, n in numbers.items()} == {s: list(range(1, ATTEMPT_LIMIT + 1)) for s in students}
+
+
+def test_start_gives_up_with_409_when_it_keeps_losing_the_race(db, make_user, make_quiz, start, monkeypatch):
+    quiz = make_quiz(number_of_attempts=0)  # no limit
+    student = make_user("student")
+    new_seed = attempt_routes.new_seed
+
+    def rival_takes_the_number(quiz_row):
+        # another request commits the number this one just picked
+        rival = SessionLocal()
+        try:
+            last = (
+                rival.query(func.max(QuizAttempt.attempt_number))
+                .filter(QuizAttempt.quizID == quiz.quizID, QuizAttempt.studentID == student.customerID)
+                .scalar()
+            )
+            rival.add(QuizAttempt(
+                quizID=quiz.quizID,
+                studentID=student.customerID,
+                started_at=datetime.utcnow(),
+                attempt_number=(last or 0) + 1,
+            ))
+            rival.commit()
+        finally:
+            rival.close()
+        return new_seed(quiz_row)
+
+    monkeypatch.setattr(attempt_routes, "new_seed", rival_takes_the_number)
+
+    response = start(quiz.quizID, student.customerID)
+    assert response.status_code == 409, response.text
+    assert response.json()["detail"] == "Too many simultaneous starts, please retry"
+    # every retry lost to a rival, none of them left a duplicate behind
+    assert db.query(func.count(QuizAttempt.attemptID)).scalar() == attempt_routes.ATTEMPT_START_RETRIES
+
+
+@pytest.mark.parametrize(
+    "window, detail",
+    [
+        ({"open_time": datetime.utcnow() + timedelta(hours=1)}, "Quiz is not open yet"),
+        ({"close_time": datetime.utcnow() - timedelta(hours=1)}, "Quiz is closed"),
+    ],
+)
+def test_start_outside_the_quiz_window_is_403(db, make_user, make_quiz, start, window, detail):
+    quiz = make_quiz(**window)
+    response = start(quiz.quizID, make_user("student").customerID)
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == detail
+    assert db.query(func.count(QuizAttempt.attemptID)).scalar() == 0
@@ -0,0 +1,94 @@
+import pytest
+
+from app._Quiz.model import Quiz
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("instructor", "instructor"))
+
+
+@pytest.fixture
+def add_question(client, headers):
+    def add(quiz_id: int, level: str = "easy_question") -> int:
+        response = client.post(
+            "/questions/",
+            json={
+                "quizID": quiz_id,
+                "question_text": "2 + 2?",
+                "answer_1": "4",
+                "answer_2": "5",
+                "answer_3": "6",
+                "answer_4": "7",
+                "level": level,
+                "correct_answer": "A",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["question"]["question_id"]
+
+    return add
+
+
+@pytest.fixture
+def start(client, headers, make_user):
+    def start_attempt(quiz: Quiz) -> int:
+        student = make_user(f"student{quiz.quizID}")
+        response = client.post(
+            "/quiz-attempts/", json={"quiz_id": quiz.quizID, "student_id": student.customerID}, headers=headers
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["attempt_id"]
+
+    return start_attempt
+
+
+def paper(client, headers, attempt_id: int) -> list:
+    response = client.get(f"/quiz-attempts/{attempt_id}/questions", headers=headers)
+    assert response.status_code == 200, response.text
+    questions = response.json()["questions"]
+    assert all("correct_answer" not in question for question in questions)
+    return [question["question_id"] for question in questions]
+
+
+def make_quiz(db, **counts) -> Quiz:
+    quiz = Quiz(duration=30, number_of_attempts=0, **counts)
+    db.add(quiz)
+    db.commit()
+    return quiz
+
+
+def test_questions_added_after_start_are_not_on_the_paper(client, db, headers, add_question, start):
+    quiz = make_quiz(db)
+    given = [add_question(quiz.quizID), add_question(quiz.quizID)]
+    attempt_id = start(quiz)
+
+    add_question(quiz.quizID)
+    assert paper(client, headers, attempt_id) == given
+
+    result = client.post(
+        f"/quiz-attempts/{attempt_id}/submit",
+        json={"answers": {question_id: "A" for question_id in given}},
+        headers=headers,
+    )
+    assert result.status_code == 200, result.text
+    assert result.json()["score"] == pytest.approx(100.0)
+
+
+def test_drawn_paper_survives_changes_to_the_pools(client, db, headers, add_question, start):
+    quiz = make_quiz(db, easy_questions=2)
+    for _ in range(5):
+        add_question(quiz.quizID)
+    attempt_id = start(quiz)
+    given = paper(client, headers, attempt_id)
+    assert len(given) == 2
+
+    for _ in range(5):
+        add_question(quiz.quizID)
+    assert paper(client, headers, attempt_id) == given
+
+    result = client.post(
+        f"/quiz-attempts/{attempt_id}/submit", json={"answers": {given[0]: "A"}}, headers=headers
+    )
+    assert result.json()["score"] == pytest.approx(50.0)
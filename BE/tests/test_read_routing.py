@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.dependencies import read_routing
+from app.dependencies.read_routing import StickyPrimary
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """A pretend replica: records which sessionmaker each read route used."""
+    used = []
+    primary = read_routing.SessionLocal
+
+    def sessionmaker(name):
+        def make():
+            used.append(name)
+            return primary()
+
+        return make
+
+    monkeypatch.setattr(read_routing, "read_engine", object())
+    monkeypatch.setattr(read_routing, "async_read_engine", object())
+    monkeypatch.setattr(read_routing, "SessionLocal", sessionmaker("primary"))
+    monkeypatch.setattr(read_routing, "ReadSessionLocal", sessionmaker("replica"))
+    monkeypatch.setattr(read_routing, "sticky_primary", StickyPrimary(5))
+    return used
+
+
+@pytest.fixture
+def instructor(make_user):
+    return make_user("instructor", "instructor")
+
+
+def read_courses(client, instructor, headers, **extra):
+    response = client.get(f"/instructors/{instructor.customerID}/courses", headers={**headers, **extra})
+    assert response.status_code == 200, response.text
+
+
+def write_profile(client, instructor, headers):
+    path = f"/customers/{instructor.customerID}/profile"
+    response = client.patch(path, data={"phone_number": "555"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def test_reads_go_to_the_replica(client, instructor, auth_headers, engines):
+    read_courses(client, instructor, auth_headers(instructor))
+    assert engines == ["replica"]
+
+
+def test_read_after_own_write_goes_to_the_primary(client, instructor, make_user, auth_headers, engines):
+    headers = auth_headers(instructor)
+    write_profile(client, instructor, headers)
+
+    read_courses(client, instructor, headers)
+    assert engines == ["primary"]
+
+    # someone else's reads are not pinned
+    read_courses(client, instructor, auth_headers(make_user("student")))
+    assert engines == ["primary", "replica"]
+
+
+def test_sticky_window_is_shared_through_redis(client, instructor, auth_headers, engines, redis, monkeypatch):
+    headers = auth_headers(instructor)
+    write_profile(client, instructor, headers)
+
+    # the read lands on a worker that didn't serve the write
+    monkeypatch.setattr(read_routing, "sticky_primary", StickyPrimary(5))
+    read_courses(client, instructor, headers)
+    assert engines == ["primary"]
+
+    # the window ran out
+    asyncio.run(redis.delete(read_routing.STICKY_PRIMARY_KEY.format(customer_id=instructor.customerID)))
+    read_courses(client, instructor, headers)
+    assert engines == ["primary", "replica"]
+
+
+def test_failed_write_does_not_pin_reads(client, instructor, auth_headers, engines):
+    headers = auth_headers(instructor)
+    response = client.patch("/customers/999/profile", data={"phone_number": "555"}, headers=headers)
+    assert response.status_code == 404
+
+    read_courses(client, instructor, headers)
+    assert engines == ["replica"]
+
+
+def test_consistency_header_reads_from_the_primary(client, instructor, auth_headers, engines):
+    read_courses(client, instructor, auth_headers(instructor), **{read_routing.CONSISTENCY_HEADER: "primary"})
+    assert engines == ["primary"]
+
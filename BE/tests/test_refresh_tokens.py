@@ -0,0 +1,94 @@
+import pytest
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+@pytest.fixture
+def login(client, alice, redis):
+    def log_in() -> dict:
+        response = client.post("/auth/login", json={"username": "alice", "password": "password"})
+        assert response.status_code == 200, response.text
+        assert response.json()["refresh_token"]
+        return response.json()
+
+    return log_in
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_refresh_rotates_the_pair(client, alice, login):
+    session = login()
+
+    response = refresh(client, session["refresh_token"])
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["token_type"] == "bearer"
+    assert rotated["refresh_token"] != session["refresh_token"]
+
+    conversations = client.get(f"/users/{alice.customerID}/conversations", headers=bearer(rotated["token"]))
+    assert conversations.status_code == 200, conversations.text
+    # the successor rotates in turn
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_replayed_refresh_token_revokes_every_session(client, login):
+    phone, laptop = login(), login()
+    rotated = refresh(client, phone["refresh_token"]).json()
+
+    replay = refresh(client, phone["refresh_token"])
+    assert replay.status_code == 401
+    assert replay.json()["detail"] == "Invalid or expired refresh token"
+
+    # the token leaked: neither the thief's successor nor the other device keeps working
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert refresh(client, laptop["refresh_token"]).status_code == 401
+
+
+def test_refresh_token_works_once(client, login):
+    session = login()
+
+    first = refresh(client, session["refresh_token"])
+    second = refresh(client, session["refresh_token"])
+    assert [first.status_code, second.status_code] == [200, 401]
+
+
+def test_unknown_refresh_token_is_401(client, login):
+    login()
+    assert refresh(client, "not-a-refresh-token").status_code == 401
+
+
+def test_logout_revokes_the_refresh_token(client, alice, login):
+    session, other = login(), login()
+
+    response = client.post(
+        "/auth/logout", json={"refresh_token": session["refresh_token"]}, headers=bearer(session["token"])
+    )
+    assert response.status_code == 200, response.text
+
+    assert refresh(client, session["refresh_token"]).status_code == 401
+    path = f"/users/{alice.customerID}/conversations"
+    assert client.get(path, headers=bearer(session["token"])).status_code == 401
+    # a plain logout is not a leak: the other session is untouched
+    assert refresh(client, other["refresh_token"]).status_code == 200
+
+
+def test_password_change_revokes_refresh_tokens(client, alice, login):
+    session = login()
+
+    response = client.patch(
+        f"/auth/{alice.customerID}/change-password",
+        json={"current_password": "password", "new_password": "new-password"},
+        headers=bearer(session["token"]),
+    )
+    assert response.status_code == 200, response.text
+
+    assert refresh(client, session["refresh_token"]).status_code == 401
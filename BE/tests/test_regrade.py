@@ -0,0 +1,105 @@
+import pytest
+
+from app._Quiz.model import Quiz
+from app._Quiz_Attempt.model import QuizAttempt
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("instructor", "instructor"))
+
+
+@pytest.fixture
+def quiz(db):
+    quiz = Quiz(duration=30, number_of_attempts=0)
+    db.add(quiz)
+    db.commit()
+    return quiz
+
+
+@pytest.fixture
+def add_question(client, headers, quiz):
+    def add(correct_answer: str = "A") -> int:
+        response = client.post(
+            "/questions/",
+            json={
+                "quizID": quiz.quizID,
+                "question_text": "2 + 2?",
+                "answer_1": "4",
+                "answer_2": "5",
+                "answer_3": "6",
+                "answer_4": "7",
+                "level": "easy_question",
+                "correct_answer": correct_answer,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["question"]["question_id"]
+
+    return add
+
+
+@pytest.fixture
+def submitted(client, headers, make_user, quiz, add_question):
+    """A submitted attempt on two questions, one right and one wrong: 50%."""
+    right, wrong = add_question("A"), add_question("A")
+    student = make_user("student")
+
+    started = client.post(
+        "/quiz-attempts/", json={"quiz_id": quiz.quizID, "student_id": student.customerID}, headers=headers
+    )
+    assert started.status_code == 201, started.text
+    attempt_id = started.json()["attempt_id"]
+
+    result = client.post(
+        f"/quiz-attempts/{attempt_id}/submit", json={"answers": {right: "A", wrong: "B"}}, headers=headers
+    )
+    assert result.status_code == 200, result.text
+    assert result.json()["score"] == pytest.approx(50.0)
+    return attempt_id, right, wrong
+
+
+def score_of(db, attempt_id: int) -> float:
+    db.expire_all()
+    return db.get(QuizAttempt, attempt_id).score
+
+
+def test_new_question_does_not_change_existing_scores(client, db, headers, quiz, add_question, submitted):
+    attempt_id, _, _ = submitted
+
+    add_question("C")
+    assert score_of(db, attempt_id) == pytest.approx(50.0)
+
+    # nor does a forced regrade: the new question is not on the attempt's paper
+    response = client.post(f"/quizzes/{quiz.quizID}/regrade", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["changed"] == 0
+    assert score_of(db, attempt_id) == pytest.approx(50.0)
+
+
+def test_correct_answer_change_regrades(client, db, headers, submitted):
+    attempt_id, _, wrong = submitted
+
+    response = client.patch(f"/questions/{wrong}", json={"correct_answer": "B"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert score_of(db, attempt_id) == pytest.approx(100.0)
+
+
+def test_deleted_question_drops_out_of_the_paper(client, db, headers, submitted):
+    attempt_id, _, wrong = submitted
+
+    response = client.delete(f"/questions/{wrong}", headers=headers)
+    assert response.status_code == 204, response.text
+    assert score_of(db, attempt_id) == pytest.approx(100.0)
+
+
+def test_moving_a_question_only_invalidates(client, db, headers, submitted):
+    attempt_id, _, wrong = submitted
+    other = Quiz(duration=30)
+    db.add(other)
+    db.commit()
+
+    response = client.patch(f"/questions/{wrong}", json={"quizID": other.quizID}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert score_of(db, attempt_id) == pytest.approx(50.0)
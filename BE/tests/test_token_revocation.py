@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.config import ALGORITHM, SECRET_KEY
+from app.dependencies import token_revocation
+from app.dependencies.auth import create_access_token
+from app.dependencies.token_revocation import REVOKED_BEFORE_KEY, is_token_revoked, revoke_customer_tokens
+
+
+@pytest.fixture
+def revoked_at(redis, monkeypatch):
+    """Revokes customer 1's tokens at t=1000.7 and returns the payload maker."""
+    monkeypatch.setattr(token_revocation.time, "time", lambda: 1000.7)
+    asyncio.run(revoke_customer_tokens(1))
+    return lambda iat: {"jti": "token", "customerID": 1, "iat": iat}
+
+
+def test_token_issued_after_the_revocation_is_accepted(revoked_at):
+    # e.g. the login right after a password change
+    assert asyncio.run(is_token_revoked(revoked_at(1000.9))) is False
+    assert asyncio.run(is_token_revoked(revoked_at(1001))) is False
+
+
+def test_token_issued_earlier_in_the_revoking_second_is_rejected(revoked_at):
+    assert asyncio.run(is_token_revoked(revoked_at(1000.2))) is True
+    # whole-second iat of an older token: rounded down, still before the revocation
+    assert asyncio.run(is_token_revoked(revoked_at(1000))) is True
+    assert asyncio.run(is_token_revoked(revoked_at(999))) is True
+
+
+def test_revocation_splits_tokens_minted_in_the_same_second(client, make_user, auth_headers, redis):
+    customer = make_user("alice")
+    path = f"/users/{customer.customerID}/conversations"
+    before = auth_headers(customer)
+
+    asyncio.run(revoke_customer_tokens(customer.customerID))
+    after = auth_headers(customer)
+
+    assert client.get(path, headers=before).status_code == 401
+    assert client.get(path, headers=after).status_code == 200
+
+
+def test_redis_failure_fails_closed(client, make_user, auth_headers, redis, redis_server):
+    customer = make_user("alice")
+    redis_server.connected = False
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(is_token_revoked({"jti": "token", "customerID": customer.customerID, "iat": 1}))
+    assert error.value.status_code == 503
+
+    response = client.get(f"/users/{customer.customerID}/conversations", headers=auth_headers(customer))
+    assert response.status_code == 503, response.text
+    assert response.headers["Retry-After"] == "1"
+
+
+def legacy_headers(claims: dict) -> dict:
+    return {"Authorization": f"Bearer {jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)}"}
+
+
+def test_legacy_tokens_are_checked_against_the_deny_list(client, make_user, redis):
+    customer = make_user("alice")
+    path = f"/users/{customer.customerID}/conversations"
+    # `sub` only: resolved by fullname through validate_token
+    with_iat = {"Authorization": f"Bearer {create_access_token({'sub': customer.fullname})}"}
+    # as issued before tokens had iat or jti
+    exp = datetime.now(timezone.utc) + timedelta(minutes=5)
+    without_iat = legacy_headers({"sub": customer.fullname, "exp": exp})
+
+    assert client.get(path, headers=with_iat).status_code == 200
+    assert client.get(path, headers=without_iat).status_code == 200
+
+    asyncio.run(revoke_customer_tokens(customer.customerID))
+
+    assert client.get(path, headers=with_iat).status_code == 401
+    assert client.get(path, headers=without_iat).status_code == 401
+
+
+def test_cached_legacy_token_revoked_by_another_worker_is_rejected(client, make_user, redis):
+    customer = make_user("alice")
+    path = f"/users/{customer.customerID}/conversations"
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': customer.fullname})}"}
+    assert client.get(path, headers=headers).status_code == 200  # now in this worker's principal cache
+
+    # revoked elsewhere: only Redis knows, this worker's cache was not invalidated
+    key = REVOKED_BEFORE_KEY.format(customer_id=customer.customerID)
+    asyncio.run(redis.set(key, datetime.now(timezone.utc).timestamp() + 1))
+
+    assert client.get(path, headers=headers).status_code == 401
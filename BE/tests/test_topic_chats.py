@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app._Course.model import Course
+from app._Topic.model import Topic, TopicChat
+
+
+@pytest.fixture
+def student(make_user):
+    return make_user("student")
+
+
+@pytest.fixture
+def topic(db, make_user):
+    instructor = make_user("instructor", "instructor")
+    course = Course(course_name="Databases", number_of_sessions="10", instructorID=instructor.customerID)
+    db.add(course)
+    db.commit()
+    now = datetime.utcnow()
+    # as create_topic makes it: no activity yet
+    topic = Topic(title="Indexes", courseID=course.courseID, created_at=now, last_activity_at=now)
+    db.add(topic)
+    db.commit()
+    return topic
+
+
+def post_chat(client, topic, student, headers, message) -> int:
+    response = client.post(
+        "/topic-chats/",
+        json={"topic_id": topic.topicID, "user_id": student.customerID, "user_role": "student", "message": message},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def delete_chat(client, chat_id, headers) -> None:
+    response = client.delete(f"/topic-chats/{chat_id}", headers=headers)
+    assert response.status_code == 204, response.text
+
+
+def assert_counters_match_chats(db, topic) -> None:
+    db.expire_all()
+    row = db.get(Topic, topic.topicID)
+    count, latest = db.execute(
+        select(func.count(TopicChat.messageID), func.max(TopicChat.created_at)).where(
+            TopicChat.topicID == topic.topicID
+        )
+    ).one()
+    assert row.reply_count == count
+    assert row.last_activity_at == (latest or row.created_at)
+
+
+def test_reply_count_and_last_activity_follow_the_chats(client, db, topic, student, auth_headers):
+    headers = auth_headers(student)
+    assert_counters_match_chats(db, topic)
+
+    first, second, third = (post_chat(client, topic, student, headers, f"reply {n}") for n in range(3))
+    assert_counters_match_chats(db, topic)
+
+    # the latest chat goes: last activity falls back to the one before it
+    delete_chat(client, third, headers)
+    assert_counters_match_chats(db, topic)
+    assert db.get(Topic, topic.topicID).last_activity_at == db.get(TopicChat, second).created_at
+
+    delete_chat(client, first, headers)
+    assert_counters_match_chats(db, topic)
+
+    # no chats left: back to the topic's own creation time
+    delete_chat(client, second, headers)
+    assert_counters_match_chats(db, topic)
+    assert db.get(Topic, topic.topicID).reply_count == 0
+
+    post_chat(client, topic, student, headers, "again")
+    assert_counters_match_chats(db, topic)
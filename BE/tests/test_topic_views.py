@@ -0,0 +1,113 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.database import async_engine
+from app.dependencies.topic_views import DIRTY_TOPICS_KEY, TopicViewFlusher
+from app._Course.model import Course
+from app._Topic.model import Topic
+
+
+@pytest.fixture
+def topic(db, make_user):
+    instructor = make_user("instructor", "instructor")
+    course = Course(course_name="Databases", number_of_sessions="10", instructorID=instructor.customerID)
+    db.add(course)
+    db.commit()
+    topic = Topic(title="Indexes", courseID=course.courseID)
+    db.add(topic)
+    db.commit()
+    return topic
+
+
+@pytest.fixture
+def headers(make_user, auth_headers):
+    return auth_headers(make_user("student"))
+
+
+@pytest.fixture
+def flusher():
+    return TopicViewFlusher(interval=60, batch=100)
+
+
+def view(client, topic, headers) -> int:
+    """Opens the topic (one more view) and returns the count it was served with."""
+    response = client.get(f"/topics/{topic.topicID}", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["view_count"]
+
+
+def served(client, topic, headers) -> int:
+    """The count the course listing shows, without recording a view."""
+    response = client.get(f"/courses/{topic.courseID}/topics", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["topics"][0]["view_count"]
+
+
+def run(step):
+    async def go():
+        try:
+            return await step()
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(go())
+
+
+def stored(db, topic) -> int:
+    db.expire_all()
+    return db.get(Topic, topic.topicID).view_count
+
+
+def test_views_are_exact_through_a_flush(client, db, topic, headers, flusher, redis):
+    assert [view(client, topic, headers) for _ in range(3)] == [1, 2, 3]
+
+    assert run(flusher.flush) == 1
+    assert stored(db, topic) == 3
+    assert served(client, topic, headers) == 3
+    assert view(client, topic, headers) == 4
+    assert asyncio.run(redis.smembers(DIRTY_TOPICS_KEY)) == {str(topic.topicID).encode()}
+
+    run(flusher.flush)
+    assert stored(db, topic) == 4
+    assert served(client, topic, headers) == 4
+    assert asyncio.run(redis.smembers(DIRTY_TOPICS_KEY)) == set()
+
+
+def test_views_are_exact_at_every_step_of_a_flush(client, db, topic, headers, flusher, redis):
+    for _ in range(3):
+        view(client, topic, headers)
+    flush_token = uuid.uuid4().hex
+
+    moved = run(lambda: flusher._move([topic.topicID], flush_token))
+    assert moved == {topic.topicID: 3}
+    assert served(client, topic, headers) == 3
+    assert view(client, topic, headers) == 4
+
+    run(lambda: flusher._write(moved, flush_token))
+    # committed, not settled yet: the row already has the batch, Redis still holds it
+    assert stored(db, topic) == 3
+    assert served(client, topic, headers) == 4
+    assert view(client, topic, headers) == 5
+
+    run(lambda: flusher._settle([topic.topicID], flush_token))
+    assert served(client, topic, headers) == 5
+
+    # the views that came in meanwhile go with the next flush
+    run(flusher.flush)
+    assert stored(db, topic) == 5
+    assert served(client, topic, headers) == 5
+
+
+def test_batch_of_a_flush_that_died_before_its_commit_is_not_lost(client, db, topic, headers, flusher, redis):
+    for _ in range(2):
+        view(client, topic, headers)
+    run(lambda: flusher._move([topic.topicID], uuid.uuid4().hex))  # then the process died
+
+    assert served(client, topic, headers) == 2
+    assert view(client, topic, headers) == 3
+
+    run(flusher.flush)
+    assert stored(db, topic) == 3
+    assert served(client, topic, headers) == 3
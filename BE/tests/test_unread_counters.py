@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+
+from app.database import async_engine
+from app.dependencies import unread_counters
+from app.dependencies.read_routing import get_async_read_db
+from app.dependencies.unread_counters import (
+    UNREAD_MESSAGES_KEY,
+    UNREAD_NOTIFICATIONS_KEY,
+    UnreadCounterReconciler,
+    adjust_unread_notifications,
+    get_unread_notifications,
+)
+from app.main import app as fastapi_app
+from app._Notification.model import Notification
+
+
+@pytest.fixture
+def student(make_user):
+    return make_user("student")
+
+
+def unread_notifications(client, student, headers) -> int:
+    response = client.get(f"/students/{student.customerID}/notifications/unread-count", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["count"]
+
+
+def notify(client, student, headers, content="Quiz 1: opens tomorrow"):
+    response = client.post(
+        f"/students/{student.customerID}/notifications",
+        json={"type": "deadline", "content": content},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_new_notifications_move_the_seeded_counter(client, student, auth_headers, redis):
+    headers = auth_headers(student)
+    assert unread_notifications(client, student, headers) == 0
+
+    notification = notify(client, student, headers)
+    assert notification["is_read"] is False
+    assert notification["title"] == "Quiz 1"
+
+    notify(client, student, headers)
+    key = UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID)
+    assert asyncio.run(redis.get(key)) == b"2"
+    assert unread_notifications(client, student, headers) == 2
+
+
+def test_mark_all_read_resets_the_counter(client, student, auth_headers, redis):
+    headers = auth_headers(student)
+    for _ in range(3):
+        notify(client, student, headers)
+    assert unread_notifications(client, student, headers) == 3
+
+    response = client.put(f"/students/{student.customerID}/notifications/read", headers=headers)
+    assert response.status_code == 204, response.text
+
+    assert asyncio.run(redis.exists(UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID))) == 0
+    assert unread_notifications(client, student, headers) == 0
+    notifications = client.get(f"/students/{student.customerID}/notifications", headers=headers).json()
+    assert all(n["is_read"] for n in notifications["notifications"])
+
+
+def test_notification_for_unknown_student_is_404(client, student, auth_headers):
+    response = client.post(
+        "/students/999/notifications", json={"type": "other", "content": "hello"}, headers=auth_headers(student)
+    )
+    assert response.status_code == 404
+
+
+def test_counters_are_seeded_from_the_primary(client, student, auth_headers, redis):
+    async def no_replica():
+        raise AssertionError("unread counters must not be seeded from the read replica")
+        yield
+
+    fastapi_app.dependency_overrides[get_async_read_db] = no_replica
+    try:
+        headers = auth_headers(student)
+        assert unread_notifications(client, student, headers) == 0
+        response = client.get(f"/users/{student.customerID}/messages/unread-count", headers=headers)
+        assert response.status_code == 200, response.text
+    finally:
+        fastapi_app.dependency_overrides.pop(get_async_read_db)
+
+
+def add_unread(db, student, count: int):
+    db.add_all([Notification(type="other", content="hello", status="unread", studentID=student.customerID)
+                for _ in range(count)])
+    db.commit()
+
+
+def test_write_landing_while_the_seed_counts_drops_the_seed(client, db, student, auth_headers, redis):
+    key = UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID)
+
+    async def main():
+        async def count_then_a_notification_lands():
+            # the COUNT has run (0); a notification commits and adjusts before the seed is stored
+            add_unread(db, student, 1)
+            await adjust_unread_notifications(student.customerID, 1)
+            return 0
+
+        assert await get_unread_notifications(student.customerID, count_then_a_notification_lands) == 0
+        return await redis.exists(key)
+
+    # the stale 0 was not cached for the counter's whole TTL...
+    assert asyncio.run(main()) == 0
+    # ...the next read counts again
+    assert unread_notifications(client, student, auth_headers(student)) == 1
+    assert asyncio.run(redis.get(key)) == b"1"
+
+
+def test_write_landing_after_the_seed_moves_it(db, student, redis):
+    async def main():
+        async def count():
+            return 0
+
+        await get_unread_notifications(student.customerID, count)
+        # committed after the COUNT, adjusted after the seed: the seeded counter moves
+        await adjust_unread_notifications(student.customerID, 1)
+        return await redis.get(UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID))
+
+    assert asyncio.run(main()) == b"1"
+
+
+def reconcile(reconciler: UnreadCounterReconciler) -> int:
+    async def main():
+        try:
+            return await reconciler.reconcile()
+        finally:
+            # pooled aiosqlite connections belong to this loop
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_reconcile_corrects_drifted_counters(client, db, student, auth_headers, redis, monkeypatch):
+    headers = auth_headers(student)
+    add_unread(db, student, 2)
+    assert unread_notifications(client, student, headers) == 2
+    response = client.get(f"/users/{student.customerID}/messages/unread-count", headers=headers)
+    assert response.json()["count"] == 0
+
+    # lost updates: both counters drifted from the DB
+    notifications_key = UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID)
+    messages_key = UNREAD_MESSAGES_KEY.format(user_id=student.customerID)
+    asyncio.run(redis.set(notifications_key, 7, keepttl=True))
+    asyncio.run(redis.set(messages_key, 3, keepttl=True))
+    pushed = []
+
+    async def publish(kind, user_id, count):
+        pushed.append((kind, user_id, count))
+
+    monkeypatch.setattr(unread_counters, "_publish", publish)
+
+    assert reconcile(UnreadCounterReconciler(interval=1, batch=100)) == 2
+
+    assert asyncio.run(redis.get(notifications_key)) == b"2"
+    assert asyncio.run(redis.get(messages_key)) == b"0"
+    assert asyncio.run(redis.ttl(notifications_key)) > 0
+
+    # corrections reach the client like any other change
+    assert sorted(pushed) == [("messages", student.customerID, 0), ("notifications", student.customerID, 2)]
+
+
+def test_reconcile_leaves_a_counter_adjusted_while_it_counts(client, db, student, auth_headers, redis, monkeypatch):
+    assert unread_notifications(client, student, auth_headers(student)) == 0
+    count_unread = unread_counters._count_unread
+
+    async def count_then_a_notification_lands(session, kind, user_id):
+        count = await count_unread(session, kind, user_id)
+        add_unread(db, student, 1)
+        await adjust_unread_notifications(student.customerID, 1)
+        return count
+
+    monkeypatch.setattr(unread_counters, "_count_unread", count_then_a_notification_lands)
+
+    assert reconcile(UnreadCounterReconciler(interval=1, batch=100)) == 0
+    # the stale 0 did not overwrite the adjusted counter
+    assert asyncio.run(redis.get(UNREAD_NOTIFICATIONS_KEY.format(user_id=student.customerID))) == b"1"
+